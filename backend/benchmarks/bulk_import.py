@@ -0,0 +1,58 @@
+"""
+Onboarding a table: one POST /api/characters/ per character vs a single
+POST /api/characters/bulk. Reports SQL statements and wall time for the
+whole roster on a file database (so commits cost what they do in
+production).
+
+    python -m backend.benchmarks.bulk_import
+"""
+
+import os
+import tempfile
+import time
+
+from backend.benchmarks.harness import QueryCounter, make_client, make_engine
+
+ROSTER_SIZES = (10, 100, 500)
+
+
+def roster(count: int) -> list:
+    classes = [("Fighter", "Soldier"), ("Wizard", "Sage"), ("Cleric", "Acolyte"), ("Rogue", "Criminal")]
+    return [
+        {
+            "name": f"Recruit {i}",
+            "species": "Human",
+            "class_name": classes[i % 4][0],
+            "background": classes[i % 4][1],
+            "level": 1 + i % 5,
+            "stats": {"strength": 12, "dexterity": 14, "constitution": 13, "intelligence": 10, "wisdom": 12, "charisma": 8}
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    print(f"{'characters':>10} {'single q':>9} {'single ms':>10} {'bulk q':>7} {'bulk ms':>8}")
+    for size in ROSTER_SIZES:
+        definitions = roster(size)
+        row = [size]
+        for mode in ("single", "bulk"):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+                client = make_client(engine)
+                counter = QueryCounter(engine)
+                with counter.measure() as queries:
+                    start = time.perf_counter()
+                    if mode == "single":
+                        for definition in definitions:
+                            assert client.post("/api/characters/", json=definition).status_code == 200
+                    else:
+                        assert client.post("/api/characters/bulk", json={"characters": definitions}).json()["created"] == size
+                    elapsed = (time.perf_counter() - start) * 1000
+                engine.dispose()
+            row += [queries["queries"], elapsed]
+        print(f"{row[0]:>10} {row[1]:>9} {row[2]:>10.1f} {row[3]:>7} {row[4]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Latency under concurrent clients at different worker thread pool sizes
+(THREADPOOL_SIZE in backend/main.py) on one SQLite file.
+
+Every client issues REQUESTS_PER_CLIENT sheet/detail reads back to back;
+p50/p99 are over all requests at that concurrency level.
+
+    python -m backend.benchmarks.concurrency [50 200 500]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.orm import sessionmaker
+
+from backend.auth import get_current_user
+from backend.benchmarks.harness import BENCH_USER, make_engine, seed_characters
+from backend.database import get_db
+from backend.identity import identity_cache
+from backend.routers import characters
+
+CONCURRENCY_LEVELS = [50, 200, 500]
+THREADPOOL_SIZES = [40, 100]
+REQUESTS_PER_CLIENT = 4
+
+
+def build_app(path: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(characters.router)
+
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=make_engine(f"sqlite:///{path}"))
+
+    def _get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_current_user] = lambda: BENCH_USER
+    return app
+
+
+async def run_level(app: FastAPI, character_ids: list, clients: int) -> list:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one_client(n: int):
+            character_id = character_ids[n % len(character_ids)]
+            for i in range(REQUESTS_PER_CLIENT):
+                path = f"/api/characters/{character_id}" + ("/sheet" if i % 2 else "")
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(one_client(n) for n in range(clients)))
+    return latencies
+
+
+def percentile(values: list, pct: float) -> float:
+    return statistics.quantiles(values, n=100)[int(pct) - 1]
+
+
+async def run_mode(threads: int, app: FastAPI, character_ids: list, levels: list):
+    # The thread limiter belongs to the running event loop
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    for clients in levels:
+        identity_cache.clear()
+        start = time.perf_counter()
+        latencies = await run_level(app, character_ids, clients)
+        elapsed = time.perf_counter() - start
+        print(f"{threads:>7} {clients:>7} {percentile(latencies, 50):>8.1f} {percentile(latencies, 99):>8.1f} "
+              f"{len(latencies) / elapsed:>8.0f}")
+
+
+def main():
+    levels = [int(arg) for arg in sys.argv[1:]] or CONCURRENCY_LEVELS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        character_ids = seed_characters(make_engine(f"sqlite:///{path}"), 50)
+
+        print(f"{'threads':>7} {'clients':>7} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        for threads in THREADPOOL_SIZES:
+            asyncio.run(run_mode(threads, build_app(path), character_ids, levels))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Batch derived stats vs per-character compilation.
+
+"scalar" compiles each character with compile_character() and reads its
+rolls, the way the single-character endpoints do; "batch" packs the same
+characters into arrays with backend.derived.derive. Two workloads are
+measured: the dashboard rows served by GET /api/characters/derived and a
+six-column roll matrix (POST /api/characters/rolls). Outputs are checked to
+match. Batch timings force packing at every size so the crossover that
+backend.derived.BATCH_MIN_SIZE is based on stays visible.
+
+    python -m backend.benchmarks.derived
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from backend import derived
+from backend.derived import DEXTERITY, _summary, derived_summaries, roll_table
+from backend.game_data import ABILITIES, SKILL_NAMES, attack_roll, compile_character, save_roll, skill_roll
+
+BATCH_SIZES = (10, 100, 500, 2000)
+
+# A typical GM roll matrix: Perception, Stealth, Insight, WIS and DEX saves, finesse attack
+ROLLS = [("skill", 11), ("skill", 16), ("skill", 6), ("save", 4), ("save", 1), ("attack", 1)]
+KERNELS = {"skill": skill_roll, "save": save_roll, "attack": attack_roll}
+
+
+def make_characters(count: int) -> list:
+    return [
+        SimpleNamespace(
+            id=i,
+            name=f"Hero {i}",
+            level=1 + i % 20,
+            stats={ability: 8 + (i * 7 + j * 3) % 11 for j, ability in enumerate(ABILITIES)},
+            proficiencies={
+                "skills": [SKILL_NAMES[(i + k) % len(SKILL_NAMES)] for k in range(4)],
+                "saves": [ABILITIES[i % 6], ABILITIES[(i + 3) % 6]]
+            },
+            armor_class=10 + i % 6
+        )
+        for i in range(count)
+    ]
+
+
+def scalar_summaries(characters: list) -> list:
+    summaries = []
+    for character in characters:
+        compiled = compile_character(character.stats, character.proficiencies, character.level)
+        summaries.append(_summary(
+            character,
+            compiled.modifiers,
+            compiled.proficiency_bonus,
+            (character.armor_class or 10) + compiled.modifiers[DEXTERITY],
+            [roll[3] for roll in compiled.skills],
+            [roll[3] for roll in compiled.saves],
+            [roll[3] for roll in compiled.attacks]
+        ))
+    return summaries
+
+
+def scalar_roll_table(characters: list) -> list:
+    table = []
+    for character in characters:
+        compiled = compile_character(character.stats, character.proficiencies, character.level)
+        table.append([KERNELS[kind](compiled, index) for kind, index in ROLLS])
+    return table
+
+
+def best_ms(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) * 1000 / number
+
+
+def main():
+    derived.BATCH_MIN_SIZE = 0
+    print(f"{'characters':>10} {'summary scalar ms':>18} {'batch ms':>9} {'speedup':>8} "
+          f"{'rolls scalar ms':>16} {'batch ms':>9} {'speedup':>8}")
+    for size in BATCH_SIZES:
+        characters = make_characters(size)
+        assert scalar_summaries(characters) == derived_summaries(characters)
+        assert scalar_roll_table(characters) == roll_table(characters, ROLLS)
+
+        number = max(1, 2000 // size)
+        summary_scalar = best_ms(lambda: scalar_summaries(characters), number)
+        summary_batch = best_ms(lambda: derived_summaries(characters), number)
+        rolls_scalar = best_ms(lambda: scalar_roll_table(characters), number)
+        rolls_batch = best_ms(lambda: roll_table(characters, ROLLS), number)
+        print(f"{size:>10} {summary_scalar:>18.3f} {summary_batch:>9.3f} {summary_scalar / summary_batch:>7.2f}x "
+              f"{rolls_scalar:>16.3f} {rolls_batch:>9.3f} {rolls_scalar / rolls_batch:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
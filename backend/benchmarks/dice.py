@@ -0,0 +1,63 @@
+"""
+Dice throughput.
+
+Rolls each expression ROLLS times through roll_totals (one vectorized draw
+per term) and reports dice per second, then compares against a pure-Python
+`random.randint` loop. Also checks that a fixed seed replays identically.
+
+    python -m backend.benchmarks.dice
+"""
+
+import random
+import time
+
+import numpy as np
+
+from backend.dice import compile_expression, roll_totals
+
+ROLLS = 200_000
+SEED = 20240101
+EXPRESSIONS = ["1d20adv+5", "2d6+3", "4d6kh3", "8d6 fire + 1d8"]
+
+
+def _generator(seed: int = SEED) -> np.random.Generator:
+    return np.random.Generator(np.random.PCG64(seed))
+
+
+def python_loop(expression: str, rolls: int) -> int:
+    """Baseline: sum of plain dice via random.randint (ignores keep/adv)"""
+    compiled = compile_expression(expression)
+    total = 0
+    for _ in range(rolls):
+        for term in compiled.terms:
+            if term.sides:
+                total += sum(random.randint(1, term.sides) for _ in range(term.count))
+    return total
+
+
+def main():
+    for expression in EXPRESSIONS:
+        compiled = compile_expression(expression)
+        first = roll_totals(compiled, _generator(), ROLLS)
+        assert np.array_equal(first, roll_totals(compiled, _generator(), ROLLS)), "seeded rolls differ"
+
+    print(f"{'expression':18} {'mean':>8} {'numpy Mdice/s':>14} {'python Mdice/s':>15}")
+    for expression in EXPRESSIONS:
+        compiled = compile_expression(expression)
+        generator = _generator()
+        dice = compiled.dice_count * ROLLS
+
+        start = time.perf_counter()
+        totals = roll_totals(compiled, generator, ROLLS)
+        vectorized = time.perf_counter() - start
+
+        python_rolls = ROLLS // 20
+        start = time.perf_counter()
+        python_loop(expression, python_rolls)
+        looped = (time.perf_counter() - start) * 20
+
+        print(f"{expression:18} {totals.mean():>8.2f} {dice / vectorized / 1e6:>14.1f} {dice / looped / 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
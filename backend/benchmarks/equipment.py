@@ -0,0 +1,64 @@
+"""
+Equipment.
+
+Summary: inventory_summary() for a sheet read with the per-inventory cache
+warm, against resolving and summarizing the inventory from scratch as an
+uncached read would.
+
+Resolve: the uncached cost of resolving inventories of growing size
+against the catalogue.
+
+    python -m backend.benchmarks.equipment
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from backend.equipment import ITEMS, _canonical, _resolve, _summary, equipment_inputs, inventory_summary
+
+ITERATIONS = 5000
+
+
+def inventory(size: int) -> list:
+    keys = list(ITEMS)
+    entries = [{"item": "longsword", "equipped": True}, {"item": "chain-mail", "equipped": True},
+               {"item": "shield", "equipped": True}, {"item": "gp", "quantity": 35}]
+    entries += [{"item": keys[i % len(keys)], "quantity": 1 + i % 3} for i in range(max(size - len(entries), 0))]
+    return entries[:size]
+
+
+def uncached(fn):
+    def run():
+        _resolve.cache_clear()
+        _summary.cache_clear()
+        return fn()
+    return run
+
+
+def main():
+    character = SimpleNamespace(
+        stats={"strength": 16, "dexterity": 12}, armor_class=10, speed=30,
+        proficiencies={"weapons": ["simple", "martial"], "armor": ["light", "medium", "heavy", "shields"]},
+    )
+    inputs = equipment_inputs(character, (3, 1, 2, 0, 1, -1), 2)
+
+    items = inventory(20)
+    cached = lambda: inventory_summary(items, inputs)
+    cached()
+    times = [
+        min(timeit.repeat(fn, number=ITERATIONS, repeat=3)) * 1e6 / ITERATIONS
+        for fn in (cached, uncached(cached))
+    ]
+    print(f"{'summary, 20 entries':22} {'cached us':>10} {'uncached us':>12}")
+    print(f"{'':22} {times[0]:>10.2f} {times[1]:>12.2f}")
+
+    print(f"\n{'entries':>7} {'resolve us':>11}")
+    for size in (5, 20, 80, 320):
+        canonical = _canonical(inventory(size))
+        resolve = uncached(lambda: _resolve(canonical))
+        number = max(ITERATIONS // size, 50)
+        print(f"{size:>7} {min(timeit.repeat(resolve, number=number, repeat=3)) * 1e6 / number:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
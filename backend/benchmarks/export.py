@@ -0,0 +1,76 @@
+"""
+Export memory and throughput.
+
+Streams a full admin export (NDJSON, then gzip) for growing tables and
+reports the Python heap peak from tracemalloc next to the peak of loading
+every character first and serializing afterwards. The streamed peak should
+stay flat as the row count grows; the loaded one grows with it.
+
+    python -m backend.benchmarks.export
+"""
+
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import insert, select
+
+from backend.benchmarks.harness import make_engine
+from backend.export import EXPORT_COLUMNS, _json_default, gzip_stream, ndjson_export
+from backend.models import Character, User
+
+ROW_COUNTS = (1_000, 5_000, 20_000)
+INVENTORY = [{"name": f"Item {i}", "qty": 1, "weight": 1.5} for i in range(40)]
+
+
+def seed(engine, count: int):
+    with engine.begin() as connection:
+        user_id = connection.execute(insert(User).values(email="export@example.com")).inserted_primary_key[0]
+        connection.execute(insert(Character), [
+            {
+                "user_id": user_id, "name": f"Hero {i}", "species": "Human", "class_name": "Fighter",
+                "background": "Soldier", "level": 1 + i % 20, "stats": {"strength": 14, "dexterity": 12},
+                "hp_max": 10, "hp_current": 10, "inventory": INVENTORY,
+                "proficiencies": {"skills": ["Athletics"], "saves": ["strength"]}
+            }
+            for i in range(count)
+        ])
+
+
+def streamed(engine) -> int:
+    return sum(len(chunk) for chunk in gzip_stream(ndjson_export(engine)))
+
+
+def loaded(engine) -> int:
+    with engine.connect() as connection:
+        rows = connection.execute(select(*EXPORT_COLUMNS)).all()
+    payload = "".join(json.dumps(dict(row._mapping), default=_json_default) + "\n" for row in rows)
+    return len(payload)
+
+
+def measure(fn, engine):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn(engine)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak / 2**20
+
+
+def main():
+    print(f"{'rows':>7} {'gzip MB':>8} {'stream s':>9} {'stream peak MB':>15} {'loaded peak MB':>15}")
+    for count in ROW_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(f"sqlite:///{os.path.join(tmp, 'export.db')}")
+            seed(engine, count)
+            size, elapsed, stream_peak = measure(streamed, engine)
+            _, _, loaded_peak = measure(loaded, engine)
+            engine.dispose()
+        print(f"{count:>7} {size / 2**20:>8.2f} {elapsed:>9.2f} {stream_peak:>15.2f} {loaded_peak:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
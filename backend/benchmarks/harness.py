@@ -0,0 +1,115 @@
+"""
+Shared helpers for the backend benchmarks.
+
+Each benchmark gets an isolated in-memory SQLite database, a TestClient
+wired to it with a fake session user, and a statement counter on the engine.
+Run a benchmark from the repo root, e.g. `python -m backend.benchmarks.identity`.
+"""
+
+import time
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.auth import get_current_user
+from backend.database import Base, get_db
+from backend.identity import identity_cache
+from backend.main import app
+from backend.models import Character, User
+
+BENCH_USER = {"email": "bench@example.com", "name": "Bench", "sub": "bench-sub"}
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    @contextmanager
+    def measure(self):
+        start = self.count
+        result = {}
+        yield result
+        result["queries"] = self.count - start
+
+
+def make_engine(url: str = "sqlite://"):
+    if url == "sqlite://":
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_client(engine, user: dict = BENCH_USER) -> TestClient:
+    """Return a TestClient bound to `engine` with `user` as the session user"""
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    identity_cache.clear()
+    return TestClient(app)
+
+
+def seed_characters(engine, count: int, user: dict = BENCH_USER) -> list:
+    """Insert one user and `count` characters, returning the character ids"""
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        db_user = User(email=user["email"], name=user["name"], google_id=user["sub"])
+        db.add(db_user)
+        db.flush()
+        characters = [
+            Character(
+                user_id=db_user.id,
+                name=f"Hero {i}",
+                species="Human",
+                class_name="Fighter",
+                background="Soldier",
+                level=1 + i % 20,
+                stats={
+                    "strength": 16, "dexterity": 12 + i % 6, "constitution": 14,
+                    "intelligence": 10, "wisdom": 8 + i % 8, "charisma": 10
+                },
+                hp_max=12,
+                hp_current=12,
+                hit_dice_max=1,
+                hit_dice_current=1,
+                proficiencies={
+                    "skills": ["Athletics", "Perception"],
+                    "saves": ["strength", "constitution"],
+                    "tools": [], "weapons": ["simple", "martial"], "armor": ["light"]
+                },
+                speed=30
+            )
+            for i in range(count)
+        ]
+        db.add_all(characters)
+        db.commit()
+        return [c.id for c in characters]
+    finally:
+        db.close()
+
+
+def timed(fn, iterations: int) -> float:
+    """Run `fn` `iterations` times and return the mean wall time in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
@@ -0,0 +1,51 @@
+"""
+Queries per request for the characters router, with and without the
+identity cache.
+
+"cold" clears the identity cache before every request, which reproduces the
+old per-handler `User.email` lookup; "warm" is the steady state during play.
+
+    python -m backend.benchmarks.identity
+"""
+
+from backend.benchmarks.harness import QueryCounter, make_client, make_engine, seed_characters, timed
+from backend.identity import identity_cache
+
+ITERATIONS = 200
+
+
+def main():
+    engine = make_engine()
+    counter = QueryCounter(engine)
+    character_id = seed_characters(engine, 5)[0]
+    client = make_client(engine)
+
+    requests = [
+        ("GET /api/characters/", lambda: client.get("/api/characters/")),
+        ("GET /api/characters/{id}", lambda: client.get(f"/api/characters/{character_id}")),
+        ("GET /api/characters/{id}/skills", lambda: client.get(f"/api/characters/{character_id}/skills")),
+        ("GET .../roll/skill/Perception", lambda: client.get(f"/api/characters/{character_id}/roll/skill/Perception")),
+        ("PUT /api/characters/{id}", lambda: client.put(f"/api/characters/{character_id}", json={"hp_current": 7})),
+    ]
+
+    print(f"{'request':34} {'cold q/req':>10} {'warm q/req':>10} {'cold ms':>8} {'warm ms':>8}")
+    for label, send in requests:
+        def cold():
+            identity_cache.clear()
+            assert send().status_code == 200
+
+        def warm():
+            assert send().status_code == 200
+
+        with counter.measure() as cold_q:
+            cold_ms = timed(cold, ITERATIONS)
+        warm()
+        with counter.measure() as warm_q:
+            warm_ms = timed(warm, ITERATIONS)
+
+        print(f"{label:34} {cold_q['queries'] / ITERATIONS:>10.2f} {warm_q['queries'] / ITERATIONS:>10.2f} "
+              f"{cold_ms:>8.3f} {warm_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
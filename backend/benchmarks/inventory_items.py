@@ -0,0 +1,79 @@
+"""
+Normalized inventory rows.
+
+Queries: "who holds the Sword of Kas?" and the party's per-item totals
+(coin value, weight) answered from the indexed inventory_items table, against
+the JSON fallback that loads and resolves every character's inventory.
+
+Writes: a PUT of the inventory with and without the dual write.
+
+    python -m backend.benchmarks.inventory_items
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import bindparam, update
+
+import backend.inventory_items as inventory_items
+import backend.routers.characters as characters
+from backend.benchmarks.harness import make_client, make_engine, seed_characters, timed
+from backend.equipment import ITEMS_BY_CATEGORY
+from backend.models import Character
+
+PARTY_SIZES = (10, 100, 1000)
+ITERATIONS = 20
+PUTS = 200
+
+
+def inventory(i: int) -> list:
+    gear = ITEMS_BY_CATEGORY["gear"]
+    entries = [{"item": "longsword", "equipped": True}, {"item": "gp", "quantity": 10 + i % 50}, {"item": "sp", "quantity": i % 30}]
+    entries += [{"item": gear[(i + n) % len(gear)]} for n in range(12)]
+    if i % 97 == 0:
+        entries.append({"name": "Sword of Kas", "equipped": True})
+    return entries
+
+
+def set_mode(indexed: bool):
+    inventory_items.INVENTORY_ITEMS_ENABLED = characters.INVENTORY_ITEMS_ENABLED = indexed
+
+
+def main():
+    print(f"{'characters':>10} {'query':14} {'indexed ms':>11} {'json scan ms':>13}")
+    for size in PARTY_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            character_ids = seed_characters(engine, size)
+            with engine.begin() as connection:
+                connection.execute(
+                    update(Character).where(Character.id == bindparam("row_id")).values(inventory=bindparam("row_inventory")),
+                    [{"row_id": character_id, "row_inventory": inventory(i)} for i, character_id in enumerate(character_ids)]
+                )
+                inventory_items.rebuild_inventory_items(connection)
+            client = make_client(engine)
+            client.get("/api/characters/")  # warm the identity cache
+
+            for label, path in (("holders", "/api/characters/items/Sword of Kas"), ("party totals", "/api/characters/items")):
+                results, times = [], []
+                for indexed in (True, False):
+                    set_mode(indexed)
+                    results.append(client.get(path).json())
+                    times.append(timed(lambda: client.get(path), ITERATIONS))
+                assert results[0] == results[1]
+                print(f"{size:>10} {label:14} {times[0]:>11.2f} {times[1]:>13.2f}")
+
+            if size == PARTY_SIZES[-1]:
+                put = lambda: client.put(f"/api/characters/{character_ids[0]}", json={"inventory": inventory(1)})
+                times = []
+                for indexed in (True, False):
+                    set_mode(indexed)
+                    times.append(timed(put, PUTS))
+                print(f"\n{'PUT inventory':25} {'dual write ms':>13} {'json only ms':>13}")
+                print(f"{'':25} {times[0]:>13.2f} {times[1]:>13.2f}")
+            set_mode(True)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
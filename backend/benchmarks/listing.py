@@ -0,0 +1,65 @@
+"""
+Character list cost for a power user.
+
+Characters are seeded with realistic inventory and spell blobs. At the
+session level, "full" loads every column (the previous GET /api/characters/
+query), "response" loads only the CharacterResponse columns (the current
+GET /api/characters/), and "party" runs one page of GET
+/api/characters/party with the default list-view fields. Both endpoints are
+then timed end to end. Reports SQL statements per call and wall time.
+
+    python -m backend.benchmarks.listing
+"""
+
+from sqlalchemy import update
+from sqlalchemy.orm import load_only, sessionmaker
+
+from backend.benchmarks.harness import QueryCounter, make_client, make_engine, seed_characters, timed
+from backend.models import Character
+from backend.routers.characters import DEFAULT_LIST_FIELDS, RESPONSE_COLUMNS, _party_query
+
+CHARACTERS = 60
+ITERATIONS = 200
+INVENTORY = [{"name": f"Item {i}", "qty": 1, "weight": 1.5, "notes": "x" * 40} for i in range(150)]
+SPELLS = {"known": [f"Spell {i}" for i in range(60)], "prepared": [f"Spell {i}" for i in range(20)], "slots": {}}
+
+
+def main():
+    engine = make_engine()
+    counter = QueryCounter(engine)
+    seed_characters(engine, CHARACTERS)
+    with engine.begin() as connection:
+        connection.execute(update(Character).values(inventory=INVENTORY, spells=SPELLS))
+    client = make_client(engine)
+    Session = sessionmaker(bind=engine)
+    client.get("/api/characters/")
+
+    def session_call(fn):
+        def _run():
+            db = Session()
+            try:
+                assert len(fn(db)) == CHARACTERS
+            finally:
+                db.close()
+        return _run
+
+    cases = [
+        ("session: full rows", session_call(
+            lambda db: db.query(Character).filter(Character.user_id == 1).all())),
+        ("session: response columns", session_call(
+            lambda db: db.query(Character).options(load_only(*RESPONSE_COLUMNS)).filter(Character.user_id == 1).all())),
+        ("session: party page", session_call(
+            lambda db: db.execute(_party_query(1, list(DEFAULT_LIST_FIELDS), CHARACTERS, None)).all()[:CHARACTERS])),
+        ("GET /api/characters/", lambda: client.get("/api/characters/")),
+        ("GET /api/characters/party", lambda: client.get("/api/characters/party", params={"limit": CHARACTERS})),
+    ]
+
+    print(f"{'request':30} {'q/call':>7} {'ms':>8}")
+    for label, fn in cases:
+        with counter.measure() as queries:
+            ms = timed(fn, ITERATIONS)
+        print(f"{label:30} {queries['queries'] / ITERATIONS:>7.2f} {ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Materialized derived stats.
+
+Reads: serializing a character's detail, sheet and one skill line with the
+stored derived column ("materialized") and without it, which compiles the
+character on every read as before ("computed").
+
+Writes: refresh() for single input changes, with the graph nodes each one
+recomputes, against a full materialize(); and the statements a PUT costs
+when it does and doesn't change a derived value.
+
+    python -m backend.benchmarks.materialized
+"""
+
+import os
+import tempfile
+import timeit
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from backend.benchmarks.harness import QueryCounter, make_client, make_engine, seed_characters
+from backend.materialized import NODES, materialize, refresh
+from backend.models import Character
+from backend.routers.characters import _character_detail, _character_sheet, _compile, _skill_line
+
+ITERATIONS = 20000
+PUTS = 200
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        counter = QueryCounter(engine)
+        character_id = seed_characters(engine, 10)[0]
+        with engine.connect() as connection:
+            row = connection.execute(select(Character).where(Character.id == character_id)).first()
+
+        client = make_client(engine)
+        client.get("/api/characters/")  # warm the identity cache
+        print(f"{'PUT':22} {'stmts/PUT':>9}")
+        for label, body in (("hp_current", lambda i: {"hp_current": i % 40}),
+                            ("stats (dex changes)", lambda i: {"stats": dict(row.stats, dexterity=10 + 2 * (i % 4))})):
+            with counter.measure() as queries:
+                for i in range(PUTS):
+                    client.put(f"/api/characters/{character_id}", json=body(i))
+            print(f"{label:22} {queries['queries'] / PUTS:>9.2f}")
+
+    materialized = SimpleNamespace(**row._mapping)
+    computed = SimpleNamespace(**dict(row._mapping, derived=None))
+    reads = [
+        ("detail", _character_detail),
+        ("sheet", _character_sheet),
+        ("one skill line", lambda character: _skill_line(_compile(character), "Stealth")),
+    ]
+    print(f"\n{'read':22} {'materialized us':>16} {'computed us':>12}")
+    for label, fn in reads:
+        assert fn(materialized) == fn(computed)
+        times = [
+            min(timeit.repeat(lambda: fn(character), number=ITERATIONS, repeat=3)) * 1e6 / ITERATIONS
+            for character in (materialized, computed)
+        ]
+        print(f"{label:22} {times[0]:>16.2f} {times[1]:>12.2f}")
+
+    base = materialized
+    changes = [
+        ("stats.dexterity", "stats", {"stats": dict(base.stats, dexterity=base.stats.get("dexterity", 10) + 4)}),
+        ("stats.dex, same mod", "stats", {"stats": dict(base.stats, dexterity=base.stats.get("dexterity", 10) ^ 1)}),
+        ("level", "level", {"level": base.level + 4}),
+        ("proficiencies", "proficiencies", {"proficiencies": {"skills": ["Stealth"], "saves": ["dexterity"]}}),
+        ("inventory (armor)", "inventory", {"inventory": [{"item": "chain-mail", "equipped": True}]}),
+    ]
+    print(f"\n{'write':22} {'nodes':>6} {'refresh us':>11} {'full us':>8}")
+    for label, column, values in changes:
+        character = SimpleNamespace(**dict(vars(base), **values))
+        _, nodes = refresh(base.derived, character, [column])
+        incremental = min(timeit.repeat(lambda: refresh(base.derived, character, [column]), number=ITERATIONS, repeat=3))
+        full = min(timeit.repeat(
+            lambda: materialize(character.stats, character.proficiencies, character.level, character.armor_class, character.inventory),
+            number=ITERATIONS, repeat=3
+        ))
+        print(f"{label:22} {len(nodes):>3}/{len(NODES):<2} {incremental * 1e6 / ITERATIONS:>11.2f} {full * 1e6 / ITERATIONS:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Odds lookups.
+
+Times the questions the odds endpoints answer, cold (caches cleared before
+every call) and warm (memoized), and checks the exact distributions against
+SAMPLES simulated rolls from backend.dice.
+
+    python -m backend.benchmarks.odds
+"""
+
+import timeit
+
+import numpy as np
+
+from backend import odds
+from backend.dice import compile_expression, roll_totals
+
+ITERATIONS = 2000
+SAMPLES = 1_000_000
+EXPRESSIONS = ["1d20adv+5", "4d6kh3", "8d6 fire + 1d8", "2d6-1d4"]
+
+
+def _clear():
+    odds.expression_distribution.cache_clear()
+    odds.attack_odds.cache_clear()
+    odds._dice_sum.cache_clear()
+    odds._kept_sum.cache_clear()
+
+
+def main():
+    generator = np.random.Generator(np.random.PCG64(0))
+    print(f"{'expression':16} {'exact mean':>11} {'sampled':>9}")
+    for expression in EXPRESSIONS:
+        exact = odds.distribution_for(expression).mean
+        sampled = roll_totals(compile_expression(expression), generator, SAMPLES).mean()
+        assert abs(exact - sampled) < 0.05, expression
+        print(f"{expression:16} {exact:>11.4f} {sampled:>9.4f}")
+
+    cases = [
+        ("check vs DC", lambda: odds.check_chance(5, 15, "adv")),
+        ("attack vs AC", lambda: odds.attack_odds(7, 16, None, "2d6 slashing", 4, 2)),
+        ("distribution 4d6kh3", lambda: odds.distribution_for("4d6kh3")),
+        ("distribution 8d6+1d8", lambda: odds.distribution_for("8d6 fire + 1d8")),
+    ]
+    print(f"\n{'case':22} {'cold us':>10} {'warm us':>10}")
+    for label, fn in cases:
+        cold = min(timeit.repeat(lambda: (_clear(), fn()), number=ITERATIONS // 10, repeat=3)) / (ITERATIONS // 10)
+        fn()
+        warm = min(timeit.repeat(fn, number=ITERATIONS, repeat=5)) / ITERATIONS
+        print(f"{label:22} {cold * 1e6:>10.2f} {warm * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
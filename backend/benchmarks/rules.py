@@ -0,0 +1,92 @@
+"""
+Microbenchmarks for the roll kernel.
+
+"legacy" replays the previous per-line math (string-keyed stat lookup,
+formula modifier, `name in list` proficiency scan, proficiency bonus per
+line); "kernel" compiles the character once and reads the compiled tables.
+Each case builds the rolls a full character sheet needs (18 skills,
+6 saves, 3 attack lines) and the output of both paths is checked to match.
+
+    python -m backend.benchmarks.rules
+"""
+
+import timeit
+
+from backend.game_data import (
+    ABILITIES, ABILITY_INDEX, SKILL_ABILITIES, SKILL_NAMES, attack_roll,
+    compile_character, skill_roll
+)
+
+ITERATIONS = 20000
+
+STATS = {
+    "strength": 16, "dexterity": 14, "constitution": 14,
+    "intelligence": 10, "wisdom": 12, "charisma": 8
+}
+PROFICIENCIES = {
+    "skills": ["Athletics", "Perception", "Intimidation", "Survival"],
+    "saves": ["strength", "constitution"]
+}
+LEVEL = 7
+
+
+def _legacy_modifier(score: int) -> int:
+    return (score - 10) // 2
+
+
+def _legacy_proficiency_bonus(level: int) -> int:
+    if level < 1:
+        return 2
+    return ((level - 1) // 4) + 2
+
+
+def legacy_sheet(stats: dict, proficiencies: dict, level: int) -> list:
+    rolls = []
+    for skill_name, ability in SKILL_ABILITIES.items():
+        ability_mod = _legacy_modifier(stats.get(ability, 10))
+        proficient = skill_name in proficiencies.get("skills", [])
+        bonus = _legacy_proficiency_bonus(level) if proficient else 0
+        rolls.append((ability_mod, proficient, bonus, ability_mod + bonus))
+    for ability in ABILITIES:
+        ability_mod = _legacy_modifier(stats.get(ability, 10))
+        proficient = ability in proficiencies.get("saves", [])
+        bonus = _legacy_proficiency_bonus(level) if proficient else 0
+        rolls.append((ability_mod, proficient, bonus, ability_mod + bonus))
+    for ability in ("strength", "dexterity", "dexterity"):
+        ability_mod = _legacy_modifier(stats.get(ability, 10))
+        bonus = _legacy_proficiency_bonus(level)
+        rolls.append((ability_mod, True, bonus, ability_mod + bonus))
+    return rolls
+
+
+def kernel_sheet(stats: dict, proficiencies: dict, level: int) -> list:
+    compiled = compile_character(stats, proficiencies, level)
+    return list(compiled.skills + compiled.saves) + [
+        attack_roll(compiled, ABILITY_INDEX[ability]) for ability in ("strength", "dexterity", "dexterity")
+    ]
+
+
+def kernel_single_skill(compiled, skill_index: int):
+    return skill_roll(compiled, skill_index)
+
+
+def main():
+    assert legacy_sheet(STATS, PROFICIENCIES, LEVEL) == kernel_sheet(STATS, PROFICIENCIES, LEVEL)
+
+    compiled = compile_character(STATS, PROFICIENCIES, LEVEL)
+    perception = SKILL_NAMES.index("Perception")
+    cases = [
+        ("full sheet, legacy", lambda: legacy_sheet(STATS, PROFICIENCIES, LEVEL)),
+        ("full sheet, kernel", lambda: kernel_sheet(STATS, PROFICIENCIES, LEVEL)),
+        ("compile_character", lambda: compile_character(STATS, PROFICIENCIES, LEVEL)),
+        ("one skill, precompiled", lambda: kernel_single_skill(compiled, perception)),
+    ]
+
+    print(f"{'case':26} {'us/call':>10}")
+    for label, fn in cases:
+        seconds = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+        print(f"{label:26} {seconds * 1e6 / ITERATIONS:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
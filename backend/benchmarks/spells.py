@@ -0,0 +1,65 @@
+"""
+Spell catalogue.
+
+Filters: the bitmask index (AND the masks, read off the set bits) against
+scanning every spell's fields, for the queries the endpoints answer.
+
+Payloads: the JSON size of a Wizard's spells document stored as catalogue
+ids, as names, and as the full spell entries clients used to ship around.
+
+    python -m backend.benchmarks.spells
+"""
+
+import json
+import timeit
+
+from backend.game_data import SRD
+from backend.spells import SPELLS, filter_mask, max_spell_level, preparable_mask, spell_entry, spell_ids
+
+ITERATIONS = 5000
+
+
+def scan(class_name=None, max_level=None, min_level=0, ritual=None):
+    return [
+        spell.id for spell in SRD.spells
+        if (class_name is None or class_name in spell.classes)
+        and (max_level is None or min_level <= spell.level <= max_level)
+        and (ritual is None or spell.ritual == ritual)
+    ]
+
+
+def main():
+    highest = max_spell_level("Wizard", 9)
+    queries = [
+        ("Wizard, preparable at 9", lambda: spell_ids(preparable_mask("Wizard", 9)),
+         lambda: scan("Wizard", highest, min_level=1)),
+        ("Cleric rituals", lambda: spell_ids(filter_mask("Cleric", ritual=True)),
+         lambda: scan("Cleric", ritual=True)),
+        ("cantrips", lambda: spell_ids(filter_mask(level=0)),
+         lambda: scan(max_level=0)),
+    ]
+    print(f"{len(SPELLS)} spells")
+    print(f"{'query':26} {'hits':>5} {'index us':>9} {'scan us':>8}")
+    for label, indexed, scanned in queries:
+        assert indexed() == scanned()
+        times = [
+            min(timeit.repeat(fn, number=ITERATIONS, repeat=3)) * 1e6 / ITERATIONS
+            for fn in (indexed, scanned)
+        ]
+        print(f"{label:26} {len(indexed()):>5} {times[0]:>9.2f} {times[1]:>8.2f}")
+
+    known = spell_ids(preparable_mask("Wizard", 9))[:24]
+    prepared = known[::2]
+    documents = [
+        ("ids", lambda ids: ids),
+        ("names", lambda ids: [SPELLS[i].name for i in ids]),
+        ("full entries", lambda ids: [spell_entry(SPELLS[i]) for i in ids]),
+    ]
+    print(f"\n{'spells stored as':26} {'bytes':>8}")
+    for label, encode in documents:
+        document = {"known": encode(known), "prepared": encode(prepared), "slots": {"1": 4, "2": 3, "3": 3, "4": 3, "5": 1}}
+        print(f"{label:26} {len(json.dumps(document, separators=(',', ':'))):>8}")
+
+
+if __name__ == "__main__":
+    main()
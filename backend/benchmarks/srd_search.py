@@ -0,0 +1,71 @@
+"""
+SRD full-text search.
+
+Builds the index into a temporary file, then times search() directly
+(per-query p50/p99 over REPEATS runs of each query) and through
+GET /api/srd/search, against a baseline that scans the raw SRD lines for
+every query word.
+
+    python -m backend.benchmarks.srd_search
+"""
+
+import os
+import tempfile
+import time
+
+from backend import srd_index
+from backend.benchmarks.harness import make_client, make_engine
+
+REPEATS = 200
+QUERIES = ["fireball", "grappled", "opportunity attack", "bag of hold", "fire resistance", "lich", "the"]
+
+
+def _percentiles(samples: list) -> tuple:
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1e3, samples[int(len(samples) * 0.99)] * 1e3
+
+
+def scan(lines: list, query: str) -> list:
+    """Baseline: every line containing all the query words"""
+    words = query.lower().split()
+    return [line for line in lines if all(word in line.lower() for word in words)]
+
+
+def main():
+    with open(srd_index.SRD_PATH, encoding="utf-8") as source:
+        lines = source.read().splitlines()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        srd_index.SRD_INDEX_PATH = os.path.join(tmp, "srd_index.db")
+        start = time.perf_counter()
+        sections = srd_index.build_index()
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        rebuilt = srd_index.ensure_index()
+        checked = time.perf_counter() - start
+        print(f"build: {sections} sections, {os.path.getsize(srd_index.SRD_INDEX_PATH) / 1e6:.1f} MB in {built:.2f}s; "
+              f"startup check {checked * 1e3:.1f} ms (rebuilt: {rebuilt})")
+
+        client = make_client(make_engine())
+        print(f"\n{'query':20} {'hits':>5} {'p50 ms':>7} {'p99 ms':>7} {'http p50':>9} {'scan ms':>8}")
+        for query in QUERIES:
+            hits = len(srd_index.search(query, srd_index.SRD_SEARCH_MAX_RESULTS))
+            direct = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                srd_index.search(query)
+                direct.append(time.perf_counter() - start)
+            http = []
+            for _ in range(REPEATS // 4):
+                start = time.perf_counter()
+                client.get("/api/srd/search", params={"q": query})
+                http.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            scan(lines, query)
+            scanned = time.perf_counter() - start
+            p50, p99 = _percentiles(direct)
+            print(f"{query:20} {hits:>5} {p50:>7.3f} {p99:>7.3f} {_percentiles(http)[0]:>9.3f} {scanned * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Startup cost of the SRD-derived game data.
+
+In-process: compiling the SRD with the streaming parser, against loading
+the cached artefact (SRD hash check plus unpickling).
+
+Cold processes: `import backend.game_data` and `import backend.main` in a
+fresh interpreter, first with no artefact (it gets compiled and written)
+and then with the artefact in place.
+
+    python -m backend.benchmarks.startup
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from backend.srd_data import build_srd_data, compile_srd, load_srd_data
+from backend.srd_index import SRD_PATH, srd_hash
+
+REPEATS = 20
+COLD_RUNS = 5
+IMPORT_TIMER = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def _cold_import(module: str, artefact: str) -> float:
+    env = dict(os.environ, SRD_DATA_PATH=artefact, PYTHONDONTWRITEBYTECODE="")
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_TIMER.format(module=module)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _compile() -> None:
+    with open(SRD_PATH, encoding="utf-8") as source:
+        compile_srd(source)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        artefact = os.path.join(tmp, "srd_data.pickle")
+        build_srd_data(artefact_path=artefact)
+        assert load_srd_data(artefact_path=artefact)._replace(srd_sha256="") == compile_srd(open(SRD_PATH, encoding="utf-8"))
+
+        print(f"{'in process':28} {'ms':>8}")
+        for label, fn in (
+            ("compile SRD (parse)", _compile),
+            ("hash SRD", lambda: srd_hash(SRD_PATH)),
+            ("load artefact (hash+load)", lambda: load_srd_data(artefact_path=artefact)),
+        ):
+            print(f"{label:28} {min(timeit.repeat(fn, number=1, repeat=REPEATS)) * 1e3:>8.2f}")
+        print(f"artefact size: {os.path.getsize(artefact) / 1024:.1f} KiB")
+
+        print(f"\n{'cold import':28} {'no artefact ms':>15} {'artefact ms':>12}")
+        for module in ("backend.game_data", "backend.main"):
+            missing, cached = [], []
+            for _ in range(COLD_RUNS):
+                os.remove(artefact)
+                missing.append(_cold_import(module, artefact))
+                cached.append(_cold_import(module, artefact))
+            print(f"{module:28} {min(missing) * 1e3:>15.1f} {min(cached) * 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+PUT /api/characters/{id} throughput.
+
+"orm" replays the previous update path (load, setattr, commit, refresh,
+reload) against the same database; "returning" is the current
+single-statement UPDATE ... RETURNING path. Both are measured at the session
+level and, for the current path, end to end through the router.
+
+    python -m backend.benchmarks.update
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.benchmarks.harness import QueryCounter, make_client, make_engine, seed_characters
+from backend.models import Character
+from backend.routers.characters import _character_detail, _update_returning
+
+ITERATIONS = 2000
+
+
+def orm_update(db, character_id: int, user_id: int, values: dict):
+    character = db.query(Character).filter(Character.id == character_id, Character.user_id == user_id).first()
+    for field, value in values.items():
+        setattr(character, field, value)
+    db.commit()
+    db.refresh(character)
+    character = db.query(Character).filter(Character.id == character_id, Character.user_id == user_id).first()
+    return _character_detail(character)
+
+
+def returning_update(db, character_id: int, user_id: int, values: dict):
+    row = db.execute(_update_returning(character_id, user_id, values)).first()
+    db.commit()
+    return _character_detail(row)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        counter = QueryCounter(engine)
+        character_id = seed_characters(engine, 10)[0]
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'path':22} {'stmts/PUT':>9} {'PUT/s':>8}")
+        for label, fn in (("orm (session)", orm_update), ("returning (session)", returning_update)):
+            db = Session()
+            with counter.measure() as queries:
+                start = time.perf_counter()
+                for i in range(ITERATIONS):
+                    fn(db, character_id, 1, {"hp_current": i % 40, "temp_hp": i % 5})
+                elapsed = time.perf_counter() - start
+            db.close()
+            print(f"{label:22} {queries['queries'] / ITERATIONS:>9.2f} {ITERATIONS / elapsed:>8.0f}")
+
+        client = make_client(engine)
+        client.get("/api/characters/")  # warm the identity cache
+        with counter.measure() as queries:
+            start = time.perf_counter()
+            for i in range(ITERATIONS):
+                assert client.put(f"/api/characters/{character_id}", json={"hp_current": i % 40}).status_code == 200
+            elapsed = time.perf_counter() - start
+        print(f"{'returning (HTTP PUT)':22} {queries['queries'] / ITERATIONS:>9.2f} {ITERATIONS / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
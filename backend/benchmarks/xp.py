@@ -0,0 +1,62 @@
+"""
+Party XP awards.
+
+"per character" replays the manual flow the endpoint replaces: for each
+character, GET the character, PUT xp/level/HP/hit dice, GET the sheet.
+"award" is one POST /api/characters/xp for the whole party. Each round
+awards enough XP to cross a level threshold.
+
+    python -m backend.benchmarks.xp
+"""
+
+import os
+import tempfile
+import time
+
+from backend.benchmarks.harness import QueryCounter, make_client, make_engine, seed_characters
+from backend.game_data import XP_THRESHOLDS, calc_hp_per_level, calc_modifier, level_for_xp
+
+PARTY_SIZES = (4, 8, 32)
+ROUNDS = 5
+
+
+def per_character(client, character_ids: list, xp: int):
+    for character_id in character_ids:
+        character = client.get(f"/api/characters/{character_id}").json()
+        total_xp = character["xp"] + xp
+        level = max(character["level"], level_for_xp(total_xp))
+        gained = level - character["level"]
+        hp_gained = gained * max(1, calc_hp_per_level(character["class_name"], calc_modifier(character["stats"].get("constitution", 10))))
+        client.put(f"/api/characters/{character_id}", json={
+            "xp": total_xp, "level": level,
+            "hp_max": character["hp_max"] + hp_gained, "hp_current": character["hp_current"] + hp_gained,
+            "hit_dice_max": character["hit_dice_max"] + gained, "hit_dice_current": character["hit_dice_current"] + gained
+        })
+        client.get(f"/api/characters/{character_id}/sheet")
+
+
+def award(client, character_ids: list, xp: int):
+    client.post("/api/characters/xp", json={"character_ids": character_ids, "xp": xp})
+
+
+def main():
+    print(f"{'party':>5} {'path':15} {'stmts/award':>12} {'ms/award':>9}")
+    for size in PARTY_SIZES:
+        for label, fn in (("per character", per_character), ("award", award)):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+                counter = QueryCounter(engine)
+                character_ids = seed_characters(engine, size)
+                client = make_client(engine)
+                client.get("/api/characters/")  # warm the identity cache
+                with counter.measure() as queries:
+                    start = time.perf_counter()
+                    for round_number in range(ROUNDS):
+                        fn(client, character_ids, XP_THRESHOLDS[round_number + 1] - XP_THRESHOLDS[round_number])
+                    elapsed = time.perf_counter() - start
+                engine.dispose()
+            print(f"{size:>5} {label:15} {queries['queries'] / ROUNDS:>12.1f} {elapsed * 1000 / ROUNDS:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Bulk character creation from the command line.
+
+Reads character definitions (the POST /api/characters/ body: name, species,
+class_name, background, level, stats, skill_choices) from a JSON array or
+NDJSON file and creates them for one user with the same derivation and
+batched inserts as POST /api/characters/bulk. The user is created if the
+email is new.
+
+    python -m backend.bulk_import FILE --user EMAIL
+"""
+
+import argparse
+import json
+import sys
+
+from sqlalchemy import select
+
+from backend.database import SessionLocal
+from backend.models import User
+from backend.routers.characters import _bulk_create
+
+
+def read_definitions(path: str) -> list:
+    """A JSON array, or one JSON object per line"""
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as handle:
+        text = handle.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.bulk_import", description="Create characters in bulk")
+    parser.add_argument("file", help="JSON array or NDJSON of character definitions, or - for stdin")
+    parser.add_argument("--user", required=True, help="Owner email (created if missing)")
+    args = parser.parse_args(argv)
+
+    definitions = read_definitions(args.file)
+    db = SessionLocal()
+    try:
+        user_id = db.execute(select(User.id).where(User.email == args.user)).scalar()
+        if user_id is None:
+            user = User(email=args.user)
+            db.add(user)
+            db.commit()
+            user_id = user.id
+        result = _bulk_create(db, definitions, user_id)
+    finally:
+        db.close()
+
+    for row in result["results"]:
+        if "error" in row:
+            print(f"#{row['index']}: {row['error']}", file=sys.stderr)
+    print(f"Created {result['created']} character(s), {result['failed']} failed", file=sys.stderr)
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
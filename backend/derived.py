@@ -0,0 +1,213 @@
+"""
+Batch derived stats.
+
+Packs many characters into NumPy arrays (one row per character) and
+computes ability modifiers, proficiency bonus, the 18 skill totals, the 6
+saves, AC and attack bonuses as array operations. Results are identical to
+compile_character() and the per-character endpoints; characters whose
+scores or level aren't plain integers (which the per-character path would
+serialize differently) are compiled one at a time instead.
+
+Summary AC matches the per-character endpoints too: rows may carry the
+materialized `equipped_armor_class`, or the `inventory` to compute it
+from; rows with neither get base AC + Dex.
+"""
+
+from typing import List, NamedTuple
+
+import numpy as np
+
+from backend.game_data import (
+    ABILITIES, ABILITY_INDEX, SKILL_ABILITY_INDEX, SKILL_BITS, SKILL_NAMES, SAVE_BITS,
+    CompiledCharacter, attack_roll, compile_character, proficiency_mask, save_roll, skill_roll
+)
+from backend.equipment import equipped_armor_class
+
+SKILL_ABILITY_COLUMNS = np.array(SKILL_ABILITY_INDEX, dtype=np.int64)
+SKILL_SHIFTS = np.arange(len(SKILL_NAMES), dtype=np.int64)
+SAVE_SHIFTS = np.arange(len(ABILITIES), dtype=np.int64)
+STRENGTH = ABILITY_INDEX["strength"]
+DEXTERITY = ABILITY_INDEX["dexterity"]
+
+# Below this many characters packing costs more than it saves (see
+# backend/benchmarks/derived.py); small batches use the scalar kernel.
+BATCH_MIN_SIZE = 32
+
+
+class DerivedStats(NamedTuple):
+    """Derived values for a batch, each array has one row per packed character"""
+    modifiers: np.ndarray           # (n, 6)
+    proficiency_bonus: np.ndarray   # (n,)
+    skill_proficient: np.ndarray    # (n, 18) bool
+    skill_totals: np.ndarray        # (n, 18)
+    save_proficient: np.ndarray     # (n, 6) bool
+    save_totals: np.ndarray         # (n, 6)
+    attack_bonus: np.ndarray        # (n, 6) proficient attack per ability
+    armor_class: np.ndarray         # (n,)
+
+
+def derive(scores: np.ndarray, levels: np.ndarray, skill_masks: np.ndarray,
+           save_masks: np.ndarray, base_armor_class: np.ndarray) -> DerivedStats:
+    """Compute every derived value for packed (n, 6) scores and (n,) levels/masks/AC"""
+    modifiers = (scores - 10) // 2
+    proficiency_bonus = np.where(levels < 1, 2, (levels - 1) // 4 + 2)
+    bonus = proficiency_bonus[:, None]
+
+    skill_proficient = (skill_masks[:, None] >> SKILL_SHIFTS) & 1 == 1
+    save_proficient = (save_masks[:, None] >> SAVE_SHIFTS) & 1 == 1
+
+    return DerivedStats(
+        modifiers=modifiers,
+        proficiency_bonus=proficiency_bonus,
+        skill_proficient=skill_proficient,
+        skill_totals=modifiers[:, SKILL_ABILITY_COLUMNS] + skill_proficient * bonus,
+        save_proficient=save_proficient,
+        save_totals=modifiers + save_proficient * bonus,
+        attack_bonus=modifiers + bonus,
+        armor_class=base_armor_class + modifiers[:, DEXTERITY]
+    )
+
+
+def _is_packable(character) -> bool:
+    stats = character.stats or {}
+    armor_class = getattr(character, "armor_class", None)
+    return (
+        type(character.level) is int
+        and (armor_class is None or type(armor_class) is int)
+        and all(type(stats.get(ability, 10)) is int for ability in ABILITIES)
+    )
+
+
+def pack(characters: list):
+    """
+    Split characters into a derived batch and the ones that need the scalar
+    path. Returns (derived, packed_positions, scalar_positions) where
+    positions index into `characters`.
+    """
+    packed, scalar = [], []
+    if len(characters) < BATCH_MIN_SIZE:
+        scalar = list(range(len(characters)))
+    else:
+        for position, character in enumerate(characters):
+            (packed if _is_packable(character) else scalar).append(position)
+
+    rows = [characters[position] for position in packed]
+    scores = np.array(
+        [[(row.stats or {}).get(ability, 10) for ability in ABILITIES] for row in rows],
+        dtype=np.int64
+    ).reshape(len(rows), len(ABILITIES))
+    proficiencies = [row.proficiencies or {} for row in rows]
+    derived = derive(
+        scores,
+        np.array([row.level for row in rows], dtype=np.int64),
+        np.array([proficiency_mask(p.get("skills"), SKILL_BITS) for p in proficiencies], dtype=np.int64),
+        np.array([proficiency_mask(p.get("saves"), SAVE_BITS) for p in proficiencies], dtype=np.int64),
+        np.array([getattr(row, "armor_class", None) or 10 for row in rows], dtype=np.int64)
+    )
+    return derived, packed, scalar
+
+
+def _compile_scalar(character) -> CompiledCharacter:
+    return compile_character(character.stats, character.proficiencies, character.level)
+
+
+def _column(derived: DerivedStats, kind: str, index: int) -> tuple:
+    """(ability_modifier, proficient, proficiency_bonus_applied, total) arrays for one roll"""
+    bonus = derived.proficiency_bonus
+    if kind == "skill":
+        proficient = derived.skill_proficient[:, index]
+        return (derived.modifiers[:, SKILL_ABILITY_INDEX[index]], proficient,
+                proficient * bonus, derived.skill_totals[:, index])
+    if kind == "save":
+        proficient = derived.save_proficient[:, index]
+        return derived.modifiers[:, index], proficient, proficient * bonus, derived.save_totals[:, index]
+    # Assume proficient with equipped weapons
+    return (derived.modifiers[:, index], np.ones(len(bonus), dtype=bool),
+            bonus, derived.attack_bonus[:, index])
+
+
+def roll_table(characters: list, rolls: list) -> List[list]:
+    """
+    Roll tuples for every (character, roll) pair, in input order. `rolls`
+    is a list of ("skill", skill_index), ("save", ability_index) or
+    ("attack", ability_index); each row matches skill_roll/save_roll/
+    attack_roll on the compiled character.
+    """
+    derived, packed, scalar = pack(characters)
+    table = [None] * len(characters)
+
+    if packed and rolls:
+        columns = [_column(derived, kind, index) for kind, index in rolls]
+        parts = [np.stack(part, axis=1).tolist() for part in zip(*columns)]
+        for row, position in enumerate(packed):
+            table[position] = list(zip(*(part[row] for part in parts)))
+    else:
+        for position in packed:
+            table[position] = []
+
+    kernels = {"skill": skill_roll, "save": save_roll, "attack": attack_roll}
+    for position in scalar:
+        compiled = _compile_scalar(characters[position])
+        table[position] = [kernels[kind](compiled, index) for kind, index in rolls]
+    return table
+
+
+def _armor_class(character, dex_modifier: int, unarmored: int) -> int:
+    """AC with equipped armor and Shield, as the detail and sheet endpoints report it"""
+    materialized = getattr(character, "equipped_armor_class", None)
+    if materialized is not None:
+        return materialized
+    inventory = getattr(character, "inventory", None)
+    if not inventory:
+        return unarmored
+    return equipped_armor_class(inventory, dex_modifier, character.armor_class, character.proficiencies)
+
+
+def _summary(character, modifiers, bonus, armor_class, skill_totals, save_totals, attack_bonus) -> dict:
+    return {
+        "id": character.id,
+        "name": character.name,
+        "level": character.level,
+        "proficiency_bonus": bonus,
+        "armor_class": armor_class,
+        "modifiers": dict(zip(ABILITIES, modifiers)),
+        "skills": dict(zip(SKILL_NAMES, skill_totals)),
+        "saves": dict(zip(ABILITIES, save_totals)),
+        "attacks": {
+            "melee": attack_bonus[STRENGTH],
+            "ranged": attack_bonus[DEXTERITY],
+            "finesse": attack_bonus[DEXTERITY]
+        }
+    }
+
+
+def derived_summaries(characters: list) -> List[dict]:
+    """Dashboard rows (modifiers, skill/save totals, AC, attack bonuses), in input order"""
+    derived, packed, scalar = pack(characters)
+    summaries = [None] * len(characters)
+
+    columns = zip(
+        derived.modifiers.tolist(), derived.proficiency_bonus.tolist(), derived.armor_class.tolist(),
+        derived.skill_totals.tolist(), derived.save_totals.tolist(), derived.attack_bonus.tolist()
+    )
+    for position, (modifiers, bonus, armor_class, *rest) in zip(packed, columns):
+        character = characters[position]
+        armor_class = _armor_class(character, modifiers[DEXTERITY], armor_class)
+        summaries[position] = _summary(character, modifiers, bonus, armor_class, *rest)
+
+    for position in scalar:
+        character = characters[position]
+        compiled = _compile_scalar(character)
+        summaries[position] = _summary(
+            character,
+            compiled.modifiers,
+            compiled.proficiency_bonus,
+            _armor_class(
+                character, compiled.modifiers[DEXTERITY],
+                (getattr(character, "armor_class", None) or 10) + compiled.modifiers[DEXTERITY]
+            ),
+            [roll[3] for roll in compiled.skills],
+            [roll[3] for roll in compiled.saves],
+            [roll[3] for roll in compiled.attacks]
+        )
+    return summaries
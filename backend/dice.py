@@ -0,0 +1,262 @@
+"""
+Dice expressions.
+
+Parses expressions such as `2d6+3`, `1d20adv+5`, `4d6kh3` and
+`8d6 fire + 1d8` into immutable term tuples (memoized, so a hot expression
+is parsed once) and rolls them with NumPy PCG64 generators. Bulk rolls are
+vectorized: each term draws a (times, count) block of dice in one call.
+
+Streams are kept per session key. A stream created from a seed replays
+the same results for the same sequence of calls.
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from backend.identity import TTLCache
+
+DICE_CACHE_SIZE = int(os.getenv("DICE_CACHE_SIZE", "1024"))
+DICE_STREAM_CACHE_SIZE = int(os.getenv("DICE_STREAM_CACHE_SIZE", "4096"))
+DICE_STREAM_TTL = float(os.getenv("DICE_STREAM_TTL", "3600"))
+
+MAX_TERMS = 20
+MAX_DICE_PER_TERM = 1000
+MAX_SIDES = 1000
+MAX_DICE_PER_REQUEST = 10_000_000
+
+
+class DiceError(ValueError):
+    """The expression can't be parsed or exceeds the limits"""
+
+
+class DiceTerm(NamedTuple):
+    """`count` dice with `sides` faces (sides == 0 for a constant), keeping `keep` of them"""
+    sign: int
+    count: int
+    sides: int
+    keep: int
+    keep_highest: bool
+    damage_type: Optional[str]
+    text: str
+
+
+class DiceExpression(NamedTuple):
+    text: str
+    terms: tuple
+
+    @property
+    def dice_count(self) -> int:
+        return sum(term.count for term in self.terms if term.sides)
+
+
+# ============== PARSER ==============
+
+_TERM = re.compile(
+    r"\s*(?P<sign>[+-])?\s*"
+    r"(?:(?P<count>\d*)d(?P<sides>\d+|%)(?P<mod>adv|dis|k[hl]\d+)?|(?P<constant>\d+))"
+    r"(?:\s+(?P<type>[a-z]+)(?![a-z]*d\d))?\s*"
+)
+
+
+def _term(match) -> DiceTerm:
+    sign = -1 if match["sign"] == "-" else 1
+    damage_type = match["type"]
+    if match["constant"] is not None:
+        value = int(match["constant"])
+        return DiceTerm(sign, value, 0, value, True, damage_type, match["constant"])
+
+    count = int(match["count"] or 1)
+    sides = 100 if match["sides"] == "%" else int(match["sides"])
+    if not 1 <= count <= MAX_DICE_PER_TERM:
+        raise DiceError(f"Dice count must be 1-{MAX_DICE_PER_TERM}")
+    if not 1 <= sides <= MAX_SIDES:
+        raise DiceError(f"Dice sides must be 1-{MAX_SIDES}")
+
+    text = f"{count}d{sides}"
+    keep, keep_highest = count, True
+    mod = match["mod"]
+    if mod in ("adv", "dis"):
+        if count != 1:
+            raise DiceError("adv/dis applies to a single die, e.g. 1d20adv")
+        # Advantage is 2dXkh1, disadvantage 2dXkl1
+        count, keep, keep_highest = 2, 1, mod == "adv"
+        text += mod
+    elif mod:
+        keep, keep_highest = int(mod[2:]), mod[1] == "h"
+        if not 1 <= keep <= count:
+            raise DiceError(f"Can't keep {keep} of {count} dice")
+        text += mod
+    return DiceTerm(sign, count, sides, keep, keep_highest, damage_type, text)
+
+
+@lru_cache(maxsize=DICE_CACHE_SIZE)
+def _compile(text: str) -> DiceExpression:
+    terms = []
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if match is None or match.end() == position:
+            raise DiceError(f"Can't parse dice expression at: {text[position:]!r}")
+        if terms and match["sign"] is None:
+            raise DiceError(f"Expected + or - before: {match.group().strip()!r}")
+        terms.append(_term(match))
+        position = match.end()
+    if not terms:
+        raise DiceError("Empty dice expression")
+    if len(terms) > MAX_TERMS:
+        raise DiceError(f"At most {MAX_TERMS} terms")
+    return DiceExpression(text, tuple(terms))
+
+
+def compile_expression(expression: str) -> DiceExpression:
+    """Parse an expression (memoized on its normalized text)"""
+    return _compile(" ".join(expression.lower().split()))
+
+
+def check_expression(modifier: int, mode: Optional[str] = None) -> DiceExpression:
+    """d20 check with advantage ("adv"), disadvantage ("dis") or neither"""
+    return compile_expression(f"1d20{mode or ''}{int(modifier):+d}")
+
+
+@lru_cache(maxsize=DICE_CACHE_SIZE)
+def critical(expression: DiceExpression) -> DiceExpression:
+    """
+    Critical-hit damage: every die is rolled twice as many times, constants
+    unchanged. Plain terms double their dice; a term that keeps some of its
+    dice (4d6kh3) is rolled twice over, as two independent copies.
+    """
+    terms = []
+    for term in expression.terms:
+        if not term.sides:
+            terms.append(term)
+        elif term.keep == term.count:
+            terms.append(term._replace(count=term.count * 2, keep=term.keep * 2, text=f"{term.count * 2}d{term.sides}"))
+        else:
+            terms.extend((term, term))
+    return DiceExpression(f"crit({expression.text})", tuple(terms))
+
+
+# ============== ROLLING ==============
+
+def _kept(term: DiceTerm, dice: np.ndarray) -> np.ndarray:
+    if term.keep == term.count:
+        return dice
+    ordered = np.sort(dice, axis=1)
+    return ordered[:, -term.keep:] if term.keep_highest else ordered[:, :term.keep]
+
+
+def check_dice_budget(expression: DiceExpression, times: int):
+    """Raise DiceError if rolling the expression `times` times needs too many dice"""
+    if expression.dice_count * times > MAX_DICE_PER_REQUEST:
+        raise DiceError(f"At most {MAX_DICE_PER_REQUEST} dice per request")
+
+
+def roll_totals(expression: DiceExpression, generator: np.random.Generator, times: int) -> np.ndarray:
+    """Totals of `times` independent rolls, as an int64 array"""
+    check_dice_budget(expression, times)
+    totals = np.zeros(times, dtype=np.int64)
+    for term in expression.terms:
+        if not term.sides:
+            totals += term.sign * term.count
+            continue
+        dice = generator.integers(1, term.sides + 1, size=(times, term.count), dtype=np.int64)
+        totals += term.sign * _kept(term, dice).sum(axis=1)
+    return totals
+
+
+def roll(expression: DiceExpression, generator: np.random.Generator) -> dict:
+    """One roll with every die shown: total, per-term dice and kept dice, and totals per damage type"""
+    terms = []
+    by_type = {}
+    total = 0
+    for term in expression.terms:
+        if term.sides:
+            dice = generator.integers(1, term.sides + 1, size=(1, term.count), dtype=np.int64)
+            kept = _kept(term, dice)[0].tolist()
+            rolls = dice[0].tolist()
+            subtotal = term.sign * sum(kept)
+        else:
+            rolls, kept, subtotal = [], [], term.sign * term.count
+        total += subtotal
+        if term.damage_type:
+            by_type[term.damage_type] = by_type.get(term.damage_type, 0) + subtotal
+        terms.append({
+            "term": ("-" if term.sign < 0 else "+") + term.text,
+            "rolls": rolls,
+            "kept": kept,
+            "subtotal": subtotal,
+            "type": term.damage_type
+        })
+    return {"expression": expression.text, "total": total, "terms": terms, "by_type": by_type}
+
+
+# ============== STREAMS ==============
+
+class DiceStream:
+    """A PCG64 generator plus the lock that serializes draws from it"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self.lock = threading.Lock()
+
+
+class DiceStreams:
+    """Per-session streams, LRU-bounded and expiring after DICE_STREAM_TTL idle seconds"""
+
+    def __init__(self, maxsize: int = DICE_STREAM_CACHE_SIZE, ttl: float = DICE_STREAM_TTL):
+        self._streams = TTLCache(maxsize, ttl)
+
+    def get(self, key) -> DiceStream:
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = DiceStream()
+            self._streams.set(key, stream)
+        return stream
+
+    def reseed(self, key, seed: Optional[int]) -> DiceStream:
+        stream = DiceStream(seed)
+        self._streams.set(key, stream)
+        return stream
+
+
+dice_streams = DiceStreams()
+
+
+def stream_for(key, seed: Optional[int] = None) -> DiceStream:
+    """The session's stream, or a one-off stream when `seed` is given"""
+    return DiceStream(seed) if seed is not None else dice_streams.get(key)
+
+
+# ============== CHECKS ==============
+
+def roll_check(modifier: int, mode: Optional[str], generator: np.random.Generator) -> dict:
+    """Roll a d20 check: kept d20, both dice under adv/dis, total and natural 20/1 flags"""
+    result = roll(check_expression(modifier, mode), generator)
+    d20 = result["terms"][0]
+    natural = d20["kept"][0]
+    return {
+        "expression": result["expression"],
+        "rolls": d20["rolls"],
+        "natural": natural,
+        "total": result["total"],
+        "critical": natural == 20,
+        "fumble": natural == 1
+    }
+
+
+def roll_damage(expression: str, modifier: int, is_critical: bool, generator: np.random.Generator) -> dict:
+    """Roll weapon damage plus the ability modifier (credited to the first term's damage type)"""
+    compiled = compile_expression(expression)
+    result = roll(critical(compiled) if is_critical else compiled, generator)
+    result["modifier"] = modifier
+    result["total"] += modifier
+    damage_type = compiled.terms[0].damage_type
+    if damage_type:
+        result["by_type"][damage_type] += modifier
+    return result
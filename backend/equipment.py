@@ -0,0 +1,286 @@
+"""
+Equipment catalogue and inventory engine.
+
+The SRD items (compiled by backend.srd_data: coins, weapons, armor, tools,
+adventuring gear, ammunition and spellcasting foci) are held in memory,
+keyed by item_key ("chain-mail"), with per-category key lists.
+
+Character.inventory is a list of entries referencing the catalogue:
+
+    [{"item": "longsword", "equipped": true},
+     {"item": "chain-mail", "equipped": true},
+     {"item": "arrows", "quantity": 40},
+     {"item": "gp", "quantity": 35},
+     {"name": "Lucky Pebble", "weight": 0.1}]
+
+An entry may use "name" instead of "item" (a plain string is a name);
+names resolve through item_key(), and entries that don't match an item
+count as custom, weighing their "weight" per unit if they give one.
+
+resolve_inventory() reduces an inventory to what the rules read from it
+(total weight and coin value, equipped armor and shield, weapons carried)
+and inventory_summary() combines that with a character's scores into
+carried weight, encumbrance, AC and one attack line per weapon. Both are
+memoized on the inventory's canonical JSON, so repeated sheet reads of an
+unchanged inventory are dictionary lookups. Cached results are shared:
+don't modify them.
+"""
+
+import json
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from backend.game_data import ABILITY_INDEX, SRD
+from backend.srd_data import item_key
+
+INVENTORY_CACHE_SIZE = 4096
+CARRY_MULTIPLIER = 15           # Small/Medium: Str x 15 lb. carried
+DRAG_MULTIPLIER = 30            # Str x 30 lb. dragged, lifted or pushed
+HEAVY_ARMOR_SPEED_PENALTY = 10
+
+ITEMS = MappingProxyType({item.key: item for item in SRD.items})
+ITEMS_BY_CATEGORY = MappingProxyType({
+    category: tuple(item.key for item in SRD.items if item.category == category)
+    for category in dict.fromkeys(item.category for item in SRD.items)
+})
+
+STRENGTH = ABILITY_INDEX["strength"]
+DEXTERITY = ABILITY_INDEX["dexterity"]
+
+
+def find_item(reference) -> Optional[object]:
+    """Catalogue item for a key or (case-insensitive) name, or None"""
+    if not isinstance(reference, str):
+        return None
+    return ITEMS.get(reference) or ITEMS.get(item_key(reference))
+
+
+# ============== INVENTORY RESOLUTION ==============
+
+class InventoryEntry(NamedTuple):
+    item: Optional[object]      # Catalogue Item, None for custom entries
+    name: str
+    quantity: int
+    equipped: bool
+    weight: float               # Total for the entry, in pounds
+
+
+class ResolvedInventory(NamedTuple):
+    entries: tuple
+    weight: float
+    coins_cp: int               # Value of the coins carried
+    armor: Optional[object]     # Equipped body armor (the first, if several are marked)
+    shield: Optional[object]
+    weapons: tuple              # InventoryEntry per weapon carried
+    unknown: tuple              # Names of entries not in the catalogue
+
+
+def _quantity(value) -> int:
+    return value if type(value) is int and value >= 0 else 1
+
+
+def _entry(raw) -> InventoryEntry:
+    if isinstance(raw, str):
+        raw = {"name": raw}
+    if not isinstance(raw, dict):
+        return InventoryEntry(None, str(raw), 1, False, 0.0)
+    reference = raw.get("item") or raw.get("name")
+    item = find_item(reference)
+    quantity = _quantity(raw.get("quantity", 1))
+    if item is not None:
+        weight = (item.weight or 0.0) * quantity / item.amount
+    else:
+        unit = raw.get("weight")
+        weight = unit * quantity if isinstance(unit, (int, float)) and not isinstance(unit, bool) else 0.0
+    name = item.name if item is not None else str(raw.get("name") or reference or "")
+    return InventoryEntry(item, name, quantity, raw.get("equipped") is True, weight)
+
+
+def _canonical(inventory) -> str:
+    return json.dumps(inventory or [], sort_keys=True, separators=(",", ":"), default=str)
+
+
+@lru_cache(maxsize=INVENTORY_CACHE_SIZE)
+def _resolve(canonical: str) -> ResolvedInventory:
+    entries = tuple(_entry(raw) for raw in json.loads(canonical))
+    armor = shield = None
+    for entry in entries:
+        if entry.item is None or entry.item.armor is None or not entry.equipped:
+            continue
+        if entry.item.armor.category == "Shield":
+            shield = shield or entry.item
+        else:
+            armor = armor or entry.item
+    return ResolvedInventory(
+        entries=entries,
+        weight=round(sum((entry.weight for entry in entries), 0.0), 2),
+        coins_cp=sum(entry.item.cost_cp * entry.quantity for entry in entries if entry.item and entry.item.category == "coin"),
+        armor=armor,
+        shield=shield,
+        weapons=tuple(entry for entry in entries if entry.item is not None and entry.item.weapon is not None),
+        unknown=tuple(entry.name for entry in entries if entry.item is None),
+    )
+
+
+def resolve_inventory(inventory) -> ResolvedInventory:
+    """Catalogue view of an inventory (memoized per distinct inventory)"""
+    return _resolve(_canonical(inventory))
+
+
+# ============== ARMOR CLASS ==============
+
+def _armor_class(resolved: ResolvedInventory, dex_modifier: int, base_armor_class: Optional[int], armor_training: tuple) -> int:
+    if resolved.armor is None:
+        armor_class = (base_armor_class or 10) + dex_modifier
+    else:
+        stats = resolved.armor.armor
+        dex = dex_modifier if stats.dex_cap is None else min(dex_modifier, stats.dex_cap)
+        armor_class = stats.armor_class + dex
+    # A Shield only helps those trained with it
+    if resolved.shield is not None and "shields" in armor_training:
+        armor_class += resolved.shield.armor.armor_class
+    return armor_class
+
+
+def _training(item) -> str:
+    """The armor training an armor item needs ("heavy", "shields")"""
+    return "shields" if item.armor.category == "Shield" else item.armor.category.lower()
+
+
+def _armor_training(proficiencies) -> tuple:
+    return tuple(str(name).lower() for name in ((proficiencies or {}).get("armor") or ()))
+
+
+def equipped_armor_class(inventory, dex_modifier: int, base_armor_class: Optional[int], proficiencies) -> int:
+    """
+    AC from equipped armor (base AC plus Dex, capped by the armor) and
+    Shield, or base_armor_class + Dex when no armor is equipped
+    """
+    return _armor_class(resolve_inventory(inventory), dex_modifier, base_armor_class, _armor_training(proficiencies))
+
+
+# ============== CHARACTER SUMMARY ==============
+
+class EquipmentInputs(NamedTuple):
+    """The character values the summary depends on besides the inventory"""
+    strength: int               # Score
+    modifiers: tuple            # In ABILITIES order
+    proficiency_bonus: int
+    weapon_training: tuple      # Lowercase: "simple", "martial", "martial_finesse_light", weapon names
+    armor_training: tuple       # Lowercase: "light", "medium", "heavy", "shields"
+    base_armor_class: Optional[int]
+    speed: int
+
+
+def equipment_inputs(character, modifiers, proficiency_bonus: int) -> EquipmentInputs:
+    proficiencies = character.proficiencies or {}
+    strength = (character.stats or {}).get("strength", 10)
+    return EquipmentInputs(
+        strength=strength if type(strength) is int else 10,
+        modifiers=tuple(modifiers),
+        proficiency_bonus=proficiency_bonus,
+        weapon_training=tuple(str(name).lower() for name in (proficiencies.get("weapons") or ())),
+        armor_training=_armor_training(proficiencies),
+        base_armor_class=character.armor_class,
+        speed=character.speed or 30,
+    )
+
+
+def _weapon_proficient(item, training: tuple) -> bool:
+    weapon = item.weapon
+    category = weapon.category.lower()
+    if category in training or item.name.lower() in training or item.key in training:
+        return True
+    # "martial_finesse_light": Martial weapons with the Finesse or Light property
+    properties = {name.lower() for name in weapon.properties}
+    return any(
+        entry.startswith(category + "_") and properties.intersection(entry.split("_")[1:])
+        for entry in training
+    )
+
+
+def _damage(die: str, modifier: int) -> str:
+    return f"{die}{modifier:+d}" if modifier else die
+
+
+def _attack_line(entry: InventoryEntry, inputs: EquipmentInputs) -> dict:
+    weapon = entry.item.weapon
+    strength, dexterity = inputs.modifiers[STRENGTH], inputs.modifiers[DEXTERITY]
+    if "Finesse" in weapon.properties:
+        ability, modifier = ("dexterity", dexterity) if dexterity > strength else ("strength", strength)
+    elif weapon.ranged:
+        ability, modifier = "dexterity", dexterity
+    else:
+        ability, modifier = "strength", strength
+    proficient = _weapon_proficient(entry.item, inputs.weapon_training)
+    return {
+        "item": entry.item.key,
+        "name": entry.item.name,
+        "equipped": entry.equipped,
+        "ability": ability,
+        "proficient": proficient,
+        "to_hit": modifier + (inputs.proficiency_bonus if proficient else 0),
+        "damage": _damage(weapon.damage, modifier),
+        "damage_type": weapon.damage_type,
+        "versatile_damage": _damage(weapon.versatile, modifier) if weapon.versatile else None,
+        "range": list(weapon.range) if weapon.range else None,
+        "properties": list(weapon.properties),
+        "mastery": weapon.mastery,
+    }
+
+
+@lru_cache(maxsize=INVENTORY_CACHE_SIZE)
+def _summary(canonical: str, inputs: EquipmentInputs) -> dict:
+    resolved = _resolve(canonical)
+    capacity = inputs.strength * CARRY_MULTIPLIER
+    drag_limit = inputs.strength * DRAG_MULTIPLIER
+
+    speed = inputs.speed
+    armor = resolved.armor.armor if resolved.armor is not None else None
+    if armor is not None and armor.strength and inputs.strength < armor.strength:
+        speed -= HEAVY_ARMOR_SPEED_PENALTY
+    if resolved.weight > drag_limit:
+        speed = 0
+    elif resolved.weight > capacity:
+        # Beyond carrying capacity the load can only be dragged
+        speed = min(speed, 5)
+
+    return {
+        "weight": resolved.weight,
+        "carrying_capacity": capacity,
+        "drag_lift_push": drag_limit,
+        "over_capacity": resolved.weight > capacity,
+        "speed": max(speed, 0),
+        "coins_gp": resolved.coins_cp / 100,
+        "armor_class": _armor_class(resolved, inputs.modifiers[DEXTERITY], inputs.base_armor_class, inputs.armor_training),
+        "armor": resolved.armor.name if resolved.armor is not None else None,
+        "shield": resolved.shield is not None,
+        "stealth_disadvantage": bool(armor and armor.stealth_disadvantage),
+        "untrained_armor": [
+            item.name for item in (resolved.armor, resolved.shield)
+            if item is not None and _training(item) not in inputs.armor_training
+        ],
+        "attacks": [_attack_line(entry, inputs) for entry in resolved.weapons],
+        "unknown_items": list(resolved.unknown),
+    }
+
+
+def inventory_summary(inventory, inputs: EquipmentInputs) -> dict:
+    """Carried weight, encumbrance, AC and weapon attack lines (memoized; don't modify the result)"""
+    return _summary(_canonical(inventory), inputs)
+
+
+def expand_inventory(inventory) -> list:
+    """Inventory entries with their catalogue item (None for custom entries)"""
+    return [
+        {
+            "item": entry.item.key if entry.item is not None else None,
+            "name": entry.name,
+            "category": entry.item.category if entry.item is not None else None,
+            "quantity": entry.quantity,
+            "equipped": entry.equipped,
+            "weight": round(entry.weight, 2),
+        }
+        for entry in resolve_inventory(inventory).entries
+    ]
@@ -0,0 +1,172 @@
+"""
+Index audit for the characters router.
+
+Seeds a throwaway SQLite database with SEED_CHARACTERS characters, applies
+the migrations, drives every router endpoint once while capturing the SQL it
+issues, then runs EXPLAIN QUERY PLAN on each captured statement. Exits
+non-zero if any plan contains a full table scan.
+
+    python -m backend.explain_queries [row_count]
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+from sqlalchemy import event, insert, text
+
+from backend.benchmarks.harness import BENCH_USER, make_client, make_engine
+from backend.inventory_items import rebuild_inventory_items
+from backend.migrations import run_migrations
+from backend.models import Character, User
+from backend.routers.characters import _encode_cursor
+
+SEED_CHARACTERS = 100_000
+SEED_USERS = 1_000
+
+# (method, path, json body[, headers]) for every route that touches the
+# database. {id} is replaced with a character owned by the session user.
+ENDPOINTS = [
+    ("GET", "/api/characters/", None),
+    ("GET", "/api/characters/derived", None),
+    ("GET", "/api/characters/export", None),
+    ("GET", "/api/characters/items", None),
+    ("GET", "/api/characters/items?ids={id}&ids=1", None),
+    ("GET", "/api/characters/items/longsword", None),
+    ("GET", "/api/characters/items/Sword of Kas", None),
+    ("GET", "/api/characters/party", None),
+    ("GET", "/api/characters/party?fields=name,level&cursor=" + _encode_cursor("9999-12-31 00:00:00", 0), None),
+    ("GET", "/api/characters/{id}", None),
+    ("GET", "/api/characters/{id}/sheet", None),
+    ("GET", "/api/characters/{id}/sheet", None, {"If-None-Match": '"stale"'}),
+    ("GET", "/api/characters/{id}/skills", None),
+    ("GET", "/api/characters/{id}/roll/skill/Perception", None),
+    ("GET", "/api/characters/{id}/roll/save/dexterity", None),
+    ("GET", "/api/characters/{id}/roll/attack", None),
+    ("POST", "/api/characters/{id}/roll/attack?mode=adv&damage=1d8", None),
+    ("GET", "/api/characters/{id}/odds/attack?ac=15&damage=1d8", None),
+    ("GET", "/api/characters/{id}/odds/skill/Stealth?dc=15", None),
+    ("GET", "/api/characters/{id}/odds/save/wisdom?dc=15", None),
+    ("GET", "/api/characters/{id}/inventory", None),
+    ("GET", "/api/characters/{id}/inventory", None, {"If-None-Match": '"stale"'}),
+    ("GET", "/api/characters/{id}/spells", None),
+    ("GET", "/api/characters/{id}/spells?full=true", None),
+    ("GET", "/api/characters/{id}/spells/preparable", None),
+    ("POST", "/api/characters/rolls", {"character_ids": ["{id}", 1, 2], "rolls": [{"type": "skill", "name": "Stealth"}]}),
+    ("PUT", "/api/characters/{id}", {"hp_current": 5}),
+    ("PUT", "/api/characters/{id}", {"inventory": [{"item": "longsword", "equipped": True}, {"item": "gp", "quantity": 12}]}),
+    ("PATCH", "/api/characters/{id}", {"renown": {"Harpers": 2}, "hp_current": 4}),
+    # Object members are pushed down into one guarded UPDATE with json_set
+    ("PATCH", "/api/characters/{id}", [
+        {"op": "replace", "path": "/hp_current", "value": 6},
+        {"op": "add", "path": "/spells/slots/1", "value": 3}
+    ], {"Content-Type": "application/json-patch+json"}),
+    # Array targets are applied in Python: read, then UPDATE
+    ("PATCH", "/api/characters/{id}", [
+        {"op": "add", "path": "/inventory/-", "value": {"item": "rope"}}
+    ], {"Content-Type": "application/json-patch+json"}),
+    # Spell lists are validated in Python: read, then UPDATE
+    ("PATCH", "/api/characters/{id}", {"spells": {"known": ["Fireball"]}}),
+    ("POST", "/api/characters/", {"name": "Audit", "species": "Elf", "class_name": "Wizard", "background": "Sage"}),
+    ("POST", "/api/characters/xp", {"character_ids": ["{id}", 1, 2], "xp": 300}),
+    ("POST", "/api/characters/bulk", {"characters": [{"name": "Audit", "species": "Elf", "class_name": "Wizard", "background": "Sage"}]}),
+]
+
+# "SCAN characters" is a full table scan; "SCAN characters USING INDEX ..." and
+# "SEARCH ..." are not.
+FULL_SCAN = re.compile(r"\bSCAN \w+\b(?! USING (?:COVERING )?INDEX)")
+
+
+def seed(engine, count: int) -> int:
+    """Bulk insert users and characters; returns the id of one bench-user character"""
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"email": f"user{i}@example.com", "name": f"User {i}", "google_id": f"sub-{i}"}
+            for i in range(SEED_USERS)
+        ])
+        bench_user_id = connection.execute(insert(User).values(
+            email=BENCH_USER["email"], name=BENCH_USER["name"], google_id=BENCH_USER["sub"]
+        )).inserted_primary_key[0]
+        rows = [
+            {
+                "user_id": 1 + i % SEED_USERS, "name": f"Hero {i}", "species": "Human",
+                "class_name": "Fighter", "background": "Soldier", "level": 1 + i % 20,
+                "stats": {"strength": 14, "dexterity": 12}, "hp_max": 10, "hp_current": 10,
+                "proficiencies": {"skills": ["Athletics"], "saves": ["strength"]},
+                "inventory": [{"item": "longsword", "equipped": True}, {"item": "gp", "quantity": 10 + i % 90}]
+            }
+            for i in range(count)
+        ]
+        connection.execute(insert(Character), rows)
+        own = connection.execute(insert(Character).values(
+            user_id=bench_user_id, name="Bench Hero", species="Human", class_name="Fighter",
+            background="Soldier", level=5, stats={}, proficiencies={}
+        )).inserted_primary_key[0]
+        rebuild_inventory_items(connection)
+        connection.execute(text("ANALYZE"))
+    return own
+
+
+def capture_statements(engine, character_id: int) -> list:
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    client = make_client(engine)
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        for method, path, body, *headers in ENDPOINTS:
+            if isinstance(body, dict) and "character_ids" in body:
+                body = dict(body, character_ids=[character_id if i == "{id}" else i for i in body["character_ids"]])
+            response = client.request(method, path.replace("{id}", str(character_id)), json=body,
+                                      headers=headers[0] if headers else None)
+            if response.status_code >= 400:
+                raise SystemExit(f"{method} {path} failed: {response.status_code} {response.text}")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    # De-duplicate identical SQL; parameters don't change the plan shape here
+    unique = {}
+    for statement, parameters in captured:
+        unique.setdefault(statement, parameters)
+    return list(unique.items())
+
+
+def explain(engine, statements: list) -> int:
+    failures = 0
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in statements:
+            plan = cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            details = [row[-1] for row in plan]
+            scans = [d for d in details if FULL_SCAN.search(d)]
+            status = "FAIL" if scans else "ok"
+            failures += bool(scans)
+            print(f"[{status}] {' '.join(statement.split())[:110]}")
+            for detail in details:
+                print(f"         {detail}")
+    finally:
+        raw.close()
+    return failures
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else SEED_CHARACTERS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'audit.db')}")
+        run_migrations(engine)
+        character_id = seed(engine, count)
+        statements = capture_statements(engine, character_id)
+        failures = explain(engine, statements)
+        engine.dispose()
+
+    print(f"\n{len(statements)} distinct statements, {failures} with full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
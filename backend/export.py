@@ -0,0 +1,348 @@
+"""
+Streaming NDJSON export and import of characters.
+
+Export reads keyset pages of EXPORT_BATCH_SIZE rows (id > last id), each
+on its own short-lived connection, and yields one NDJSON chunk per page, so
+memory use is bounded by the batch size and no connection or read
+transaction is held while a slow client downloads. GzipEncoder compresses
+the stream incrementally. Import reads one line at a time, validates it against
+CharacterRecord and inserts valid rows in batched INSERTs (see
+insert_characters), reporting failures per line.
+
+Admin CLI for whole-database backups:
+
+    python -m backend.export export [--out FILE] [--gzip] [--user EMAIL]
+    python -m backend.export import FILE [--keep-ids] [--user EMAIL]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import zlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError, validator
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from backend.database import engine as default_engine, serialized_write
+from backend.game_data import check_ability_scores
+from backend.inventory_items import sync_inventory_items
+from backend.models import Character, User
+from backend.spells import compact_spells
+
+EXPORT_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+GZIP_LEVEL = 6
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Every column except the owner id (admin exports carry the owner's email
+# instead) and the materialized derived stats, which inserts recompute
+EXPORT_COLUMNS = tuple(column for column in Character.__table__.c if column.name not in ("user_id", "derived"))
+
+
+class CharacterRecord(BaseModel):
+    """One NDJSON line: a Character row without its owner id (nullability follows the model)"""
+    id: Optional[int] = None
+    owner: Optional[str] = None  # Owner email, present in admin exports
+    name: Optional[str]
+    level: Optional[int] = 1
+    species: Optional[str] = None
+    class_name: Optional[str] = None
+    subclass: Optional[str] = None
+    background: Optional[str] = None
+    alignment: Optional[str] = None
+    stats: Optional[dict] = None
+    hp_current: Optional[int] = None
+    hp_max: Optional[int] = None
+    temp_hp: Optional[int] = 0
+    hit_dice_current: Optional[int] = None
+    hit_dice_max: Optional[int] = None
+    xp: Optional[int] = 0
+    renown: Optional[dict] = {}
+    piety: Optional[dict] = {}
+    bastion: Optional[dict] = {}
+    inventory: Optional[list] = []
+    spells: Optional[dict] = {"known": [], "prepared": [], "slots": {}}
+    proficiencies: Optional[dict] = None
+    armor_class: Optional[int] = 10
+    speed: Optional[int] = 30
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    version: int = 1
+
+    class Config:
+        extra = "forbid"
+
+    @validator("stats")
+    def check_stats(cls, stats):
+        """Ability scores are integers from 1 to 30"""
+        return None if stats is None else check_ability_scores(stats)
+
+    @validator("spells")
+    def compact_spell_references(cls, spells):
+        """Spell names become catalogue ids; unknown ones are restored as they were exported"""
+        return None if spells is None else compact_spells(spells, strict=False)
+
+
+# ============== EXPORT ==============
+
+def export_query(user_id: Optional[int] = None, after_id: int = 0, limit: Optional[int] = None):
+    """
+    All columns of the user's characters, or of every character with its
+    owner's email, in id order from `after_id` (exclusive)
+    """
+    if user_id is not None:
+        query = select(*EXPORT_COLUMNS).where(Character.user_id == user_id)
+    else:
+        query = select(*EXPORT_COLUMNS, User.email.label("owner")).outerjoin(User, User.id == Character.user_id)
+    return query.where(Character.id > after_id).order_by(Character.id).limit(limit)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def ndjson_chunk(rows) -> bytes:
+    """Encode a batch of result rows as NDJSON"""
+    return "".join(
+        json.dumps(dict(row._mapping), default=_json_default, separators=(",", ":")) + "\n"
+        for row in rows
+    ).encode()
+
+
+def ndjson_export(engine, user_id: Optional[int] = None, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Yield the export one keyset page at a time. Each page is read on its own
+    connection, released before the chunk is yielded; pages don't share a
+    snapshot, so a row is exported as it was when its page was read.
+    """
+    last_id = 0
+    while True:
+        with engine.connect() as connection:
+            rows = connection.execute(export_query(user_id, last_id, batch_size)).all()
+        if rows:
+            yield ndjson_chunk(rows)
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1].id
+
+
+class GzipEncoder:
+    """Incremental gzip: feed chunks, then flush once at the end"""
+
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    encoder = GzipEncoder(level)
+    for chunk in chunks:
+        data = encoder.encode(chunk)
+        if data:
+            yield data
+    yield encoder.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if an Accept-Encoding header allows gzip (honours q=0)"""
+    for part in (accept_encoding or "").lower().split(","):
+        coding, *params = [token.strip() for token in part.split(";")]
+        if coding not in ("gzip", "*"):
+            continue
+        try:
+            quality = float(next((p[2:] for p in params if p.startswith("q=")), 1))
+        except ValueError:
+            quality = 0
+        if quality > 0:
+            return True
+    return False
+
+
+def export_response(chunks, compress: bool, filename: str = "characters.ndjson") -> StreamingResponse:
+    """StreamingResponse for an export stream, gzip-encoded when `compress`"""
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        chunks = gzip_stream(chunks)
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+# ============== IMPORT ==============
+
+def _resolve_owner(engine, email: str, owners: dict) -> int:
+    """User id for an owner email, creating the user if needed (memoized in `owners`)"""
+    if email not in owners:
+        with engine.begin() as connection:
+            user_id = connection.execute(select(User.id).where(User.email == email)).scalar()
+            if user_id is None:
+                user_id = connection.execute(insert(User).values(email=email)).inserted_primary_key[0]
+        owners[email] = user_id
+    return owners[email]
+
+
+def insert_characters(db: Session, batch: list) -> tuple:
+    """
+    Insert (tag, values) pairs with batched INSERT ... RETURNING id and
+    commit. If the batch fails it is retried row by row so each failure is
+    attributed to its tag. Returns ({tag: id}, [(tag, error)]).
+    """
+    # Ids come back in parameter order, so they line up with the batch
+    statement = insert(Character).returning(Character.id, sort_by_parameter_order=True)
+    try:
+        with serialized_write():
+            ids = db.execute(statement, [values for _, values in batch]).scalars().all()
+            sync_inventory_items(db, [
+                (character_id, values["inventory"])
+                for character_id, (_, values) in zip(ids, batch) if values.get("inventory")
+            ])
+            db.commit()
+        return dict(zip((tag for tag, _ in batch), ids)), []
+    except DBAPIError:
+        db.rollback()
+
+    created, errors = {}, []
+    for tag, values in batch:
+        try:
+            with serialized_write():
+                created[tag] = db.execute(statement, [values]).scalar_one()
+                if values.get("inventory"):
+                    sync_inventory_items(db, [(created[tag], values["inventory"])])
+                db.commit()
+        except DBAPIError as exc:
+            db.rollback()
+            errors.append((tag, str(exc.orig)))
+    return created, errors
+
+
+def _flush(engine, batch: list, result: dict):
+    with Session(engine) as db:
+        created, errors = insert_characters(db, batch)
+    result["imported"] += len(created)
+    result["errors"].extend({"line": line_number, "error": error} for line_number, error in errors)
+
+
+def import_ndjson(
+    lines: Iterable,
+    engine,
+    user_id: Optional[int] = None,
+    keep_ids: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> dict:
+    """
+    Validate and insert NDJSON character lines. With `user_id` every row is
+    owned by that user; otherwise each line's `owner` email is resolved
+    (and created) as in an admin backup. Ids are reassigned unless
+    `keep_ids`. Returns {"imported": n, "errors": [{"line", "error"}]}.
+    """
+    result = {"imported": 0, "errors": []}
+    owners = {}
+    batch = []
+    # executemany needs the same keys on every row, so missing timestamps get one explicit value
+    imported_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = CharacterRecord.parse_raw(line)
+        except ValidationError as exc:
+            result["errors"].append({"line": line_number, "error": str(exc)})
+            continue
+
+        values = record.dict(exclude={"owner"})
+        if not keep_ids:
+            values.pop("id")
+        values["created_at"] = values["created_at"] or imported_at
+        values["updated_at"] = values["updated_at"] or imported_at
+        if user_id is not None:
+            values["user_id"] = user_id
+        elif record.owner:
+            values["user_id"] = _resolve_owner(engine, record.owner, owners)
+        else:
+            result["errors"].append({"line": line_number, "error": "Missing owner"})
+            continue
+        batch.append((line_number, values))
+
+        if len(batch) >= batch_size:
+            _flush(engine, batch, result)
+            batch = []
+
+    if batch:
+        _flush(engine, batch, result)
+    return result
+
+
+# ============== CLI ==============
+
+def _open_input(path: str):
+    """Binary line source for a path or stdin, transparently gunzipped"""
+    handle = sys.stdin.buffer if path == "-" else open(path, "rb")
+    if handle.peek(2)[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=handle)
+    return handle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.export", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write characters as NDJSON")
+    export_parser.add_argument("--out", default="-", help="Output file (default stdout)")
+    export_parser.add_argument("--gzip", action="store_true", help="Gzip the output")
+    export_parser.add_argument("--user", help="Only export this user's characters (email)")
+
+    import_parser = commands.add_parser("import", help="Load characters from NDJSON (plain or gzip)")
+    import_parser.add_argument("file", help="Input file, or - for stdin")
+    import_parser.add_argument("--keep-ids", action="store_true", help="Keep exported character ids")
+    import_parser.add_argument("--user", help="Assign every character to this user (email)")
+
+    args = parser.parse_args(argv)
+
+    user_id = None
+    if args.user:
+        with default_engine.connect() as connection:
+            user_id = connection.execute(select(User.id).where(User.email == args.user)).scalar()
+        if user_id is None:
+            parser.error(f"Unknown user: {args.user}")
+
+    if args.command == "export":
+        chunks = ndjson_export(default_engine, user_id)
+        if args.gzip:
+            chunks = gzip_stream(chunks)
+        out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return
+
+    handle = _open_input(args.file)
+    try:
+        result = import_ndjson(handle, default_engine, user_id=user_id, keep_ids=args.keep_ids)
+    finally:
+        handle.close()
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    print(f"Imported {result['imported']} character(s), {len(result['errors'])} error(s)", file=sys.stderr)
+    sys.exit(1 if result["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,132 +1,52 @@
 """
 D&D 5e 2024 Game Data
-Extracted from SRD_CC_v5.2.1.md
+Class traits, SRD backgrounds and XP thresholds are compiled from
+SRD_CC_v5.2.1.md (see backend/srd_data.py); campaign species, subclasses and
+non-SRD backgrounds are kept by hand.
 
 Contains class proficiencies, background skill grants, and equipment data.
 """
 
+from bisect import bisect_right
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+
+from backend.srd_data import content_hash, load_srd_data
+
+# Compiled from SRD_CC_v5.2.1.md by backend/srd_data.py. Loaded from a cached
+# artefact, which is rebuilt only when the SRD file changes.
+SRD = load_srd_data()
+
+
+@lru_cache(maxsize=None)
+def srd_version() -> str:
+    """Short hash of the compiled SRD data, for validators of anything built from it"""
+    return content_hash(SRD)[:12]
+
 # Saving throw proficiencies by class (from SRD Section: Core [Class] Traits)
-CLASS_SAVE_PROFICIENCIES = {
-    "Barbarian": ["strength", "constitution"],
-    "Bard": ["dexterity", "charisma"],
-    "Cleric": ["wisdom", "charisma"],
-    "Druid": ["intelligence", "wisdom"],
-    "Fighter": ["strength", "constitution"],
-    "Monk": ["strength", "dexterity"],
-    "Paladin": ["wisdom", "charisma"],
-    "Ranger": ["strength", "dexterity"],
-    "Rogue": ["dexterity", "intelligence"],
-    "Sorcerer": ["constitution", "charisma"],
-    "Warlock": ["wisdom", "charisma"],
-    "Wizard": ["intelligence", "wisdom"]
-}
+CLASS_SAVE_PROFICIENCIES = {c.name: list(c.saves) for c in SRD.classes}
 
 # Skill choices available by class (player must choose from these)
 CLASS_SKILL_CHOICES = {
-    "Barbarian": {
-        "choose": 2,
-        "from": ["Animal Handling", "Athletics", "Intimidation", "Nature", "Perception", "Survival"]
-    },
-    "Bard": {
-        "choose": 3,
-        "from": "any"  # Bards can choose any 3 skills
-    },
-    "Cleric": {
-        "choose": 2,
-        "from": ["History", "Insight", "Medicine", "Persuasion", "Religion"]
-    },
-    "Druid": {
-        "choose": 2,
-        "from": ["Animal Handling", "Arcana", "Insight", "Medicine", "Nature", "Perception", "Religion", "Survival"]
-    },
-    "Fighter": {
-        "choose": 2,
-        "from": ["Acrobatics", "Animal Handling", "Athletics", "History", "Insight", "Intimidation", "Perception", "Persuasion", "Survival"]
-    },
-    "Monk": {
-        "choose": 2,
-        "from": ["Acrobatics", "Athletics", "History", "Insight", "Religion", "Stealth"]
-    },
-    "Paladin": {
-        "choose": 2,
-        "from": ["Athletics", "Insight", "Intimidation", "Medicine", "Persuasion", "Religion"]
-    },
-    "Ranger": {
-        "choose": 3,
-        "from": ["Animal Handling", "Athletics", "Insight", "Investigation", "Nature", "Perception", "Stealth", "Survival"]
-    },
-    "Rogue": {
-        "choose": 4,
-        "from": ["Acrobatics", "Athletics", "Deception", "Insight", "Intimidation", "Investigation", "Perception", "Persuasion", "Sleight of Hand", "Stealth"]
-    },
-    "Sorcerer": {
-        "choose": 2,
-        "from": ["Arcana", "Deception", "Insight", "Intimidation", "Persuasion", "Religion"]
-    },
-    "Warlock": {
-        "choose": 2,
-        "from": ["Arcana", "Deception", "History", "Intimidation", "Investigation", "Nature", "Religion"]
-    },
-    "Wizard": {
-        "choose": 2,
-        "from": ["Arcana", "History", "Insight", "Investigation", "Medicine", "Nature", "Religion"]
-    }
+    c.name: {"choose": c.skill_choices, "from": "any" if c.skill_options is None else list(c.skill_options)}
+    for c in SRD.classes
 }
 
 # Hit dice per class
-CLASS_HIT_DICE = {
-    "Barbarian": "d12",
-    "Bard": "d8",
-    "Cleric": "d8",
-    "Druid": "d8",
-    "Fighter": "d10",
-    "Monk": "d8",
-    "Paladin": "d10",
-    "Ranger": "d10",
-    "Rogue": "d8",
-    "Sorcerer": "d6",
-    "Warlock": "d8",
-    "Wizard": "d6"
-}
+CLASS_HIT_DICE = {c.name: c.hit_die for c in SRD.classes}
 
 # Armor proficiencies by class
-CLASS_ARMOR_PROFICIENCIES = {
-    "Barbarian": ["light", "medium", "shields"],
-    "Bard": ["light"],
-    "Cleric": ["light", "medium", "shields"],
-    "Druid": ["light", "shields"],
-    "Fighter": ["light", "medium", "heavy", "shields"],
-    "Monk": [],
-    "Paladin": ["light", "medium", "heavy", "shields"],
-    "Ranger": ["light", "medium", "shields"],
-    "Rogue": ["light"],
-    "Sorcerer": [],
-    "Warlock": ["light"],
-    "Wizard": []
-}
+CLASS_ARMOR_PROFICIENCIES = {c.name: list(c.armor) for c in SRD.classes}
 
-# Weapon proficiencies by class
-CLASS_WEAPON_PROFICIENCIES = {
-    "Barbarian": ["simple", "martial"],
-    "Bard": ["simple"],
-    "Cleric": ["simple"],
-    "Druid": ["simple"],
-    "Fighter": ["simple", "martial"],
-    "Monk": ["simple", "martial_light"],  # Martial with Light property
-    "Paladin": ["simple", "martial"],
-    "Ranger": ["simple", "martial"],
-    "Rogue": ["simple", "martial_finesse_light"],  # Martial with Finesse or Light
-    "Sorcerer": ["simple"],
-    "Warlock": ["simple"],
-    "Wizard": ["simple"]
-}
+# Weapon proficiencies by class ("martial_light": Martial with the Light property,
+# "martial_finesse_light": Martial with Finesse or Light)
+CLASS_WEAPON_PROFICIENCIES = {c.name: list(c.weapons) for c in SRD.classes}
 
-# Background skill proficiencies (common backgrounds from 2024 PHB/SRD)
-BACKGROUND_SKILL_PROFICIENCIES = {
-    "Acolyte": ["Insight", "Religion"],
+# Background skill proficiencies for the 2024 PHB backgrounds the SRD leaves out
+PHB_BACKGROUND_SKILL_PROFICIENCIES = {
     "Artisan": ["Investigation", "Persuasion"],
     "Charlatan": ["Deception", "Sleight of Hand"],
-    "Criminal": ["Stealth", "Sleight of Hand"],
     "Entertainer": ["Acrobatics", "Performance"],
     "Farmer": ["Animal Handling", "Nature"],
     "Folk Hero": ["Animal Handling", "Survival"],
@@ -135,13 +55,20 @@ BACKGROUND_SKILL_PROFICIENCIES = {
     "Hermit": ["Medicine", "Religion"],
     "Merchant": ["Investigation", "Persuasion"],
     "Noble": ["History", "Persuasion"],
-    "Sage": ["Arcana", "History"],
     "Sailor": ["Acrobatics", "Perception"],
     "Scribe": ["History", "Investigation"],
-    "Soldier": ["Athletics", "Intimidation"],
     "Wayfarer": ["Insight", "Stealth"]
 }
 
+# Background skill proficiencies: the SRD's backgrounds plus the PHB ones above
+BACKGROUND_SKILL_PROFICIENCIES = dict(sorted({
+    **PHB_BACKGROUND_SKILL_PROFICIENCIES,
+    **{b.name: list(b.skills) for b in SRD.backgrounds}
+}.items()))
+
+# The six abilities, in character sheet order
+ABILITIES = ["strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma"]
+
 # Skills mapped to their governing ability
 SKILL_ABILITIES = {
     "Acrobatics": "dexterity",
@@ -170,6 +97,8 @@ ALL_SKILLS = list(SKILL_ABILITIES.keys())
 # Proficiency bonus by level
 def get_proficiency_bonus(level: int) -> int:
     """Calculate proficiency bonus from character level"""
+    if isinstance(level, int) and 0 <= level < len(PROFICIENCY_BONUS_TABLE):
+        return PROFICIENCY_BONUS_TABLE[level]
     if level < 1:
         return 2
     return ((level - 1) // 4) + 2
@@ -177,8 +106,99 @@ def get_proficiency_bonus(level: int) -> int:
 # Ability modifier calculation
 def calc_modifier(score: int) -> int:
     """Calculate ability modifier from score (D&D 5e formula)"""
+    if isinstance(score, int) and 0 <= score < len(MODIFIER_TABLE):
+        return MODIFIER_TABLE[score]
     return (score - 10) // 2
 
+# Ability score bounds (SRD: scores range from 1 to 30)
+MIN_ABILITY_SCORE = 1
+MAX_ABILITY_SCORE = 30
+
+def check_ability_scores(stats: dict) -> dict:
+    """Raise ValueError unless every score in a stats object is an integer from 1 to 30"""
+    for ability, score in stats.items():
+        if type(score) is not int or not MIN_ABILITY_SCORE <= score <= MAX_ABILITY_SCORE:
+            raise ValueError(f"{ability} must be an integer from {MIN_ABILITY_SCORE} to {MAX_ABILITY_SCORE}")
+    return stats
+
+# ============== COMPILED RULES TABLES ==============
+# Immutable, index-based views of the tables above. Abilities and skills are
+# addressed by position; proficiencies become bitmasks so membership is a
+# single AND instead of a list scan.
+
+ABILITY_INDEX = MappingProxyType({ability: i for i, ability in enumerate(ABILITIES)})
+SKILL_NAMES = tuple(SKILL_ABILITIES)
+SKILL_INDEX = MappingProxyType({name: i for i, name in enumerate(SKILL_NAMES)})
+SKILL_ABILITY_INDEX = tuple(ABILITY_INDEX[SKILL_ABILITIES[name]] for name in SKILL_NAMES)
+SKILL_BITS = MappingProxyType({name: 1 << i for i, name in enumerate(SKILL_NAMES)})
+SAVE_BITS = MappingProxyType({ability: 1 << i for i, ability in enumerate(ABILITIES)})
+
+# Modifier for every score 0-30 and proficiency bonus for levels 0-20
+MODIFIER_TABLE = tuple((score - 10) // 2 for score in range(31))
+PROFICIENCY_BONUS_TABLE = (2,) + tuple(((level - 1) // 4) + 2 for level in range(1, 21))
+
+
+def proficiency_mask(names, bits) -> int:
+    """Fold a list of skill or save names into a bitmask, ignoring unknown names"""
+    mask = 0
+    for name in names or ():
+        mask |= bits.get(name, 0)
+    return mask
+
+
+class CompiledCharacter(NamedTuple):
+    """Every roll a character can make, precomputed once from its stats and proficiencies"""
+    modifiers: tuple        # Indexed like ABILITIES
+    proficiency_bonus: int
+    skill_mask: int
+    save_mask: int
+    skills: tuple           # Roll per skill, indexed like SKILL_NAMES
+    saves: tuple            # Roll per save, indexed like ABILITIES
+    attacks: tuple          # Proficient roll per ability, indexed like ABILITIES
+
+
+# A roll is (ability_modifier, proficient, proficiency_bonus_applied, total).
+# Rows are shared between skills, saves and attacks that use the same ability.
+
+def compile_character(stats: dict, proficiencies: dict, level: int) -> CompiledCharacter:
+    stats = stats or {}
+    proficiencies = proficiencies or {}
+    modifiers = tuple([calc_modifier(stats.get(ability, 10)) for ability in ABILITIES])
+    bonus = get_proficiency_bonus(level)
+    skill_mask = proficiency_mask(proficiencies.get("skills"), SKILL_BITS)
+    save_mask = proficiency_mask(proficiencies.get("saves"), SAVE_BITS)
+
+    untrained = tuple([(mod, False, 0, mod) for mod in modifiers])
+    trained = tuple([(mod, True, bonus, mod + bonus) for mod in modifiers])
+    return CompiledCharacter(
+        modifiers=modifiers,
+        proficiency_bonus=bonus,
+        skill_mask=skill_mask,
+        save_mask=save_mask,
+        skills=tuple([
+            trained[ability] if skill_mask >> i & 1 else untrained[ability]
+            for i, ability in enumerate(SKILL_ABILITY_INDEX)
+        ]),
+        saves=tuple([
+            trained[i] if save_mask >> i & 1 else untrained[i]
+            for i in range(len(ABILITIES))
+        ]),
+        attacks=trained
+    )
+
+
+def skill_roll(compiled: CompiledCharacter, skill_index: int) -> tuple:
+    return compiled.skills[skill_index]
+
+
+def save_roll(compiled: CompiledCharacter, ability_index: int) -> tuple:
+    return compiled.saves[ability_index]
+
+
+def attack_roll(compiled: CompiledCharacter, ability_index: int) -> tuple:
+    # Assume proficient with equipped weapons
+    return compiled.attacks[ability_index]
+
 # Starting HP calculation
 def calc_starting_hp(class_name: str, con_modifier: int) -> int:
     """Calculate starting HP at level 1"""
@@ -197,6 +217,14 @@ def calc_hp_per_level(class_name: str, con_modifier: int) -> int:
     die = CLASS_HIT_DICE.get(class_name, "d8")
     return hit_die_avg.get(die, 5) + con_modifier
 
+# XP needed for levels 1-20 (SRD Character Advancement table)
+XP_THRESHOLDS = SRD.xp_thresholds
+MAX_LEVEL = len(XP_THRESHOLDS)
+
+def level_for_xp(xp: int) -> int:
+    """Highest level whose XP threshold `xp` meets"""
+    return max(1, bisect_right(XP_THRESHOLDS, xp))
+
 # ============== SPECIES DATA (2024 Faerun Campaign) ==============
 
 # Custom species list for Faerun campaign
@@ -0,0 +1,54 @@
+"""
+HTTP validator helpers: ETag comparison for conditional requests
+(If-None-Match -> 304, If-Match -> 412) and pre-serialized static payloads.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+from starlette.responses import Response
+
+# Game data (SRD catalogues, species, classes) only changes on deploy
+GAME_DATA_CACHE_CONTROL = "public, max-age=86400, immutable"
+
+
+def _candidates(header: str) -> list:
+    return [candidate.strip() for candidate in header.split(",") if candidate.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison, as required for If-None-Match"""
+    if not header:
+        return False
+    for candidate in _candidates(header):
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def strong_etags(header: str) -> list:
+    """Entity tags from an If-Match header usable for strong comparison (weak tags never match)"""
+    return [candidate for candidate in _candidates(header) if not candidate.startswith("W/")]
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
+
+
+class StaticJSON:
+    """A JSON payload serialized once, with a content-hash ETag"""
+
+    def __init__(self, payload, cache_control: str):
+        self.body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control}
+
+    def response(self, if_none_match: Optional[str] = None) -> Response:
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
@@ -0,0 +1,126 @@
+"""
+Session identity resolution.
+
+Maps the OAuth session user (from backend.auth.get_current_user) to a
+User.id once per request. Lookups are backed by a bounded LRU cache with a
+TTL so the hot path (every tap on the sheet) skips the users table.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.auth import get_current_user
+from backend.database import get_db, serialized_write
+from backend.models import User
+
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "1024"))
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "300"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# email -> User.id (only hits are cached, misses always go to the database)
+identity_cache = TTLCache(IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    if target.email:
+        identity_cache.invalidate(target.email)
+
+
+def resolve_user_id(db: Session, email: str) -> Optional[int]:
+    """Look up the User.id for an email, consulting the identity cache first"""
+    user_id = identity_cache.get(email)
+    if user_id is not None:
+        return user_id
+
+    row = db.query(User.id).filter(User.email == email).first()
+    if row is None:
+        return None
+
+    identity_cache.set(email, row.id)
+    return row.id
+
+
+def get_optional_user_id(db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)) -> Optional[int]:
+    """Resolve the session user to a User.id, or None if no user row exists yet"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return resolve_user_id(db, current_user.get('email'))
+
+
+def get_current_user_id(user_id: Optional[int] = Depends(get_optional_user_id)) -> int:
+    """Resolve the session user to a User.id, 404 if the user row is missing"""
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_id
+
+
+def ensure_user_id(
+    user_id: Optional[int] = Depends(get_optional_user_id),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+) -> int:
+    """Resolve the session user to a User.id, auto-creating the user row on first action"""
+    if user_id is not None:
+        return user_id
+
+    db_user = User(
+        email=current_user.get('email'),
+        name=current_user.get('name'),
+        google_id=current_user.get('sub')
+    )
+    db.add(db_user)
+    with serialized_write():
+        db.commit()
+    db.refresh(db_user)
+    return db_user.id
+
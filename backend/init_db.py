@@ -1,10 +1,24 @@
 from backend.database import engine, Base
 from backend import models
+from backend.inventory_items import rebuild_inventory_items
+from backend.materialized import backfill_derived
+from backend.migrations import run_migrations
+from backend.srd_index import SRD_INDEX_PATH, ensure_index
 
 def init_db():
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     print("Tables created successfully.")
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s).")
+    # Data derived with the current code is rebuilt here, not in the migrations
+    with engine.begin() as connection:
+        refreshed = backfill_derived(connection)
+        if "0007_inventory_items" in applied:
+            rebuild_inventory_items(connection)
+    print(f"Refreshed derived stats for {refreshed} character(s).")
+    if ensure_index():
+        print(f"Built SRD search index at {SRD_INDEX_PATH}.")
 
 if __name__ == "__main__":
     init_db()
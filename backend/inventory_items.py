@@ -0,0 +1,204 @@
+"""
+Normalized inventory rows.
+
+Character.inventory is a JSON list, so "who holds the Sword of Kas?" or
+"how much gold does the party carry?" would mean loading and parsing every
+character's blob. The inventory_items table (models.InventoryItem) holds
+one row per inventory entry, resolved against the equipment catalogue:
+
+    item_key  "longsword" for catalogue items, the slug of the name
+              ("sword-of-kas") for custom ones
+    category  catalogue category ("coin", "weapon", ...), NULL if custom
+    quantity, equipped, weight, value_cp   per entry
+
+indexed on (character_id) and (item_key), so item lookups and party totals
+are one grouped query joined to the owner's characters.
+
+The JSON column stays authoritative. Every write that changes it also
+rewrites the character's rows in the same transaction (dual write: the
+characters router's _execute_write and NDJSON imports).
+The table is optional: with INVENTORY_ITEMS=0 writes skip it and the
+query endpoints scan the JSON instead. Rebuild it from the JSON after
+running without it:
+
+    python -m backend.inventory_items
+"""
+
+import os
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from backend.equipment import find_item, resolve_inventory
+from backend.models import Character, InventoryItem
+from backend.srd_data import item_key
+
+INVENTORY_ITEMS_ENABLED = os.getenv("INVENTORY_ITEMS", "1").lower() in ("1", "true", "yes")
+
+
+def lookup_key(reference: str) -> str:
+    """item_key for a catalogue key, item name or custom item name"""
+    item = find_item(reference)
+    return item.key if item is not None else item_key(reference)
+
+
+# ============== DUAL WRITE ==============
+
+def inventory_item_rows(character_id: int, inventory) -> List[dict]:
+    """inventory_items rows for a character's inventory (custom entries without a name are skipped)"""
+    rows = []
+    for position, entry in enumerate(resolve_inventory(inventory).entries):
+        item = entry.item
+        if item is None and not entry.name:
+            continue
+        rows.append({
+            "character_id": character_id,
+            "position": position,
+            "item_key": item.key if item is not None else item_key(entry.name),
+            "category": item.category if item is not None else None,
+            "name": entry.name,
+            "quantity": entry.quantity,
+            "equipped": entry.equipped,
+            "weight": entry.weight,
+            "value_cp": round(item.cost_cp * entry.quantity / item.amount) if item is not None and item.cost_cp is not None else None,
+        })
+    return rows
+
+
+def inventory_item_writes(characters: Iterable[tuple]) -> list:
+    """
+    (statement, parameters) pairs replacing the rows of each
+    (character_id, inventory); run them on the transaction that wrote the
+    inventory. Empty when the table is disabled.
+    """
+    if not INVENTORY_ITEMS_ENABLED:
+        return []
+    characters = list(characters)
+    if not characters:
+        return []
+    rows = [row for character_id, inventory in characters for row in inventory_item_rows(character_id, inventory)]
+    writes = [(delete(InventoryItem).where(InventoryItem.character_id.in_([character_id for character_id, _ in characters])), None)]
+    if rows:
+        writes.append((insert(InventoryItem), rows))
+    return writes
+
+
+def sync_inventory_items(db, characters: Iterable[tuple]):
+    """Rewrite the rows of each (character_id, inventory) on a Session or Connection"""
+    for statement, parameters in inventory_item_writes(characters):
+        db.execute(statement, parameters)
+
+
+def rebuild_inventory_items(connection, batch_size: int = 1000):
+    """Repopulate inventory_items from every character's JSON inventory (batched by id)"""
+    connection.execute(delete(InventoryItem))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(Character.id, Character.inventory)
+            .where(Character.id > last_id)
+            .order_by(Character.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        items = [item for row in rows for item in inventory_item_rows(row.id, row.inventory)]
+        if items:
+            connection.execute(insert(InventoryItem), items)
+        last_id = rows[-1].id
+
+
+# ============== QUERIES ==============
+
+def _owned(query, user_id: int, ids: Optional[List[int]]):
+    query = query.join(Character, Character.id == InventoryItem.character_id).where(Character.user_id == user_id)
+    if ids:
+        query = query.where(Character.id.in_(ids))
+    return query
+
+
+def holders_query(user_id: int, key: str):
+    """The user's characters holding an item, with how many and whether any is equipped"""
+    return _owned(
+        select(
+            Character.id, Character.name,
+            func.sum(InventoryItem.quantity).label("quantity"),
+            func.max(InventoryItem.equipped).label("equipped")
+        ).where(InventoryItem.item_key == key),
+        user_id, None
+    ).group_by(Character.id).order_by(Character.id)
+
+
+def party_items_query(user_id: int, ids: Optional[List[int]]):
+    """Per-item totals across the user's characters (or the given ones)"""
+    return _owned(
+        select(
+            InventoryItem.item_key, InventoryItem.category,
+            func.min(InventoryItem.name).label("name"),
+            func.sum(InventoryItem.quantity).label("quantity"),
+            func.count(func.distinct(InventoryItem.character_id)).label("holders"),
+            func.sum(InventoryItem.weight).label("weight"),
+            func.sum(InventoryItem.value_cp).label("value_cp")
+        ),
+        user_id, ids
+    ).group_by(InventoryItem.item_key, InventoryItem.category).order_by(InventoryItem.item_key)
+
+
+def inventory_scan_query(user_id: int, ids: Optional[List[int]]):
+    """Fallback when the table is disabled: the JSON inventories themselves"""
+    query = select(Character.id, Character.name, Character.inventory).where(Character.user_id == user_id)
+    if ids:
+        query = query.where(Character.id.in_(ids))
+    return query.order_by(Character.id)
+
+
+def scan_holders(rows, key: str) -> list:
+    """holders_query over inventory_scan_query rows, in Python"""
+    holders = []
+    for row in rows:
+        matches = [item for item in inventory_item_rows(row.id, row.inventory) if item["item_key"] == key]
+        if matches:
+            holders.append({
+                "id": row.id, "name": row.name,
+                "quantity": sum(item["quantity"] for item in matches),
+                "equipped": any(item["equipped"] for item in matches),
+            })
+    return holders
+
+
+def scan_party_items(rows) -> list:
+    """party_items_query over inventory_scan_query rows, in Python"""
+    totals = {}
+    for row in rows:
+        for item in inventory_item_rows(row.id, row.inventory):
+            total = totals.setdefault((item["item_key"], item["category"]), {
+                "item": item["item_key"], "category": item["category"], "name": item["name"],
+                "quantity": 0, "holders": set(), "weight": 0.0, "value_cp": None,
+            })
+            total["name"] = min(total["name"], item["name"])
+            total["quantity"] += item["quantity"]
+            total["holders"].add(row.id)
+            total["weight"] += item["weight"]
+            if item["value_cp"] is not None:
+                total["value_cp"] = (total["value_cp"] or 0) + item["value_cp"]
+    return [dict(total, holders=len(total["holders"])) for _, total in sorted(totals.items(), key=lambda pair: pair[0][0])]
+
+
+def party_inventory(items: list) -> dict:
+    """Response for per-item totals: the items, plus the party's coin value and carried weight"""
+    for item in items:
+        item["weight"] = round(item["weight"] or 0.0, 2)
+    return {
+        "items": items,
+        "coins_gp": sum(item["value_cp"] or 0 for item in items if item["category"] == "coin") / 100,
+        "weight": round(sum(item["weight"] for item in items), 2),
+    }
+
+
+if __name__ == "__main__":
+    from backend.database import engine
+
+    with engine.begin() as connection:
+        rebuild_inventory_items(connection)
+        count = connection.execute(select(func.count()).select_from(InventoryItem)).scalar()
+    print(f"Rebuilt inventory_items: {count} row(s)")
@@ -0,0 +1,245 @@
+"""
+RFC 6902 JSON Patch and RFC 7396 JSON Merge Patch.
+
+apply_json_patch / apply_merge_patch work on plain Python values. The
+sqlite_* helpers compile the same patches into json_set / json_remove /
+json_patch expressions so SQLite rewrites a JSON column in place instead of
+the client uploading (and the server rewriting) the whole blob. They return
+None when a patch can't be pushed down faithfully; callers then fall back to
+the Python implementation.
+"""
+
+import copy
+import json
+from typing import Optional
+
+from sqlalchemy import func
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or doesn't apply to the document"""
+
+
+class JsonPatchConflict(JsonPatchError):
+    """A `test` operation failed"""
+
+
+# ============== JSON POINTER (RFC 6901) ==============
+
+def parse_pointer(pointer: str) -> list:
+    """Split a JSON pointer into unescaped reference tokens"""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(array: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(array)
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise JsonPatchError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _get(doc, tokens: list):
+    for token in tokens:
+        if isinstance(doc, dict):
+            if token not in doc:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            doc = doc[token]
+        elif isinstance(doc, list):
+            doc = doc[_array_index(doc, token)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return doc
+
+
+def _add(doc, tokens: list, value):
+    if not tokens:
+        return value
+    parent = _get(doc, tokens[:-1])
+    last = tokens[-1]
+    if isinstance(parent, dict):
+        parent[last] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, last, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a scalar at /{'/'.join(tokens[:-1])}")
+    return doc
+
+
+def _remove(doc, tokens: list):
+    """Remove the target and return it"""
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _get(doc, tokens[:-1])
+    last = tokens[-1]
+    if isinstance(parent, dict):
+        if last not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(last)
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, last))
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _json_equal(a, b) -> bool:
+    # JSON distinguishes true from 1, Python doesn't
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+# ============== APPLY ==============
+
+def apply_json_patch(doc, operations: list):
+    """Apply an RFC 6902 patch and return the new document (the input is not modified)"""
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+
+    doc = copy.deepcopy(doc)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Invalid operation: {operation!r}")
+        op = operation["op"]
+        tokens = parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' requires a value")
+
+        if op == "add":
+            doc = _add(doc, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(doc, tokens)
+        elif op == "replace":
+            if tokens:
+                _get(doc, tokens)
+                _remove(doc, tokens)
+            doc = _add(doc, tokens, copy.deepcopy(operation["value"]))
+        elif op in ("move", "copy"):
+            if "from" not in operation:
+                raise JsonPatchError(f"'{op}' requires from")
+            source = parse_pointer(operation["from"])
+            if op == "move":
+                if tokens[:len(source)] == source and len(tokens) > len(source):
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                value = _remove(doc, source)
+            else:
+                value = copy.deepcopy(_get(doc, source))
+            doc = _add(doc, tokens, value)
+        elif op == "test":
+            if not _json_equal(_get(doc, tokens), operation["value"]):
+                raise JsonPatchConflict(f"Test failed at {operation['path']}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op}")
+
+    return doc
+
+
+def apply_merge_patch(target, patch):
+    """Apply an RFC 7396 merge patch and return the result (the input is not modified)"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+# ============== SQLITE PUSHDOWN ==============
+
+def sqlite_json_path(tokens: list) -> Optional[str]:
+    """Object-member path for SQLite's JSON functions, e.g. ["slots", "1"] -> $."slots"."1" """
+    if any('"' in token or "\\" in token for token in tokens):
+        return None
+    return "$" + "".join(f'."{token}"' for token in tokens)
+
+
+def sqlite_merge_patch(column, patch):
+    """json_patch(column, :patch); SQLite's json_patch() implements RFC 7396"""
+    if not isinstance(patch, dict):
+        return None
+    return func.json_patch(func.coalesce(column, "{}"), json.dumps(patch))
+
+
+def sqlite_json_patch(columns: dict, object_paths: set, operations: list):
+    """
+    Compile a JSON Patch whose top-level members are table columns into
+    (values, guards) for one UPDATE: `values` maps column names to SQL
+    expressions and `guards` are WHERE clauses that hold only if every
+    target the patch expects actually exists. `object_paths` are the JSON
+    objects, as token tuples starting with a column name, whose members may
+    be set or removed in SQL. Returns None unless every operation is
+    add/replace/remove on a column or a member of one of those objects and
+    no two operations touch overlapping paths (so each can be checked
+    against the stored row); array targets always return None.
+    """
+    if not isinstance(operations, list) or not operations:
+        return None
+
+    seen = []
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get("op") not in ("add", "replace", "remove"):
+            return None
+        if operation["op"] != "remove" and "value" not in operation:
+            return None
+        try:
+            tokens = parse_pointer(operation.get("path"))
+        except JsonPatchError:
+            return None
+        if not tokens or tokens[0] not in columns:
+            return None
+        if len(tokens) > 1 and tuple(tokens[:-1]) not in object_paths:
+            return None
+        for other in seen:
+            shorter = min(len(other), len(tokens))
+            if other[:shorter] == tokens[:shorter]:
+                return None
+        seen.append(tokens)
+
+    values = {}
+    guards = []
+    for operation, tokens in zip(operations, seen):
+        name, inner = tokens[0], tokens[1:]
+        column = columns[name]
+
+        if not inner:
+            # Whole-member replace; removing a column isn't supported
+            if operation["op"] == "remove":
+                return None
+            values[name] = operation["value"]
+            continue
+
+        path = sqlite_json_path(inner)
+        parent_path = sqlite_json_path(inner[:-1])
+        if path is None:
+            return None
+
+        current = values.get(name, column)
+        if operation["op"] == "add":
+            guards.append(func.json_type(column, parent_path) == "object")
+            values[name] = func.json_set(current, path, func.json(json.dumps(operation["value"])))
+        else:
+            guards.append(func.json_type(column, parent_path) == "object")
+            guards.append(func.json_type(column, path).isnot(None))
+            if operation["op"] == "replace":
+                values[name] = func.json_set(current, path, func.json(json.dumps(operation["value"])))
+            else:
+                values[name] = func.json_remove(current, path)
+
+    return values, guards
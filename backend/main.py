@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from starlette.middleware.sessions import SessionMiddleware
 from backend.auth import router as auth_router
-from backend.routers import characters
+from backend.routers import characters, dice, equipment, spells, srd
+from backend.srd_index import open_index
+import anyio.to_thread
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Adventurers Ledger", description="A mobile-first D&D 5e 2024 Companion")
+# Worker threads for the sync (def) routes. Starlette's default is 40; raise it
+# when bursts of requests queue for a thread while the database is idle.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Build the SRD search index if the SRD changed, and map it before the first request
+    open_index()
+    yield
+
+
+app = FastAPI(title="Adventurers Ledger", description="A mobile-first D&D 5e 2024 Companion", lifespan=lifespan)
 
 # Session Middleware is required for Authlib to store state (like 'nonces' and user info)
 # In production, use a secure, random string for secret_key
@@ -18,6 +33,10 @@ app.add_middleware(SessionMiddleware, secret_key=os.getenv("SECRET_KEY", "unsafe
 # Include Auth Router
 app.include_router(auth_router)
 app.include_router(characters.router)
+app.include_router(dice.router)
+app.include_router(srd.router)
+app.include_router(spells.router)
+app.include_router(equipment.router)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 FRONTEND_DIR = os.path.join(BASE_DIR, "frontend")
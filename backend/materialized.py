@@ -0,0 +1,245 @@
+"""
+Materialized derived stats.
+
+Character.derived stores everything the read endpoints used to recompute
+(modifiers, proficiency bonus, AC, proficiency masks and the skill, save
+and attack roll rows), laid out like CompiledCharacter so reads are a
+column fetch:
+
+    {"v": 1, "modifiers": [6], "proficiency_bonus": 3, "skill_mask": 5,
+     "save_mask": 3, "armor_class": 12, "skills": [[mod, proficient, bonus,
+     total] x 18], "saves": [[...] x 6], "attacks": [[...] x 6]}
+
+Inserts fill it through the column default. Writes call refresh() with
+the columns they touched; it walks a static dependency graph in
+topological order and recomputes a node only if one of its inputs
+changed, stopping wherever a recomputed value comes out the same. A new
+Dexterity score therefore touches the Dexterity modifier, AC, the three
+Dexterity skills, the Dexterity save and the Dexterity attack row (ranged
+and finesse lines), and nothing else; a score change that keeps the
+modifier stops at the modifier. AC also reads the inventory's equipped
+armor and Shield (backend.equipment), so inventory writes refresh it.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import bindparam, func, or_, select, update
+
+from backend.equipment import equipped_armor_class
+from backend.game_data import (
+    ABILITIES, ABILITY_INDEX, SKILL_ABILITY_INDEX, SKILL_BITS, SAVE_BITS,
+    CompiledCharacter, calc_modifier, compile_character, get_proficiency_bonus, proficiency_mask
+)
+from backend.models import Character
+
+DERIVED_VERSION = 2
+DEXTERITY = ABILITY_INDEX["dexterity"]
+
+# ============== DEPENDENCY GRAPH ==============
+# Nodes are (field,) or (field, index) addresses into the derived dict.
+# Inputs are the character columns (stats per ability) they are computed from.
+
+INPUTS_BY_COLUMN = {
+    "stats": tuple(("stats", i) for i in range(len(ABILITIES))),
+    "level": (("level",),),
+    "proficiencies": (("proficiencies",),),
+    "armor_class": (("base_armor_class",),),
+    "inventory": (("inventory",),),
+}
+
+DEPENDS = {}
+for _i in range(len(ABILITIES)):
+    DEPENDS[("modifiers", _i)] = (("stats", _i),)
+DEPENDS[("proficiency_bonus",)] = (("level",),)
+DEPENDS[("skill_mask",)] = (("proficiencies",),)
+DEPENDS[("save_mask",)] = (("proficiencies",),)
+DEPENDS[("armor_class",)] = (("base_armor_class",), ("modifiers", DEXTERITY), ("inventory",), ("proficiencies",))
+for _i, _ability in enumerate(SKILL_ABILITY_INDEX):
+    DEPENDS[("skills", _i)] = (("modifiers", _ability), ("proficiency_bonus",), ("skill_mask",))
+for _i in range(len(ABILITIES)):
+    DEPENDS[("saves", _i)] = (("modifiers", _i), ("proficiency_bonus",), ("save_mask",))
+for _i in range(len(ABILITIES)):
+    DEPENDS[("attacks", _i)] = (("modifiers", _i), ("proficiency_bonus",))
+
+# DEPENDS is built in dependency order, so its keys are a topological order
+NODES = tuple(DEPENDS)
+
+
+@lru_cache(maxsize=64)
+def affected_nodes(inputs: frozenset) -> tuple:
+    """Nodes reachable from `inputs`, in topological order"""
+    reached = set(inputs)
+    for node in NODES:
+        if any(dependency in reached for dependency in DEPENDS[node]):
+            reached.add(node)
+    return tuple(node for node in NODES if node in reached)
+
+
+def _same(old, new) -> bool:
+    """Equal and of the same type, so a score of 15.0 still re-renders 2 as 2.0"""
+    if old != new or type(old) is not type(new):
+        return False
+    return not isinstance(old, list) or all(type(a) is type(b) for a, b in zip(old, new))
+
+
+def _roll_row(derived: dict, ability: int, proficient: bool) -> list:
+    mod = derived["modifiers"][ability]
+    bonus = derived["proficiency_bonus"] if proficient else 0
+    return [mod, proficient, bonus, mod + bonus]
+
+
+def _modifier(ability: str):
+    return lambda derived, character: calc_modifier((character.stats or {}).get(ability, 10))
+
+
+def _skill(index: int, ability: int):
+    return lambda derived, character: _roll_row(derived, ability, bool(derived["skill_mask"] >> index & 1))
+
+
+def _save(index: int):
+    return lambda derived, character: _roll_row(derived, index, bool(derived["save_mask"] >> index & 1))
+
+
+def _attack(index: int):
+    return lambda derived, character: _roll_row(derived, index, True)
+
+
+# node -> compute(derived, character); `derived` already holds the node's updated dependencies
+COMPUTE = {
+    ("proficiency_bonus",): lambda derived, character: get_proficiency_bonus(character.level),
+    ("skill_mask",): lambda derived, character: proficiency_mask((character.proficiencies or {}).get("skills"), SKILL_BITS),
+    ("save_mask",): lambda derived, character: proficiency_mask((character.proficiencies or {}).get("saves"), SAVE_BITS),
+    ("armor_class",): lambda derived, character: equipped_armor_class(
+        character.inventory, derived["modifiers"][DEXTERITY], character.armor_class, character.proficiencies
+    ),
+}
+for _i, _ability in enumerate(ABILITIES):
+    COMPUTE[("modifiers", _i)] = _modifier(_ability)
+    COMPUTE[("saves", _i)] = _save(_i)
+    COMPUTE[("attacks", _i)] = _attack(_i)
+for _i, _ability in enumerate(SKILL_ABILITY_INDEX):
+    COMPUTE[("skills", _i)] = _skill(_i, _ability)
+
+
+# ============== MATERIALIZE / REFRESH ==============
+
+def materialize(stats: dict, proficiencies: dict, level: int, armor_class: Optional[int], inventory=None) -> dict:
+    """
+    Full derived dict for a character. Raises on data that can't be
+    computed; the request models validate ability scores before any write.
+    """
+    compiled = compile_character(stats, proficiencies, level)
+    return {
+        "v": DERIVED_VERSION,
+        "modifiers": list(compiled.modifiers),
+        "proficiency_bonus": compiled.proficiency_bonus,
+        "skill_mask": compiled.skill_mask,
+        "save_mask": compiled.save_mask,
+        "armor_class": equipped_armor_class(inventory, compiled.modifiers[DEXTERITY], armor_class, proficiencies),
+        "skills": [list(row) for row in compiled.skills],
+        "saves": [list(row) for row in compiled.saves],
+        "attacks": [list(row) for row in compiled.attacks],
+    }
+
+
+def derived_default(context) -> dict:
+    """Column default: materialize from the row being inserted"""
+    params = context.get_current_parameters()
+    return materialize(
+        params.get("stats"), params.get("proficiencies"), params.get("level", 1), params.get("armor_class"), params.get("inventory")
+    )
+
+
+def is_current(derived) -> bool:
+    return isinstance(derived, dict) and derived.get("v") == DERIVED_VERSION
+
+
+def refresh(derived: Optional[dict], character, columns) -> tuple:
+    """
+    Bring `derived` up to date after a write to `columns` of `character`
+    (which holds the new values). Returns (derived, recomputed_nodes); the
+    input dict is not modified, and is returned as is if no value changed.
+    Falls back to a full materialize if the stored value is missing or from
+    an older DERIVED_VERSION.
+    """
+    inputs = frozenset(node for column in columns for node in INPUTS_BY_COLUMN.get(column, ()))
+    if not is_current(derived):
+        return materialize(
+            character.stats, character.proficiencies, character.level, character.armor_class, character.inventory
+        ), NODES
+    if not inputs:
+        return derived, ()
+
+    fresh = {key: list(value) if isinstance(value, list) else value for key, value in derived.items()}
+    changed = set(inputs)
+    recomputed = []
+    for node in affected_nodes(inputs):
+        if changed.isdisjoint(DEPENDS[node]):
+            continue
+        value = COMPUTE[node](fresh, character)
+        recomputed.append(node)
+        field = node[0]
+        if len(node) == 1:
+            if not _same(fresh[field], value):
+                fresh[field] = value
+                changed.add(node)
+        elif not _same(fresh[field][node[1]], value):
+            fresh[field][node[1]] = value
+            changed.add(node)
+    # Hand back the stored dict itself when nothing changed
+    return (fresh if len(changed) > len(inputs) else derived), tuple(recomputed)
+
+
+def compiled_view(derived: dict) -> CompiledCharacter:
+    """The stored rows as a CompiledCharacter (no computation; rows are lists)"""
+    return CompiledCharacter(
+        modifiers=derived["modifiers"],
+        proficiency_bonus=derived["proficiency_bonus"],
+        skill_mask=derived["skill_mask"],
+        save_mask=derived["save_mask"],
+        skills=derived["skills"],
+        saves=derived["saves"],
+        attacks=derived["attacks"]
+    )
+
+
+# ============== BACKFILL ==============
+
+def _derived_or_none(row):
+    """A row's derived stats; NULL for legacy rows whose stats can't be computed (reads fall back)"""
+    try:
+        return materialize(row.stats, row.proficiencies, row.level, row.armor_class, row.inventory)
+    except (TypeError, ValueError):
+        return None
+
+
+def backfill_derived(connection, batch_size: int = 1000) -> int:
+    """
+    Materialize derived stats for characters whose stored value is missing or
+    from an older DERIVED_VERSION (batched by id, leaving updated_at alone).
+    Run by init_db after the migrations; returns the number of rows visited.
+    """
+    statement = (
+        update(Character)
+        .where(Character.id == bindparam("row_id"))
+        .values(derived=bindparam("row_derived"), updated_at=Character.updated_at)
+    )
+    stale = or_(Character.derived.is_(None), func.json_extract(Character.derived, "$.v").is_distinct_from(DERIVED_VERSION))
+    visited = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(Character.id, Character.stats, Character.proficiencies, Character.level, Character.armor_class, Character.inventory)
+            .where(Character.id > last_id, stale)
+            .order_by(Character.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return visited
+        connection.execute(statement, [
+            {"row_id": row.id, "row_derived": _derived_or_none(row)}
+            for row in rows
+        ])
+        visited += len(rows)
+        last_id = rows[-1].id
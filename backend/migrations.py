@@ -0,0 +1,173 @@
+"""
+Repeatable schema migrations for the SQLite database.
+
+Base.metadata.create_all() only creates missing tables; it never adds
+indexes or columns to tables that already exist. Each migration below is
+idempotent and recorded in `schema_migrations`, so init_db can run them on
+every deploy and only the new ones apply.
+
+Run directly with `python -m backend.migrations`.
+"""
+
+import json
+import os
+
+from sqlalchemy import text
+
+from backend.database import engine as default_engine
+
+def add_column(table: str, column: str, ddl: str):
+    """Step that adds a column unless create_all already created it"""
+    def _step(connection):
+        existing = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+        if column not in existing:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return _step
+
+
+# ============== FROZEN DATA STEPS ==============
+# Migrations replay on new and old databases alike, so a data step must do
+# the same thing whatever the application code looks like later: it is SQL,
+# or code copied here as it was when the migration shipped. Data the
+# current code derives (materialized stats, inventory_items) is rebuilt by
+# init_db after the migrations instead.
+
+# Append-only spell registry; a spell's id is its line number
+SPELL_IDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spell_ids.txt")
+
+
+def _spell_ids_by_name() -> dict:
+    with open(SPELL_IDS_PATH, encoding="utf-8") as registry:
+        return {" ".join(name.lower().split()): i for i, name in enumerate(registry, 1) if name.strip()}
+
+
+def _compact_spell_lists(spells, ids: dict):
+    """0005: known/prepared names as ids, deduplicated in order; None to leave the row alone"""
+    if not isinstance(spells, dict):
+        return None
+    compacted = dict(spells)
+    for name in ("known", "prepared"):
+        if name not in spells:
+            continue
+        references = spells[name]
+        if not isinstance(references, list) or not all(isinstance(r, (str, int)) for r in references):
+            return None
+        compacted[name] = list(dict.fromkeys(
+            ids.get(" ".join(r.lower().split()), r) if isinstance(r, str) else r
+            for r in references
+        ))
+    return compacted
+
+
+def compact_spell_references(connection, batch_size: int = 1000):
+    """Replace spell names in characters' known/prepared lists with registry ids (unknown names are kept)"""
+    ids = _spell_ids_by_name()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text("SELECT id, spells FROM characters WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": batch_size}
+        ).all()
+        if not rows:
+            return
+        changed = []
+        for row in rows:
+            try:
+                spells = json.loads(row.spells) if row.spells is not None else None
+            except ValueError:
+                continue
+            compacted = _compact_spell_lists(spells, ids)
+            if compacted is not None and compacted != spells:
+                changed.append({"row_id": row.id, "row_spells": json.dumps(compacted)})
+        if changed:
+            # A new row version, so cached copies with the old names are revalidated
+            connection.execute(
+                text("UPDATE characters SET spells = :row_spells, version = version + 1 WHERE id = :row_id"),
+                changed
+            )
+        last_id = rows[-1].id
+
+
+# (name, steps) in apply order. A step is a SQL string or a callable taking
+# the open connection. Never edit or reorder a migration once shipped.
+MIGRATIONS = [
+    ("0001_character_ownership_indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_characters_user_id_id ON characters (user_id, id)",
+        "CREATE INDEX IF NOT EXISTS ix_characters_user_id_updated_at ON characters (user_id, updated_at)",
+    ]),
+    ("0002_character_row_version", [
+        add_column("characters", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ]),
+    ("0003_character_updated_at_backfill", [
+        "UPDATE characters SET updated_at = coalesce(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL",
+    ]),
+    # Filled in by init_db (backend.materialized.backfill_derived)
+    ("0004_character_materialized_derived", [
+        add_column("characters", "derived", "JSON"),
+    ]),
+    ("0005_character_spell_ids", [
+        compact_spell_references,
+    ]),
+    # Derived v2: AC from equipped armor and Shield. Older blobs are dropped
+    # here and recomputed by init_db.
+    ("0006_character_derived_equipment", [
+        "UPDATE characters SET derived = NULL WHERE json_extract(derived, '$.v') IS NOT 2",
+    ]),
+    # Filled in by init_db (backend.inventory_items.rebuild_inventory_items)
+    ("0007_inventory_items", [
+        "CREATE TABLE IF NOT EXISTS inventory_items ("
+        "id INTEGER NOT NULL, "
+        "character_id INTEGER NOT NULL, "
+        "position INTEGER NOT NULL, "
+        "item_key VARCHAR NOT NULL, "
+        "category VARCHAR, "
+        "name VARCHAR, "
+        "quantity INTEGER NOT NULL, "
+        "equipped BOOLEAN NOT NULL, "
+        "weight FLOAT NOT NULL, "
+        "value_cp INTEGER, "
+        "PRIMARY KEY (id), "
+        "FOREIGN KEY(character_id) REFERENCES characters (id))",
+        "CREATE INDEX IF NOT EXISTS ix_inventory_items_character_id ON inventory_items (character_id)",
+        "CREATE INDEX IF NOT EXISTS ix_inventory_items_item_key ON inventory_items (item_key)",
+    ]),
+]
+
+
+def _ensure_migrations_table(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "name VARCHAR PRIMARY KEY, "
+        "applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    ))
+
+
+def applied_migrations(connection) -> set:
+    _ensure_migrations_table(connection)
+    return {row[0] for row in connection.execute(text("SELECT name FROM schema_migrations"))}
+
+
+def run_migrations(engine=default_engine) -> list:
+    """Apply pending migrations, each in its own transaction. Returns the names applied."""
+    applied = []
+    with engine.begin() as connection:
+        done = applied_migrations(connection)
+
+    for name, steps in MIGRATIONS:
+        if name in done:
+            continue
+        with engine.begin() as connection:
+            for step in steps:
+                if callable(step):
+                    step(connection)
+                else:
+                    connection.execute(text(step))
+            connection.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+        applied.append(name)
+
+    return applied
+
+
+if __name__ == "__main__":
+    names = run_migrations()
+    print(f"Applied {len(names)} migration(s): {', '.join(names) or 'none'}")
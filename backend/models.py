@@ -1,8 +1,17 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, JSON, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Float, Index, Integer, String, JSON, DateTime, event
+from sqlalchemy.orm import attributes, relationship
 from sqlalchemy.sql import func
 from .database import Base
 
+
+# The derived-stats code needs the compiled SRD, so it's imported on first use
+# rather than whenever the models are
+def _derived_default(context) -> dict:
+    """Column default for Character.derived; see backend/materialized.py"""
+    from backend.materialized import derived_default
+    return derived_default(context)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -16,6 +25,11 @@ class User(Base):
 
 class Character(Base):
     __tablename__ = "characters"
+    __table_args__ = (
+        # Every character read is scoped to its owner; see backend/migrations.py
+        Index("ix_characters_user_id_id", "user_id", "id"),
+        Index("ix_characters_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -67,6 +81,46 @@ class Character(Base):
     armor_class = Column(Integer, default=10)  # Base AC (before DEX)
     speed = Column(Integer, default=30)        # Base speed in feet
 
+    # Materialized modifiers, AC and roll rows; see backend/materialized.py
+    derived = Column(JSON, nullable=True, default=_derived_default)
+
     owner = relationship("User", back_populates="characters")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too so keyset pagination on (updated_at, id) never sees NULLs
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    # Row version: bumped by every write, source of the character ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+
+class InventoryItem(Base):
+    """
+    One Character.inventory entry, normalized so item lookups and party
+    totals are indexed SQL. The JSON column stays authoritative; writes that
+    change it rewrite these rows (see backend/inventory_items.py).
+    """
+    __tablename__ = "inventory_items"
+    __table_args__ = (
+        Index("ix_inventory_items_character_id", "character_id"),
+        Index("ix_inventory_items_item_key", "item_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    character_id = Column(Integer, ForeignKey("characters.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # Index in Character.inventory
+    item_key = Column(String, nullable=False)   # Catalogue key, or the slug of a custom item's name
+    category = Column(String, nullable=True)    # Catalogue category; NULL for custom items
+    name = Column(String)
+    quantity = Column(Integer, nullable=False, default=1)
+    equipped = Column(Boolean, nullable=False, default=False)
+    weight = Column(Float, nullable=False, default=0.0)  # Total for the entry, in pounds
+    value_cp = Column(Integer, nullable=True)             # Total catalogue value; NULL if unknown
+
+
+@event.listens_for(Character, "before_update")
+def _refresh_derived(mapper, connection, target):
+    """Keep Character.derived current when ORM code changes an input column"""
+    from backend.materialized import INPUTS_BY_COLUMN, refresh
+    columns = [name for name in INPUTS_BY_COLUMN if attributes.get_history(target, name).has_changes()]
+    if columns:
+        target.derived, _ = refresh(target.derived, target, columns)
@@ -0,0 +1,246 @@
+"""
+Exact roll odds.
+
+Builds the probability mass function of a dice expression by convolving
+per-term PMFs. Keep-highest/lowest terms (4d6kh3, advantage) use an
+order-statistics DP rather than enumerating every outcome. The answers are
+then read off:
+
+- success chance of a d20 check against a DC
+- hit and crit chance of an attack against an AC, with a natural 1
+  always missing and a natural `crit_on`+ always hitting
+- the damage distribution of a round of attacks (miss / hit / crit
+  mixture, convolved once per attack), hence expected damage per round
+
+The d20 tables for normal, advantage and disadvantage rolls are built at
+import time. Every other distribution is memoized on its compiled
+expression, so repeated questions are answered from cache.
+"""
+
+from functools import lru_cache
+from math import comb
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from backend.dice import DiceError, DiceExpression, DiceTerm, check_expression, compile_expression, critical
+
+ODDS_CACHE_SIZE = 4096
+MAX_SUPPORT = 20_000          # Outcomes in one distribution
+MAX_KEEP_DICE = 20            # Dice in a keep-highest/lowest term
+MAX_KEEP_WORK = 50_000_000    # DP cells updated for the keep terms of one expression (~0.1 s)
+MAX_ATTACKS = 20
+
+
+class Distribution(NamedTuple):
+    """PMF over consecutive integer totals: pmf[i] = P(total == offset + i)"""
+    offset: int
+    pmf: np.ndarray
+    at_least: np.ndarray      # at_least[i] = P(total >= offset + i)
+
+    @property
+    def mean(self) -> float:
+        return float(np.dot(self.pmf, np.arange(self.offset, self.offset + len(self.pmf))))
+
+    @property
+    def stddev(self) -> float:
+        totals = np.arange(self.offset, self.offset + len(self.pmf))
+        return float(np.sqrt(np.dot(self.pmf, (totals - self.mean) ** 2)))
+
+    def chance_at_least(self, total: int) -> float:
+        index = total - self.offset
+        if index <= 0:
+            return 1.0
+        if index >= len(self.pmf):
+            return 0.0
+        return float(self.at_least[index])
+
+
+def _distribution(offset: int, pmf: np.ndarray) -> Distribution:
+    if len(pmf) > MAX_SUPPORT:
+        raise DiceError(f"Too many possible totals for an exact distribution (max {MAX_SUPPORT})")
+    pmf.setflags(write=False)
+    at_least = pmf[::-1].cumsum()[::-1]
+    at_least.setflags(write=False)
+    return Distribution(offset, pmf, at_least)
+
+
+def _add(a: Distribution, b: Distribution) -> Distribution:
+    return _distribution(a.offset + b.offset, np.convolve(a.pmf, b.pmf))
+
+
+def _shift(distribution: Distribution, amount: int) -> Distribution:
+    return distribution._replace(offset=distribution.offset + amount)
+
+
+def _floor_at_zero(distribution: Distribution) -> Distribution:
+    """Damage can't go below 0: fold negative totals into 0"""
+    if distribution.offset >= 0:
+        return distribution
+    cut = -distribution.offset
+    pmf = distribution.pmf[cut:].copy() if cut < len(distribution.pmf) else np.zeros(1)
+    pmf[0] += distribution.pmf[:cut].sum()
+    return _distribution(0, pmf)
+
+
+# ============== TERM DISTRIBUTIONS ==============
+
+@lru_cache(maxsize=ODDS_CACHE_SIZE)
+def _dice_sum(count: int, sides: int) -> Distribution:
+    """Sum of `count` dice (convolution by halving, so each size is built once)"""
+    if count == 1:
+        return _distribution(1, np.full(sides, 1.0 / sides))
+    half = count // 2
+    return _add(_dice_sum(half, sides), _dice_sum(count - half, sides))
+
+
+@lru_cache(maxsize=ODDS_CACHE_SIZE)
+def _kept_sum(count: int, sides: int, keep: int, keep_highest: bool) -> Distribution:
+    """
+    Sum of the `keep` highest (or lowest) of `count` dice. Faces are visited
+    from the kept end; dp[a, s] is the probability mass of `a` dice placed
+    with kept sum `s`, and placing j dice on face v adds C(count-a, j)/sides^j.
+    """
+    if count > MAX_KEEP_DICE:
+        raise DiceError(f"At most {MAX_KEEP_DICE} dice in a keep-highest/lowest term for odds")
+    width = keep * sides + 1
+    if width > MAX_SUPPORT:
+        raise DiceError(f"Too many possible totals for an exact distribution (max {MAX_SUPPORT})")
+    dp = np.zeros((count + 1, width))
+    dp[0, 0] = 1.0
+    p = 1.0 / sides
+    faces = range(sides, 0, -1) if keep_highest else range(1, sides + 1)
+    for face in faces:
+        placed = np.zeros_like(dp)
+        for a in range(count + 1):
+            if not dp[a].any():
+                continue
+            room = max(keep - a, 0)
+            for j in range(count - a + 1):
+                shift = face * min(j, room)
+                placed[a + j, shift:] += dp[a, :width - shift] * (comb(count - a, j) * p ** j)
+        dp = placed
+    # The smallest kept sum is `keep` ones
+    return _distribution(keep, dp[count, keep:].copy())
+
+
+def keep_work(count: int, sides: int, keep: int) -> int:
+    """DP cells _kept_sum updates: a row of `keep * sides + 1` kept sums per face and (placed, newly placed) pair"""
+    return sides * (count + 1) * (count + 2) // 2 * (keep * sides + 1)
+
+
+def check_odds_budget(expression: DiceExpression):
+    """Raise DiceError if the expression's keep terms are too costly to solve exactly"""
+    work = sum(keep_work(term.count, term.sides, term.keep) for term in expression.terms if term.sides and term.keep < term.count)
+    if work > MAX_KEEP_WORK:
+        raise DiceError("Keep-highest/lowest terms too large for exact odds (use fewer dice or sides)")
+
+
+def _term_distribution(term: DiceTerm) -> Distribution:
+    if not term.sides:
+        distribution = _distribution(term.count, np.ones(1))
+    elif term.keep == term.count:
+        distribution = _dice_sum(term.count, term.sides)
+    else:
+        distribution = _kept_sum(term.count, term.sides, term.keep, term.keep_highest)
+    if term.sign < 0:
+        pmf = distribution.pmf[::-1].copy()
+        distribution = _distribution(-(distribution.offset + len(pmf) - 1), pmf)
+    return distribution
+
+
+@lru_cache(maxsize=ODDS_CACHE_SIZE)
+def expression_distribution(expression: DiceExpression) -> Distribution:
+    """Exact distribution of an expression's total"""
+    check_odds_budget(expression)
+    terms = iter(expression.terms)
+    distribution = _term_distribution(next(terms))
+    for term in terms:
+        distribution = _add(distribution, _term_distribution(term))
+    return distribution
+
+
+def distribution_for(text: str) -> Distribution:
+    return expression_distribution(compile_expression(text))
+
+
+# ============== D20 TESTS ==============
+
+# Natural d20 face distributions, indexed by roll mode
+D20 = {mode: expression_distribution(check_expression(0, mode)) for mode in (None, "adv", "dis")}
+
+
+def check_chance(modifier: int, dc: int, mode: Optional[str] = None) -> float:
+    """Chance that d20 + modifier meets the DC (ability checks and saves have no automatic results)"""
+    return D20[mode].chance_at_least(dc - int(modifier))
+
+
+class AttackOdds(NamedTuple):
+    hit_chance: float         # Including crits
+    crit_chance: float
+    damage: Optional[Distribution]  # Damage for the whole round, None without a damage expression
+
+    @property
+    def expected_damage(self) -> Optional[float]:
+        return None if self.damage is None else self.damage.mean
+
+
+def _hit_chances(to_hit: int, armor_class: int, mode: Optional[str], crit_on: int) -> tuple:
+    faces = D20[mode]
+    crit = faces.chance_at_least(crit_on)
+    # A natural 1 always misses, a crit always hits
+    needed = max(armor_class - to_hit, 2)
+    hit = crit + max(faces.chance_at_least(needed) - crit, 0.0)
+    return hit, crit
+
+
+@lru_cache(maxsize=ODDS_CACHE_SIZE)
+def attack_odds(
+    to_hit: int,
+    armor_class: int,
+    mode: Optional[str] = None,
+    damage: Optional[str] = None,
+    damage_bonus: int = 0,
+    attacks: int = 1,
+    crit_on: int = 20
+) -> AttackOdds:
+    """Hit/crit chance of one attack and the damage distribution of `attacks` of them"""
+    if not 1 <= attacks <= MAX_ATTACKS:
+        raise DiceError(f"Attacks must be 1-{MAX_ATTACKS}")
+    if not 2 <= crit_on <= 20:
+        raise DiceError("crit_on must be 2-20")
+    hit, crit = _hit_chances(int(to_hit), int(armor_class), mode, crit_on)
+    if damage is None:
+        return AttackOdds(hit, crit, None)
+
+    compiled = compile_expression(damage)
+    on_hit = _floor_at_zero(_shift(expression_distribution(compiled), int(damage_bonus)))
+    on_crit = _floor_at_zero(_shift(expression_distribution(critical(compiled)), int(damage_bonus)))
+
+    # Mixture of miss (0), hit and crit; both damage PMFs start at 0 after the floor
+    pmf = np.zeros(max(len(on_hit.pmf) + on_hit.offset, len(on_crit.pmf) + on_crit.offset))
+    pmf[0] += 1.0 - hit
+    pmf[on_hit.offset:on_hit.offset + len(on_hit.pmf)] += (hit - crit) * on_hit.pmf
+    pmf[on_crit.offset:on_crit.offset + len(on_crit.pmf)] += crit * on_crit.pmf
+    single = _distribution(0, pmf)
+
+    per_round = single
+    for _ in range(attacks - 1):
+        per_round = _add(per_round, single)
+    return AttackOdds(hit, crit, per_round)
+
+
+def describe(distribution: Distribution, include_pmf: bool = False) -> dict:
+    """JSON summary of a distribution (with the full PMF on request)"""
+    summary = {
+        "min": distribution.offset,
+        "max": distribution.offset + len(distribution.pmf) - 1,
+        "mean": round(distribution.mean, 4),
+        "stddev": round(distribution.stddev, 4)
+    }
+    if include_pmf:
+        summary["pmf"] = {
+            str(distribution.offset + i): round(float(p), 6)
+            for i, p in enumerate(distribution.pmf) if p > 0
+        }
+    return summary
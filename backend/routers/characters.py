@@ -1,15 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
-from backend.database import get_db
-from backend.models import Character, User
-from backend.auth import get_current_user
+import base64
+import json
+import re
+from types import SimpleNamespace
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import JSON, String, case, select, tuple_, type_coerce, update as sql_update
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field, ValidationError, validator
+from backend.database import get_db, serialized_write
+from backend.models import Character
+from backend.derived import derived_summaries, roll_table
+from backend.materialized import DERIVED_VERSION, compiled_view, is_current, refresh
+from backend.dice import DiceError, compile_expression, roll_check, roll_damage, stream_for
+from backend.odds import attack_odds, check_chance, describe
+from backend.equipment import equipment_inputs, equipped_armor_class, expand_inventory, inventory_summary
+from backend.spells import (
+    SPELLS, compact_spells, expand_spells, max_spell_level, preparable_mask, spell_ids, spell_summary
+)
+from backend.export import accepts_gzip, export_response, insert_characters, ndjson_export
+from backend.inventory_items import (
+    INVENTORY_ITEMS_ENABLED, holders_query, inventory_scan_query, lookup_key, party_inventory,
+    inventory_item_writes, party_items_query, scan_holders, scan_party_items
+)
+from backend.http_cache import GAME_DATA_CACHE_CONTROL, StaticJSON, etag_matches, not_modified, strong_etags
+from backend.identity import ensure_user_id, get_current_user_id, get_optional_user_id
+from backend.json_patch import (
+    JsonPatchConflict, JsonPatchError, apply_json_patch, apply_merge_patch, parse_pointer,
+    sqlite_json_patch, sqlite_merge_patch
+)
 from backend.game_data import (
     CLASS_SAVE_PROFICIENCIES, CLASS_ARMOR_PROFICIENCIES, CLASS_WEAPON_PROFICIENCIES,
-    BACKGROUND_SKILL_PROFICIENCIES, SKILL_ABILITIES, calc_modifier,
+    BACKGROUND_SKILL_PROFICIENCIES, SKILL_ABILITIES, ABILITIES, calc_modifier,
     calc_starting_hp, get_species_speed, get_proficiency_bonus, get_species_list,
-    get_subclasses, CLASS_SKILL_CHOICES
+    get_subclasses, CLASS_SKILL_CHOICES, CLASS_HIT_DICE, CLASS_SUBCLASSES,
+    ABILITY_INDEX, SKILL_INDEX, SKILL_NAMES, CompiledCharacter, compile_character,
+    skill_roll, save_roll, attack_roll, calc_hp_per_level, level_for_xp, check_ability_scores, srd_version, SRD
 )
 
 router = APIRouter(prefix="/api/characters", tags=["characters"])
@@ -24,6 +50,11 @@ class CharacterBase(BaseModel):
     stats: dict = {}
     skill_choices: List[str] = []  # For class skill selections
 
+    @validator("stats")
+    def check_stats(cls, stats):
+        """Ability scores are integers from 1 to 30"""
+        return check_ability_scores(stats)
+
 class CharacterCreate(CharacterBase):
     pass
 
@@ -36,25 +67,13 @@ class CharacterResponse(CharacterBase):
     class Config:
         orm_mode = True
 
-@router.post("/", response_model=CharacterResponse)
-def create_character(char: CharacterCreate, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    user_email = current_user.get('email')
-    db_user = db.query(User).filter(User.email == user_email).first()
-    
-    if not db_user:
-        # Auto-create user record if missing (first time action)
-        db_user = User(
-            email=user_email,
-            name=current_user.get('name'),
-            google_id=current_user.get('sub')
-        )
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+def _new_character(char: CharacterCreate, user_id: int) -> Character:
+    """Build a new Character row with HP, proficiencies and speed derived from game data"""
+    return Character(**_new_character_values(char, user_id))
+
 
+def _new_character_values(char: CharacterCreate, user_id: int) -> dict:
+    """Column values for a new character; shared by create and bulk import"""
     # Get stats with defaults
     stats = char.stats or {
         "strength": 10, "dexterity": 10, "constitution": 10,
@@ -85,8 +104,8 @@ def create_character(char: CharacterCreate, db: Session = Depends(get_db), curre
     # Get species speed
     speed = get_species_speed(char.species)
     
-    new_char = Character(
-        user_id=db_user.id,
+    return dict(
+        user_id=user_id,
         name=char.name,
         species=char.species,
         class_name=char.class_name,
@@ -100,30 +119,323 @@ def create_character(char: CharacterCreate, db: Session = Depends(get_db), curre
         proficiencies=proficiencies,
         speed=speed
     )
+
+
+@router.post("/", response_model=CharacterResponse)
+def create_character(char: CharacterCreate, db: Session = Depends(get_db), user_id: int = Depends(ensure_user_id)):
+    new_char = _new_character(char, user_id)
     
     db.add(new_char)
-    db.commit()
+    with serialized_write():
+        db.commit()
     db.refresh(new_char)
     return new_char
 
-@router.get("/", response_model=List[CharacterResponse])
-def get_my_characters(db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+# ============== BULK IMPORT ==============
+
+BULK_IMPORT_MAX = 1000
+BULK_IMPORT_BATCH_SIZE = 200
+
+
+def _bulk_create(db: Session, definitions: list, user_id: int) -> dict:
+    """Validate each definition, derive its columns and insert the valid ones in batches"""
+    results = []
+    batch = []
+    for index, definition in enumerate(definitions):
+        try:
+            char = CharacterCreate(**definition)
+        except (TypeError, ValidationError) as e:
+            results.append({"index": index, "error": e.errors() if isinstance(e, ValidationError) else str(e)})
+            continue
+        batch.append((index, _new_character_values(char, user_id)))
+
+    for start in range(0, len(batch), BULK_IMPORT_BATCH_SIZE):
+        created, errors = insert_characters(db, batch[start:start + BULK_IMPORT_BATCH_SIZE])
+        results.extend({"index": index, "id": character_id} for index, character_id in created.items())
+        results.extend({"index": index, "error": error} for index, error in errors)
+
+    results.sort(key=lambda result: result["index"])
+    created_count = sum("id" in result for result in results)
+    return {"created": created_count, "failed": len(results) - created_count, "results": results}
+
+
+@router.post("/bulk")
+def bulk_create_characters(
+    characters: List[dict] = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(ensure_user_id)
+):
+    """Create many characters in one request; failures are reported per row"""
+    if len(characters) > BULK_IMPORT_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX} characters per request")
+    return _bulk_create(db, characters, user_id)
+
+
+# ============== XP AWARDS ==============
+
+XP_AWARD_MAX_CHARACTERS = 50
+# Well past the 355,000 XP of level 20, and far from SQLite's integer limit
+XP_AWARD_MAX = 1_000_000
+CONSTITUTION = ABILITY_INDEX["constitution"]
+
+
+class XPAwardRequest(BaseModel):
+    character_ids: List[int]
+    xp: int = Field(..., ge=0, le=XP_AWARD_MAX)  # Awarded to each character
+
+
+def _level_up_values(character, xp: int) -> tuple:
+    """
+    Column values for awarding `xp` to a character: the new total, and for
+    each level crossed (levels never go down) one more Hit Die and the fixed
+    HP gain for the class, at least 1. Returns (values, levels_gained, hp_gained).
+    """
+    total_xp = (character.xp or 0) + xp
+    level = character.level or 1
+    gained = max(level, level_for_xp(total_xp)) - level
+    values = {"xp": total_xp}
+    if not gained:
+        return values, 0, 0
     
-    user_email = current_user.get('email')
-    db_user = db.query(User).filter(User.email == user_email).first()
+    con_mod = _compile(character).modifiers[CONSTITUTION]
+    hp_gained = gained * max(1, calc_hp_per_level(character.class_name, con_mod))
+    hit_dice_max = character.hit_dice_max if character.hit_dice_max is not None else level
+    hit_dice_current = character.hit_dice_current if character.hit_dice_current is not None else hit_dice_max
+    values.update(level=level + gained, hit_dice_max=hit_dice_max + gained, hit_dice_current=hit_dice_current + gained)
+    if character.hp_max is not None:
+        values.update(hp_max=character.hp_max + hp_gained, hp_current=(character.hp_current or 0) + hp_gained)
+    return values, gained, hp_gained
+
+
+@router.post("/xp")
+def award_xp(request: XPAwardRequest, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    """Award XP to several characters in one transaction, levelling up any that cross a threshold"""
+    character_ids = list(dict.fromkeys(request.character_ids))
+    if len(character_ids) > XP_AWARD_MAX_CHARACTERS:
+        raise HTTPException(status_code=413, detail=f"At most {XP_AWARD_MAX_CHARACTERS} characters per award")
+    
+    awarded = {}
+    with serialized_write():
+        characters = db.query(Character).filter(
+            Character.id.in_(character_ids),
+            Character.user_id == user_id
+        ).all()
+        for character in characters:
+            values, gained, hp_gained = _level_up_values(character, request.xp)
+            # Guarded on the version read above, so a concurrent edit fails the whole award
+            row = _execute_write(db, _update_returning(character.id, user_id, values, [character.version]), values)
+            if row is None:
+                db.rollback()
+                raise HTTPException(status_code=409, detail="A character changed during the award; nothing was applied")
+            awarded[character.id] = (row, character.level, gained, hp_gained)
+        db.commit()
     
-    if not db_user:
+    results = []
+    for character_id in character_ids:
+        if character_id not in awarded:
+            results.append({"character_id": character_id, "error": "Character not found"})
+            continue
+        row, previous_level, gained, hp_gained = awarded[character_id]
+        results.append({
+            "character_id": character_id,
+            "previous_level": previous_level,
+            "levels_gained": gained,
+            "hp_gained": hp_gained,
+            "sheet": _character_sheet(row)
+        })
+    return {"xp": request.xp, "results": results}
+
+
+# Columns CharacterResponse reads; the other JSON blobs are never loaded
+RESPONSE_COLUMNS = (
+    Character.id, Character.user_id, Character.name, Character.species, Character.class_name,
+    Character.background, Character.level, Character.stats, Character.hp_current, Character.hp_max
+)
+
+@router.get("/", response_model=List[CharacterResponse])
+def get_my_characters(db: Session = Depends(get_db), user_id: Optional[int] = Depends(get_optional_user_id)):
+    if user_id is None:
         return []
         
-    return db_user.characters
+    return (
+        db.query(Character)
+        .options(load_only(*RESPONSE_COLUMNS))
+        .filter(Character.user_id == user_id)
+        .order_by(Character.id)
+        .all()
+    )
+
+
+# ============== PARTY LISTING ==============
+# Keyset-paginated list with column projection: one SELECT per page, reading
+# only the requested columns through the (user_id, updated_at) index.
+
+# Columns a client may ask for. Internal ones (owner, row version, the
+# materialized derived stats, spell ids) are left out on purpose; new columns
+# aren't listed until someone decides they should be.
+LIST_FIELDS = (
+    "id", "name", "species", "class_name", "subclass", "background", "alignment", "level",
+    "stats", "hp_current", "hp_max", "temp_hp", "hit_dice_current", "hit_dice_max", "xp",
+    "renown", "piety", "bastion", "inventory", "proficiencies", "armor_class", "speed",
+    "created_at", "updated_at"
+)
+DEFAULT_LIST_FIELDS = ("id", "name", "class_name", "level", "hp_current", "hp_max")
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 200
+
+# Compared as the stored text so the cursor round-trips exactly
+_UPDATED_AT_TEXT = type_coerce(Character.updated_at, String)
 
 
-# Helper function for ability modifier calculation
-def calc_modifier(score: int) -> int:
-    """Calculate ability modifier from score (D&D 5e formula)"""
-    return (score - 10) // 2
+def _list_fields(fields: Optional[str]) -> list:
+    if not fields:
+        return list(DEFAULT_LIST_FIELDS)
+    names = ["id"] + [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def _encode_cursor(updated_at: str, character_id: int) -> str:
+    payload = json.dumps([updated_at, character_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        updated_at, character_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(updated_at, str) or type(character_id) is not int:
+            raise ValueError(cursor)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return updated_at, character_id
+
+
+def _party_query(user_id: int, names: list, limit: int, cursor: Optional[str]):
+    """Newest first by (updated_at, id); fetches one extra row to detect the next page"""
+    query = select(
+        *(Character.__table__.c[name] for name in names),
+        _UPDATED_AT_TEXT.label("_cursor_updated_at"),
+        Character.id.label("_cursor_id")
+    ).where(Character.user_id == user_id)
+    if cursor:
+        query = query.where(tuple_(_UPDATED_AT_TEXT, Character.id) < tuple_(*_decode_cursor(cursor)))
+    return query.order_by(Character.updated_at.desc(), Character.id.desc()).limit(limit + 1)
+
+
+def _party_page(rows: list, names: list, limit: int) -> dict:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]._cursor_updated_at, rows[-1]._cursor_id)
+    return {
+        "characters": [{name: row._mapping[name] for name in names} for row in rows],
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/party")
+def list_party(
+    fields: Optional[str] = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Page through the user's characters, newest first; `fields` picks the columns returned"""
+    names = _list_fields(fields)
+    rows = db.execute(_party_query(user_id, names, limit, cursor)).all()
+    return _party_page(rows, names, limit)
+
+
+# Columns the batch engine reads; loading only these skips the large JSON blobs
+_DERIVED_IS_CURRENT = Character.derived["v"].as_integer() == DERIVED_VERSION
+DERIVED_COLUMNS = (
+    Character.id, Character.name, Character.level, Character.stats,
+    Character.proficiencies, Character.armor_class,
+    # AC with equipped armor: the materialized value, or for rows without
+    # current derived stats the inventory to compute it from
+    case((_DERIVED_IS_CURRENT, Character.derived["armor_class"].as_integer())).label("equipped_armor_class"),
+    type_coerce(case((_DERIVED_IS_CURRENT, None), else_=Character.inventory), JSON).label("inventory")
+)
+
+
+def _derived_query(user_id: int, ids: Optional[List[int]]):
+    query = select(*DERIVED_COLUMNS).where(Character.user_id == user_id)
+    if ids:
+        query = query.where(Character.id.in_(ids))
+    return query.order_by(Character.id)
+
+
+@router.get("/derived")
+def get_derived_stats(
+    ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Derived stats (modifiers, skill and save totals, AC, attack bonuses) for many characters at once"""
+    rows = db.execute(_derived_query(user_id, ids)).all()
+    return {"characters": derived_summaries(rows)}
+
+
+@router.get("/export")
+def export_characters(
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Stream the user's characters as NDJSON (gzip-encoded when the client accepts it)"""
+    # Pages are read on their own connections; don't keep the identity lookup's open meanwhile
+    db.close()
+    return export_response(ndjson_export(db.get_bind(), user_id), accepts_gzip(accept_encoding))
+
+
+# ============== ITEM QUERIES ==============
+
+def _item_holders(item: str, rows) -> dict:
+    key = lookup_key(item)
+    holders = (
+        [{"id": row.id, "name": row.name, "quantity": row.quantity, "equipped": bool(row.equipped)} for row in rows]
+        if INVENTORY_ITEMS_ENABLED else scan_holders(rows, key)
+    )
+    return {"item": key, "holders": holders, "quantity": sum(holder["quantity"] for holder in holders)}
+
+
+def _holders_statement(user_id: int, item: str):
+    return holders_query(user_id, lookup_key(item)) if INVENTORY_ITEMS_ENABLED else inventory_scan_query(user_id, None)
+
+
+def _party_items_statement(user_id: int, ids: Optional[List[int]]):
+    return party_items_query(user_id, ids) if INVENTORY_ITEMS_ENABLED else inventory_scan_query(user_id, ids)
+
+
+def _party_items(rows) -> dict:
+    if not INVENTORY_ITEMS_ENABLED:
+        return party_inventory(scan_party_items(rows))
+    return party_inventory([
+        {
+            "item": row.item_key, "category": row.category, "name": row.name, "quantity": row.quantity,
+            "holders": row.holders, "weight": row.weight, "value_cp": row.value_cp
+        }
+        for row in rows
+    ])
+
+
+@router.get("/items")
+def get_party_items(
+    ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Item totals across the user's characters (or the given ones), with their coin value and weight"""
+    return _party_items(db.execute(_party_items_statement(user_id, ids)).all())
+
+
+@router.get("/items/{item}")
+def get_item_holders(item: str, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    """The user's characters carrying an item, by catalogue key or item name (custom items too)"""
+    return _item_holders(item, db.execute(_holders_statement(user_id, item)).all())
 
 
 class CharacterDetailResponse(CharacterBase):
@@ -168,33 +480,31 @@ class CharacterUpdate(BaseModel):
     subclass: Optional[str] = None
     alignment: Optional[str] = None
 
+    @validator("stats")
+    def check_stats(cls, stats):
+        """Ability scores are integers from 1 to 30"""
+        return None if stats is None else check_ability_scores(stats)
 
-@router.get("/{character_id}")
-def get_character(character_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    """Get a single character by ID with computed modifiers"""
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    user_email = current_user.get('email')
-    db_user = db.query(User).filter(User.email == user_email).first()
-    
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    character = db.query(Character).filter(
-        Character.id == character_id,
-        Character.user_id == db_user.id
-    ).first()
-    
-    if not character:
-        raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Build response with computed modifiers
+    @validator("spells")
+    def compact_spell_references(cls, spells):
+        """Spell lists hold catalogue ids; names are accepted and converted"""
+        return None if spells is None else compact_spells(spells)
+
+
+def _character_detail(character) -> dict:
+    """Serialize a character (ORM object or RETURNING row) with its materialized modifiers"""
     stats = character.stats or {}
-    modifiers = {
-        ability: calc_modifier(stats.get(ability, 10))
-        for ability in ["strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma"]
-    }
+    derived = character.derived
+    if is_current(derived):
+        modifiers = dict(zip(ABILITIES, derived["modifiers"]))
+        proficiency_bonus = derived["proficiency_bonus"]
+        armor_class = derived["armor_class"]
+    else:
+        modifiers = _ability_modifiers(stats)
+        proficiency_bonus = get_proficiency_bonus(character.level)
+        armor_class = equipped_armor_class(
+            character.inventory, modifiers.get("dexterity", 0), character.armor_class, character.proficiencies
+        )
     
     return {
         "id": character.id,
@@ -208,72 +518,344 @@ def get_character(character_id: int, db: Session = Depends(get_db), current_user
         "alignment": character.alignment,
         "stats": stats,
         "modifiers": modifiers,
-        "proficiency_bonus": get_proficiency_bonus(character.level),
+        "proficiency_bonus": proficiency_bonus,
         "proficiencies": character.proficiencies or {"skills": [], "saves": [], "tools": [], "weapons": [], "armor": []},
         "hp_current": character.hp_current,
         "hp_max": character.hp_max,
         "temp_hp": character.temp_hp or 0,
         "hit_dice_current": character.hit_dice_current,
         "hit_dice_max": character.hit_dice_max,
-        "armor_class": (character.armor_class or 10) + modifiers.get("dexterity", 0),
+        "armor_class": armor_class,
         "speed": character.speed or 30,
         "xp": character.xp or 0,
         "renown": character.renown or {},
         "piety": character.piety or {},
         "bastion": character.bastion or {},
         "inventory": character.inventory or [],
-        "spells": character.spells or {}
+        "spells": character.spells or {},
+        "version": character.version
     }
 
 
-@router.put("/{character_id}")
-def update_character(character_id: int, update: CharacterUpdate, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    """Update a character's fields (partial update)"""
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    user_email = current_user.get('email')
-    db_user = db.query(User).filter(User.email == user_email).first()
-    
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    character = db.query(Character).filter(
+# ============== ETAGS / CONDITIONAL REQUESTS ==============
+
+def _character_etag(character_id: int, version: int, representation: str = "") -> str:
+    """
+    Strong ETag for one representation of a character at a row version.
+    Representations also carry SRD data (armor, spell details), so the
+    compiled SRD's hash is part of the tag.
+    """
+    suffix = f".{representation}" if representation else ""
+    return f'"c{character_id}v{version}-{srd_version()}{suffix}"'
+
+
+_ETAG_PATTERN = re.compile(r'^"c(\d+)v(\d+)-(\w+)(?:\.\w+)?"$')
+
+
+def _expected_versions(character_id: int, if_match: Optional[str]) -> Optional[List[int]]:
+    """Row versions an If-Match header accepts, or None when the write is unconditional"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    versions = []
+    for etag in strong_etags(if_match):
+        match = _ETAG_PATTERN.match(etag)
+        if match and int(match.group(1)) == character_id and match.group(3) == srd_version():
+            versions.append(int(match.group(2)))
+    return versions
+
+
+def _owned_version(db: Session, character_id: int, user_id: int) -> Optional[int]:
+    row = db.query(Character.version).filter(
         Character.id == character_id,
-        Character.user_id == db_user.id
+        Character.user_id == user_id
     ).first()
-    
-    if not character:
+    return row.version if row else None
+
+
+def _conditional_get(db: Session, character_id: int, user_id: int, if_none_match: Optional[str], representation: str = ""):
+    """304 response if the client's copy is current, else None. Only reads the version column."""
+    if not if_none_match:
+        return None
+    version = _owned_version(db, character_id, user_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Character not found")
+    etag = _character_etag(character_id, version, representation)
+    return not_modified(etag) if etag_matches(if_none_match, etag) else None
+
+
+def _write_failed(db: Session, character_id: int, user_id: int, versions: Optional[List[int]]):
+    """Raise 412 if a conditional write lost to a newer version, otherwise 404"""
+    if versions is not None and _owned_version(db, character_id, user_id) is not None:
+        raise HTTPException(status_code=412, detail="Character has been modified")
+    raise HTTPException(status_code=404, detail="Character not found")
+
+
+@router.get("/{character_id}")
+def get_character(
+    character_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Get a single character by ID with computed modifiers"""
+    cached = _conditional_get(db, character_id, user_id, if_none_match)
+    if cached is not None:
+        return cached
+    
+    character = _get_character_for_user(character_id, db, user_id)
+    response.headers["ETag"] = _character_etag(character.id, character.version)
+    return _character_detail(character)
+
+
+def _update_returning(character_id: int, user_id: int, values: dict, versions: Optional[List[int]] = None):
+    """UPDATE ... WHERE id AND user_id RETURNING every column: ownership check, write and reload in one statement"""
+    stmt = (
+        sql_update(Character)
+        .where(Character.id == character_id, Character.user_id == user_id)
+        .values(**values, version=Character.version + 1)
+        .returning(*Character.__table__.c)
+        .execution_options(synchronize_session=False)
+    )
+    if versions is not None:
+        stmt = stmt.where(Character.version.in_(versions))
+    return stmt
+
+
+def _derived_refresh(row, columns):
+    """
+    (UPDATE or None, row to serialize) bringing the materialized derived
+    stats of a just-written row up to date; only nodes downstream of
+    `columns` are recomputed (see backend.materialized)
+    """
+    derived, _ = refresh(row.derived, row, columns)
+    if derived is row.derived:
+        return None, row
+    stmt = (
+        sql_update(Character)
+        .where(Character.id == row.id)
+        .values(derived=derived, updated_at=Character.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return stmt, SimpleNamespace(**dict(row._mapping, derived=derived))
+
+
+def _follow_up_writes(row, columns) -> tuple:
+    """
+    (writes, row to serialize) completing an _update_returning write of
+    `columns`: the derived refresh and, when the inventory changed, its
+    inventory_items rows, as (statement, parameters) pairs.
+    """
+    writes = []
+    refresh_stmt, row = _derived_refresh(row, columns)
+    if refresh_stmt is not None:
+        writes.append((refresh_stmt, None))
+    if "inventory" in columns:
+        writes.extend(inventory_item_writes([(row.id, row.inventory)]))
+    return writes, row
+
+
+def _execute_write(db: Session, stmt, columns):
+    """Run an _update_returning statement plus its follow-up writes; returns the row or None"""
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+    writes, row = _follow_up_writes(row, columns)
+    for statement, parameters in writes:
+        db.execute(statement, parameters)
+    return row
+
+
+@router.put("/{character_id}")
+def update_character(
+    character_id: int,
+    update: CharacterUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Update a character's fields (partial update). Honours If-Match for optimistic concurrency."""
+    versions = _expected_versions(character_id, if_match)
     
     # Update only provided fields
     update_data = update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(character, field, value)
-    
-    db.commit()
-    db.refresh(character)
+    if not update_data:
+        character = _get_character_for_user(character_id, db, user_id)
+        if versions is not None and character.version not in versions:
+            raise HTTPException(status_code=412, detail="Character has been modified")
+        row = character
+    else:
+        with serialized_write():
+            row = _execute_write(db, _update_returning(character_id, user_id, update_data, versions), update_data)
+            db.commit()
+        if row is None:
+            _write_failed(db, character_id, user_id, versions)
     
-    # Return updated character with modifiers
-    return get_character(character_id, db, current_user)
+    # Return updated character with modifiers, built from the RETURNING row
+    response.headers["ETag"] = _character_etag(row.id, row.version)
+    return _character_detail(row)
 
 
-# ============== ROLL CALCULATION ENDPOINTS ==============
+# ============== PATCH (RFC 6902 / RFC 7396) ==============
 
-def _get_character_for_user(character_id: int, db: Session, current_user: dict) -> Character:
-    """Helper to fetch character with ownership check"""
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+JSON_PATCH_TYPE = "application/json-patch+json"
+MERGE_PATCH_TYPE = "application/merge-patch+json"
+
+# Fields a patch may touch, and the JSON columns whose contents can be patched in place
+PATCHABLE_FIELDS = tuple(CharacterUpdate().dict())
+JSON_PATCH_COLUMNS = ("stats", "inventory", "spells", "renown", "piety", "bastion")
+# Columns whose new value must be validated in full, so they're never patched in SQL
+VALIDATED_AS_A_WHOLE = frozenset(("stats", "spells"))
+# JSON objects whose members a JSON Patch may set in SQL; anything else
+# (array elements, spell lists, ability scores) is patched in Python
+PUSHDOWN_OBJECTS = frozenset({("renown",), ("piety",), ("bastion",), ("spells", "slots")})
+
+
+def _validate_update(values: dict) -> dict:
+    """Validate update values; returns them with spell references compacted to ids"""
+    try:
+        update = CharacterUpdate(**values)
+    except ValidationError as e:
+        # Via JSON: error contexts can hold the raised exception itself
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+    if values.get("spells") is not None:
+        values = dict(values, spells=update.spells)
+    return values
+
+
+def _patch_in_python(db: Session, character_id: int, user_id: int, transform, versions: Optional[List[int]]) -> dict:
+    """Read-modify-write fallback: apply `transform` to the character's fields and write what changed"""
+    with serialized_write():
+        character = _get_character_for_user(character_id, db, user_id)
+        if versions is not None and character.version not in versions:
+            raise HTTPException(status_code=412, detail="Character has been modified")
+        doc = {name: getattr(character, name) for name in PATCHABLE_FIELDS}
+        try:
+            new_doc = transform(doc)
+        except JsonPatchConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except JsonPatchError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        if not isinstance(new_doc, dict) or set(new_doc) - set(PATCHABLE_FIELDS):
+            raise HTTPException(status_code=422, detail="Patch may only change character fields")
+        
+        changed = {name: new_doc.get(name) for name in PATCHABLE_FIELDS if new_doc.get(name) != doc[name]}
+        changed = _validate_update(changed)
+        if not changed:
+            return _character_detail(character)
+        
+        row = _execute_write(db, _update_returning(character_id, user_id, changed, versions), changed)
+        db.commit()
+    return _character_detail(row)
+
+
+def _pushdown_columns(operations: list) -> dict:
+    """
+    Columns a JSON Patch may touch in SQL. Spells are validated as a whole,
+    except that scalar slot counts (/spells/slots/<level>) aren't, so a patch
+    that only ticks slots can still be pushed down.
+    """
+    names = [name for name in PATCHABLE_FIELDS if name not in VALIDATED_AS_A_WHOLE]
+    slot_ticks_only = True
+    for operation in operations:
+        try:
+            tokens = parse_pointer(operation.get("path"))
+        except (AttributeError, JsonPatchError):
+            return {}
+        if tokens[:1] == ["spells"]:
+            slot_ticks_only &= len(tokens) == 3 and tokens[1] == "slots" and not isinstance(operation.get("value"), (dict, list))
+    if slot_ticks_only:
+        names.append("spells")
+    return {name: getattr(Character, name) for name in names}
+
+
+def _merge_patch_character(db: Session, character_id: int, user_id: int, patch, versions: Optional[List[int]]) -> dict:
+    if not isinstance(patch, dict):
+        raise HTTPException(status_code=422, detail="A merge patch must be a JSON object")
+    unknown = set(patch) - set(PATCHABLE_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    # Spell lists and ability scores are validated as a whole (the merged
+    # document, before the UPDATE), so patches to them are applied in Python
+    if db.get_bind().dialect.name != "sqlite" or VALIDATED_AS_A_WHOLE.intersection(patch):
+        return _patch_in_python(db, character_id, user_id, lambda doc: apply_merge_patch(doc, patch), versions)
     
-    user_email = current_user.get('email')
-    db_user = db.query(User).filter(User.email == user_email).first()
+    # Object patches on JSON object columns become json_patch(); everything else is a plain SET
+    values = {}
+    plain = {}
+    for name, value in patch.items():
+        if name in JSON_PATCH_COLUMNS and name != "inventory" and isinstance(value, dict):
+            values[name] = sqlite_merge_patch(getattr(Character, name), value)
+        else:
+            plain[name] = value
+    _validate_update(plain)
+    values.update(plain)
     
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    with serialized_write():
+        row = _execute_write(db, _update_returning(character_id, user_id, values, versions), values)
+        db.commit()
+    
+    if row is None:
+        _write_failed(db, character_id, user_id, versions)
+    return _character_detail(row)
+
+
+def _json_patch_character(db: Session, character_id: int, user_id: int, operations, versions: Optional[List[int]]) -> dict:
+    if not isinstance(operations, list):
+        raise HTTPException(status_code=422, detail="A JSON Patch must be an array of operations")
+    
+    compiled = None
+    if db.get_bind().dialect.name == "sqlite":
+        compiled = sqlite_json_patch(_pushdown_columns(operations), PUSHDOWN_OBJECTS, operations)
+    
+    if compiled is not None:
+        values, guards = compiled
+        _validate_update({name: value for name, value in values.items() if not isinstance(value, ClauseElement)})
+        with serialized_write():
+            row = _execute_write(db, _update_returning(character_id, user_id, values, versions).where(*guards), values)
+            db.commit()
+        if row is not None:
+            return _character_detail(row)
+        # Missing character, stale If-Match or a target the patch expected
+        # isn't there: let the Python path produce the precise 404/409/412/422
     
+    return _patch_in_python(db, character_id, user_id, lambda doc: apply_json_patch(doc, operations), versions)
+
+
+@router.patch("/{character_id}")
+def patch_character(
+    character_id: int,
+    response: Response,
+    patch: Union[list, dict] = Body(...),
+    content_type: str = Header("application/json"),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Partially update a character with a JSON Patch (RFC 6902) or a merge patch (RFC 7396)"""
+    versions = _expected_versions(character_id, if_match)
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == JSON_PATCH_TYPE:
+        detail = _json_patch_character(db, character_id, user_id, patch, versions)
+    elif media_type in (MERGE_PATCH_TYPE, "application/json"):
+        detail = _merge_patch_character(db, character_id, user_id, patch, versions)
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported patch format: {media_type}")
+    
+    response.headers["ETag"] = _character_etag(detail["id"], detail["version"])
+    return detail
+
+
+# ============== ROLL CALCULATION ENDPOINTS ==============
+
+def _get_character_for_user(character_id: int, db: Session, user_id: int) -> Character:
+    """Helper to fetch character with ownership check"""
     character = db.query(Character).filter(
         Character.id == character_id,
-        Character.user_id == db_user.id
+        Character.user_id == user_id
     ).first()
     
     if not character:
@@ -282,164 +864,595 @@ def _get_character_for_user(character_id: int, db: Session, current_user: dict)
     return character
 
 
-@router.get("/{character_id}/roll/skill/{skill_name}")
-def calc_skill_check(character_id: int, skill_name: str, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    """Calculate skill check modifier for a given skill"""
-    character = _get_character_for_user(character_id, db, current_user)
-    
-    # Get the ability for this skill
-    ability = SKILL_ABILITIES.get(skill_name)
-    if not ability:
-        raise HTTPException(status_code=400, detail=f"Unknown skill: {skill_name}")
-    
-    stats = character.stats or {}
-    ability_mod = calc_modifier(stats.get(ability, 10))
-    
-    # Check if proficient
-    proficiencies = character.proficiencies or {}
-    skill_profs = proficiencies.get("skills", [])
-    is_proficient = skill_name in skill_profs
-    
-    prof_bonus = get_proficiency_bonus(character.level) if is_proficient else 0
-    total_modifier = ability_mod + prof_bonus
-    
+def _format_modifier(value: int) -> str:
+    return f"+{value}" if value >= 0 else str(value)
+
+
+def _ability_modifiers(stats: dict) -> dict:
+    return {ability: calc_modifier(stats.get(ability, 10)) for ability in ABILITIES}
+
+
+def _compile(character: Character) -> CompiledCharacter:
+    """The character's roll rows: the materialized ones, or compiled now for rows without them"""
+    if is_current(character.derived):
+        return compiled_view(character.derived)
+    return compile_character(character.stats, character.proficiencies, character.level)
+
+
+def _skill_line(compiled: CompiledCharacter, skill_name: str) -> dict:
+    """Skill check modifier for one skill (skill_name must be in SKILL_ABILITIES)"""
+    return _skill_result(skill_name, skill_roll(compiled, SKILL_INDEX[skill_name]))
+
+
+def _skill_result(skill_name: str, roll: tuple) -> dict:
+    ability_mod, is_proficient, prof_bonus, total_modifier = roll
     return {
         "skill": skill_name,
-        "ability": ability,
+        "ability": SKILL_ABILITIES[skill_name],
         "ability_modifier": ability_mod,
         "proficient": is_proficient,
         "proficiency_bonus": prof_bonus,
         "total_modifier": total_modifier,
-        "display": f"+{total_modifier}" if total_modifier >= 0 else str(total_modifier)
+        "display": _format_modifier(total_modifier)
     }
 
 
-@router.get("/{character_id}/roll/save/{ability}")
-def calc_saving_throw(character_id: int, ability: str, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    """Calculate saving throw modifier for a given ability"""
-    character = _get_character_for_user(character_id, db, current_user)
-    
-    valid_abilities = ["strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma"]
-    ability = ability.lower()
-    if ability not in valid_abilities:
-        raise HTTPException(status_code=400, detail=f"Invalid ability: {ability}")
-    
-    stats = character.stats or {}
-    ability_mod = calc_modifier(stats.get(ability, 10))
-    
-    # Check if proficient in this save
-    proficiencies = character.proficiencies or {}
-    save_profs = proficiencies.get("saves", [])
-    is_proficient = ability in save_profs
-    
-    prof_bonus = get_proficiency_bonus(character.level) if is_proficient else 0
-    total_modifier = ability_mod + prof_bonus
-    
+def _save_line(compiled: CompiledCharacter, ability: str) -> dict:
+    """Saving throw modifier for one ability (ability must be in ABILITIES)"""
+    return _save_result(ability, save_roll(compiled, ABILITY_INDEX[ability]))
+
+
+def _save_result(ability: str, roll: tuple) -> dict:
+    ability_mod, is_proficient, prof_bonus, total_modifier = roll
     return {
         "ability": ability,
         "ability_modifier": ability_mod,
         "proficient": is_proficient,
         "proficiency_bonus": prof_bonus,
         "total_modifier": total_modifier,
-        "display": f"+{total_modifier}" if total_modifier >= 0 else str(total_modifier)
+        "display": _format_modifier(total_modifier)
     }
 
 
-@router.get("/{character_id}/roll/attack")
-def calc_attack_roll(character_id: int, weapon_type: str = "melee", use_dex: bool = False, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    """Calculate attack roll modifier (generic, not weapon-specific yet)"""
-    character = _get_character_for_user(character_id, db, current_user)
-    
-    stats = character.stats or {}
-    
-    # Determine ability modifier (STR for melee, DEX for ranged, or Finesse)
-    if use_dex or weapon_type.lower() == "ranged":
-        ability = "dexterity"
-    else:
-        ability = "strength"
-    
-    ability_mod = calc_modifier(stats.get(ability, 10))
-    prof_bonus = get_proficiency_bonus(character.level)  # Assume proficient with equipped weapons
-    
-    to_hit = ability_mod + prof_bonus
-    
+def _attack_ability(weapon_type: str, use_dex: bool) -> str:
+    # STR for melee, DEX for ranged, or Finesse
+    return "dexterity" if use_dex or weapon_type.lower() == "ranged" else "strength"
+
+
+def _attack_line(compiled: CompiledCharacter, weapon_type: str = "melee", use_dex: bool = False) -> dict:
+    """Generic attack roll modifier (not weapon-specific yet)"""
+    ability = _attack_ability(weapon_type, use_dex)
+    return _attack_result(weapon_type, ability, attack_roll(compiled, ABILITY_INDEX[ability]))
+
+
+def _attack_result(weapon_type: str, ability: str, roll: tuple) -> dict:
+    ability_mod, _, prof_bonus, to_hit = roll
     return {
         "weapon_type": weapon_type,
         "ability": ability,
         "ability_modifier": ability_mod,
         "proficiency_bonus": prof_bonus,
         "to_hit": to_hit,
-        "display": f"+{to_hit}" if to_hit >= 0 else str(to_hit),
+        "display": _format_modifier(to_hit),
         "damage_bonus": ability_mod  # Damage uses same ability mod
     }
 
 
+@router.get("/{character_id}/roll/skill/{skill_name}")
+def calc_skill_check(character_id: int, skill_name: str, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    """Calculate skill check modifier for a given skill"""
+    character = _get_character_for_user(character_id, db, user_id)
+    
+    if skill_name not in SKILL_ABILITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown skill: {skill_name}")
+    
+    return _skill_line(_compile(character), skill_name)
+
+
+@router.get("/{character_id}/roll/save/{ability}")
+def calc_saving_throw(character_id: int, ability: str, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    """Calculate saving throw modifier for a given ability"""
+    character = _get_character_for_user(character_id, db, user_id)
+    
+    ability = ability.lower()
+    if ability not in ABILITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid ability: {ability}")
+    
+    return _save_line(_compile(character), ability)
+
+
+@router.get("/{character_id}/roll/attack")
+def calc_attack_roll(character_id: int, weapon_type: str = "melee", use_dex: bool = False, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    """Calculate attack roll modifier (generic, not weapon-specific yet)"""
+    character = _get_character_for_user(character_id, db, user_id)
+    return _attack_line(_compile(character), weapon_type, use_dex)
+
+
+# ============== DICE ROLLS ==============
+# POST on a roll path rolls the d20 with the modifier its GET returns.
+# Rolls draw from the caller's dice stream (see backend.dice), or from a
+# one-off stream when `seed` is given, so a seeded roll is reproducible.
+
+ROLL_MODES = ("adv", "dis")
+
+
+def _validate_roll_mode(mode: Optional[str]):
+    if mode is not None and mode not in ROLL_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid roll mode: {mode} (use adv or dis)")
+
+
+def _validate_damage(damage: Optional[str]):
+    if damage is None:
+        return
+    try:
+        compile_expression(damage)
+    except DiceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _rolled_check(line: dict, user_id: int, mode: Optional[str], seed: Optional[int]) -> dict:
+    """Add a d20 roll for a skill/save line"""
+    stream = stream_for(user_id, seed)
+    with stream.lock:
+        line["roll"] = roll_check(line["total_modifier"], mode, stream.generator)
+    return line
+
+
+def _rolled_attack(line: dict, user_id: int, mode: Optional[str], seed: Optional[int], damage: Optional[str]) -> dict:
+    """Add the attack roll and, given a damage expression, damage (dice doubled on a natural 20)"""
+    stream = stream_for(user_id, seed)
+    with stream.lock:
+        line["roll"] = roll_check(line["to_hit"], mode, stream.generator)
+        if damage is not None:
+            line["damage"] = roll_damage(damage, line["damage_bonus"], line["roll"]["critical"], stream.generator)
+    return line
+
+
+@router.post("/{character_id}/roll/skill/{skill_name}")
+def roll_skill_check(
+    character_id: int,
+    skill_name: str,
+    mode: Optional[str] = None,
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Roll a skill check (mode: adv or dis)"""
+    character = _get_character_for_user(character_id, db, user_id)
+    
+    if skill_name not in SKILL_ABILITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown skill: {skill_name}")
+    _validate_roll_mode(mode)
+    
+    return _rolled_check(_skill_line(_compile(character), skill_name), user_id, mode, seed)
+
+
+@router.post("/{character_id}/roll/save/{ability}")
+def roll_saving_throw(
+    character_id: int,
+    ability: str,
+    mode: Optional[str] = None,
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Roll a saving throw (mode: adv or dis)"""
+    character = _get_character_for_user(character_id, db, user_id)
+    
+    ability = ability.lower()
+    if ability not in ABILITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid ability: {ability}")
+    _validate_roll_mode(mode)
+    
+    return _rolled_check(_save_line(_compile(character), ability), user_id, mode, seed)
+
+
+@router.post("/{character_id}/roll/attack")
+def roll_attack(
+    character_id: int,
+    weapon_type: str = "melee",
+    use_dex: bool = False,
+    damage: Optional[str] = None,
+    mode: Optional[str] = None,
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Roll an attack, plus damage when a damage expression (e.g. 1d8 slashing) is given"""
+    character = _get_character_for_user(character_id, db, user_id)
+    _validate_roll_mode(mode)
+    _validate_damage(damage)
+    return _rolled_attack(_attack_line(_compile(character), weapon_type, use_dex), user_id, mode, seed, damage)
+
+
+# ============== ODDS ==============
+# Exact chances for the same lines, from backend.odds (memoized, so these
+# cost about as much as the modifier lookups themselves).
+
+def _check_odds(line: dict, dc: int, mode: Optional[str]) -> dict:
+    line["odds"] = {"dc": dc, "mode": mode, "success_chance": round(check_chance(line["total_modifier"], dc, mode), 6)}
+    return line
+
+
+def _attack_odds(
+    line: dict,
+    armor_class: int,
+    mode: Optional[str],
+    damage: Optional[str],
+    attacks: int,
+    crit_on: int,
+    distribution: bool
+) -> dict:
+    try:
+        odds = attack_odds(line["to_hit"], armor_class, mode, damage, line["damage_bonus"], attacks, crit_on)
+    except DiceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    line["odds"] = {
+        "armor_class": armor_class,
+        "mode": mode,
+        "hit_chance": round(odds.hit_chance, 6),
+        "crit_chance": round(odds.crit_chance, 6)
+    }
+    if odds.damage is not None:
+        line["odds"]["attacks"] = attacks
+        line["odds"]["expected_damage"] = round(odds.expected_damage, 4)
+        line["odds"]["damage"] = describe(odds.damage, distribution)
+    return line
+
+
+@router.get("/{character_id}/odds/skill/{skill_name}")
+def skill_check_odds(
+    character_id: int,
+    skill_name: str,
+    dc: int = Query(..., ge=0),
+    mode: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Chance of making a skill check against a DC"""
+    character = _get_character_for_user(character_id, db, user_id)
+    
+    if skill_name not in SKILL_ABILITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown skill: {skill_name}")
+    _validate_roll_mode(mode)
+    
+    return _check_odds(_skill_line(_compile(character), skill_name), dc, mode)
+
+
+@router.get("/{character_id}/odds/save/{ability}")
+def saving_throw_odds(
+    character_id: int,
+    ability: str,
+    dc: int = Query(..., ge=0),
+    mode: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Chance of making a saving throw against a DC"""
+    character = _get_character_for_user(character_id, db, user_id)
+    
+    ability = ability.lower()
+    if ability not in ABILITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid ability: {ability}")
+    _validate_roll_mode(mode)
+    
+    return _check_odds(_save_line(_compile(character), ability), dc, mode)
+
+
+@router.get("/{character_id}/odds/attack")
+def attack_roll_odds(
+    character_id: int,
+    ac: int = Query(..., ge=0),
+    weapon_type: str = "melee",
+    use_dex: bool = False,
+    damage: Optional[str] = None,
+    mode: Optional[str] = None,
+    attacks: int = 1,
+    crit_on: int = 20,
+    distribution: bool = False,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Hit and crit chance against an AC; with `damage`, expected damage per round of `attacks`"""
+    character = _get_character_for_user(character_id, db, user_id)
+    _validate_roll_mode(mode)
+    _validate_damage(damage)
+    line = _attack_line(_compile(character), weapon_type, use_dex)
+    return _attack_odds(line, ac, mode, damage, attacks, crit_on, distribution)
+
+
 @router.get("/{character_id}/skills")
-def get_all_skills(character_id: int, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+def get_all_skills(character_id: int, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
     """Get all 18 skills with their modifiers for a character"""
-    character = _get_character_for_user(character_id, db, current_user)
-    
-    stats = character.stats or {}
-    proficiencies = character.proficiencies or {}
-    skill_profs = proficiencies.get("skills", [])
-    prof_bonus = get_proficiency_bonus(character.level)
+    compiled = _compile(_get_character_for_user(character_id, db, user_id))
     
     skills = []
-    for skill_name, ability in SKILL_ABILITIES.items():
-        ability_mod = calc_modifier(stats.get(ability, 10))
-        is_proficient = skill_name in skill_profs
-        total = ability_mod + (prof_bonus if is_proficient else 0)
-        
+    for skill_index, skill_name in enumerate(SKILL_NAMES):
+        _, is_proficient, _, total_modifier = skill_roll(compiled, skill_index)
         skills.append({
             "name": skill_name,
-            "ability": ability,
-            "modifier": total,
+            "ability": SKILL_ABILITIES[skill_name],
+            "modifier": total_modifier,
             "proficient": is_proficient
         })
     
     return {"skills": skills}
 
 
+class RollSpec(BaseModel):
+    """One column of a roll matrix"""
+    type: str  # "skill", "save" or "attack"
+    name: str  # Skill name, ability, or attack line ("melee", "ranged", "finesse")
+
+
+# A party, and every skill, save and attack line with room to spare
+ROLL_MATRIX_MAX_CHARACTERS = 50
+ROLL_MATRIX_MAX_ROLLS = 50
+
+
+class RollMatrixRequest(BaseModel):
+    character_ids: List[int] = Field(..., max_length=ROLL_MATRIX_MAX_CHARACTERS)
+    rolls: List[RollSpec] = Field(..., max_length=ROLL_MATRIX_MAX_ROLLS)
+
+
+def _roll_column(spec: RollSpec):
+    """(kernel roll, formatter) for one matrix column"""
+    if spec.type == "skill":
+        return ("skill", SKILL_INDEX[spec.name]), lambda roll: _skill_result(spec.name, roll)
+    if spec.type == "save":
+        ability = spec.name.lower()
+        return ("save", ABILITY_INDEX[ability]), lambda roll: _save_result(ability, roll)
+    ability = _attack_ability(spec.name, use_dex=spec.name == "finesse")
+    return ("attack", ABILITY_INDEX[ability]), lambda roll: _attack_result(spec.name, ability, roll)
+
+
+def _roll_matrix(characters: List[Character], character_ids: List[int], rolls: List[RollSpec]) -> dict:
+    """Build the roll matrix response for characters already loaded and ownership-filtered"""
+    columns = [_roll_column(spec) for spec in rolls]
+    formatters = [formatter for _, formatter in columns]
+    table = roll_table(characters, [roll for roll, _ in columns])
+    by_id = {character.id: (character, row) for character, row in zip(characters, table)}
+    
+    results = []
+    for character_id in character_ids:
+        if character_id not in by_id:
+            # Missing and not-owned characters are indistinguishable to the caller
+            results.append({"character_id": character_id, "error": "Character not found"})
+            continue
+        character, row = by_id[character_id]
+        results.append({
+            "character_id": character_id,
+            "name": character.name,
+            "rolls": [formatter(roll) for formatter, roll in zip(formatters, row)]
+        })
+    
+    return {"rolls": [spec.dict() for spec in rolls], "results": results}
+
+
+def _validate_roll_spec(spec: RollSpec):
+    if spec.type == "skill":
+        if spec.name not in SKILL_ABILITIES:
+            raise HTTPException(status_code=400, detail=f"Unknown skill: {spec.name}")
+    elif spec.type == "save":
+        if spec.name.lower() not in ABILITIES:
+            raise HTTPException(status_code=400, detail=f"Invalid ability: {spec.name}")
+    elif spec.type == "attack":
+        if spec.name not in ("melee", "ranged", "finesse"):
+            raise HTTPException(status_code=400, detail=f"Unknown attack line: {spec.name}")
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown roll type: {spec.type}")
+
+
+@router.post("/rolls")
+def calc_roll_matrix(request: RollMatrixRequest, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    """Calculate a matrix of roll modifiers (characters x roll specs) with one query"""
+    for spec in request.rolls:
+        _validate_roll_spec(spec)
+    
+    character_ids = list(dict.fromkeys(request.character_ids))
+    characters = db.query(Character).filter(
+        Character.id.in_(character_ids),
+        Character.user_id == user_id
+    ).all()
+    return _roll_matrix(characters, character_ids, request.rolls)
+
+
+@router.get("/{character_id}/sheet")
+def get_character_sheet(
+    character_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Full character sheet in one payload: details, all skills, saves and attack lines"""
+    cached = _conditional_get(db, character_id, user_id, if_none_match, "sheet")
+    if cached is not None:
+        return cached
+    
+    character = _get_character_for_user(character_id, db, user_id)
+    response.headers["ETag"] = _character_etag(character.id, character.version, "sheet")
+    return _character_sheet(character)
+
+
+def _character_sheet(character: Character) -> dict:
+    sheet = _character_detail(character)
+    compiled = _compile(character)
+    sheet["equipment"] = _equipment_summary(character, compiled)
+    sheet["skills"] = [_skill_line(compiled, skill_name) for skill_name in SKILL_NAMES]
+    sheet["saves"] = [_save_line(compiled, ability) for ability in ABILITIES]
+    sheet["attacks"] = {
+        "melee": _attack_line(compiled, "melee"),
+        "ranged": _attack_line(compiled, "ranged"),
+        "finesse": _attack_line(compiled, "finesse", use_dex=True)
+    }
+    return sheet
+
+
+
+# ============== INVENTORY ==============
+
+def _equipment_summary(character: Character, compiled: CompiledCharacter) -> dict:
+    """Weight, encumbrance, AC and weapon attack lines from the inventory (cached per inventory)"""
+    return inventory_summary(character.inventory, equipment_inputs(character, compiled.modifiers, compiled.proficiency_bonus))
+
+
+def _character_inventory(character: Character) -> dict:
+    return {
+        "id": character.id,
+        "items": expand_inventory(character.inventory),
+        "summary": _equipment_summary(character, _compile(character))
+    }
+
+
+@router.get("/{character_id}/inventory")
+def get_character_inventory(
+    character_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Inventory entries resolved against the equipment catalogue, with the computed summary"""
+    cached = _conditional_get(db, character_id, user_id, if_none_match, "inventory")
+    if cached is not None:
+        return cached
+    
+    character = _get_character_for_user(character_id, db, user_id)
+    response.headers["ETag"] = _character_etag(character.id, character.version, "inventory")
+    return _character_inventory(character)
+
+
+# ============== SPELLS ==============
+
+def _spells_representation(full: bool) -> str:
+    return "spells_full" if full else "spells"
+
+
+def _character_spells(character: Character, full: bool = False) -> dict:
+    """The character's spells document with references expanded from the catalogue"""
+    return {"id": character.id, "spells": expand_spells(character.spells, full)}
+
+
+def _preparable_spells(character: Character) -> dict:
+    """Levelled spells on the character's class list up to its highest slot level (an index lookup)"""
+    spells = [
+        spell_summary(SPELLS[spell_id])
+        for spell_id in spell_ids(preparable_mask(character.class_name, character.level))
+    ]
+    return {
+        "id": character.id,
+        "class_name": character.class_name,
+        "level": character.level,
+        "max_spell_level": max_spell_level(character.class_name, character.level),
+        "count": len(spells),
+        "spells": spells
+    }
+
+
+@router.get("/{character_id}/spells")
+def get_character_spells(
+    character_id: int,
+    response: Response,
+    full: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Known and prepared spells as catalogue summaries (with descriptions if `full`)"""
+    representation = _spells_representation(full)
+    cached = _conditional_get(db, character_id, user_id, if_none_match, representation)
+    if cached is not None:
+        return cached
+    
+    character = _get_character_for_user(character_id, db, user_id)
+    response.headers["ETag"] = _character_etag(character.id, character.version, representation)
+    return _character_spells(character, full)
+
+
+@router.get("/{character_id}/spells/preparable")
+def get_preparable_spells(
+    character_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Spells the character's class and level let it prepare"""
+    cached = _conditional_get(db, character_id, user_id, if_none_match, "preparable")
+    if cached is not None:
+        return cached
+    
+    character = _get_character_for_user(character_id, db, user_id)
+    response.headers["ETag"] = _character_etag(character.id, character.version, "preparable")
+    return _preparable_spells(character)
+
 # ========== GAME DATA ENDPOINTS ==========
 
+# Game data only changes on deploy: serialize every payload once at startup,
+# then serve the same bytes with a content-hash ETag (304 on revalidation).
+
+
+def _class_entry(class_name: str) -> dict:
+    return {
+        "name": class_name,
+        "hit_die": CLASS_HIT_DICE.get(class_name, "d8"),
+        "skill_choices": CLASS_SKILL_CHOICES.get(class_name, {"choose": 0, "from": []}),
+        "subclasses": get_subclasses(class_name)
+    }
+
+
+SPECIES_RESPONSE = StaticJSON({"species": get_species_list()}, GAME_DATA_CACHE_CONTROL)
+CLASSES_RESPONSE = StaticJSON(
+    {"classes": [_class_entry(class_name) for class_name in CLASS_SAVE_PROFICIENCIES]},
+    GAME_DATA_CACHE_CONTROL
+)
+BACKGROUNDS_RESPONSE = StaticJSON(
+    {"backgrounds": [
+        {"name": name, "skill_proficiencies": skills}
+        for name, skills in BACKGROUND_SKILL_PROFICIENCIES.items()
+    ]},
+    GAME_DATA_CACHE_CONTROL
+)
+FEATS_RESPONSE = StaticJSON(
+    {"feats": [feat._asdict() for feat in SRD.feats]},
+    GAME_DATA_CACHE_CONTROL
+)
+SUBCLASS_RESPONSES = {
+    class_name: StaticJSON({"class_name": class_name, "subclasses": subclasses}, GAME_DATA_CACHE_CONTROL)
+    for class_name, subclasses in CLASS_SUBCLASSES.items()
+    if subclasses
+}
+
+
 @router.get("/game-data/species")
-def get_all_species():
+def get_all_species(if_none_match: Optional[str] = Header(None)):
     """Get all available species for character creation"""
-    return {"species": get_species_list()}
+    return SPECIES_RESPONSE.response(if_none_match)
 
 
 @router.get("/game-data/classes")
-def get_all_classes():
+def get_all_classes(if_none_match: Optional[str] = Header(None)):
     """Get all available classes with their skill choices"""
-    classes = list(CLASS_SAVE_PROFICIENCIES.keys())
-    class_data = []
-    for class_name in classes:
-        class_data.append({
-            "name": class_name,
-            "hit_die": "d12" if class_name == "Barbarian" else "d10" if class_name in ["Fighter", "Paladin", "Ranger"] else "d8" if class_name in ["Bard", "Cleric", "Druid", "Monk", "Warlock"] else "d6",
-            "skill_choices": CLASS_SKILL_CHOICES.get(class_name, {"choose": 0, "from": []}),
-            "subclasses": get_subclasses(class_name)
-        })
-    return {"classes": class_data}
+    return CLASSES_RESPONSE.response(if_none_match)
 
 
 @router.get("/game-data/subclasses/{class_name}")
-def get_class_subclasses(class_name: str):
+def get_class_subclasses(class_name: str, if_none_match: Optional[str] = Header(None)):
     """Get subclasses available for a specific class"""
-    subclasses = get_subclasses(class_name)
-    if not subclasses:
+    cached = SUBCLASS_RESPONSES.get(class_name)
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"No subclasses found for class: {class_name}")
-    return {"class_name": class_name, "subclasses": subclasses}
+    return cached.response(if_none_match)
 
 
 @router.get("/game-data/backgrounds")
-def get_all_backgrounds():
+def get_all_backgrounds(if_none_match: Optional[str] = Header(None)):
     """Get all available backgrounds with their skill proficiencies"""
-    backgrounds = []
-    for name, skills in BACKGROUND_SKILL_PROFICIENCIES.items():
-        backgrounds.append({
-            "name": name,
-            "skill_proficiencies": skills
-        })
-    return {"backgrounds": backgrounds}
+    return BACKGROUNDS_RESPONSE.response(if_none_match)
+
 
+@router.get("/game-data/feats")
+def get_all_feats(if_none_match: Optional[str] = Header(None)):
+    """Get the SRD feats with their category and prerequisite"""
+    return FEATS_RESPONSE.response(if_none_match)
@@ -0,0 +1,75 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from backend.dice import DiceError, check_dice_budget, compile_expression, dice_streams, roll, roll_totals, stream_for
+from backend.identity import get_current_user_id
+from backend.odds import describe, expression_distribution
+
+router = APIRouter(prefix="/api/dice", tags=["dice"])
+
+DICE_MAX_TIMES = 10_000
+
+
+class DiceRollRequest(BaseModel):
+    expression: str  # e.g. "2d6+3", "1d20adv+5", "4d6kh3", "8d6 fire + 1d8"
+    times: int = Field(1, ge=1, le=DICE_MAX_TIMES)
+    seed: Optional[int] = Field(None, ge=0)  # One-off reproducible roll
+
+
+class DiceSeedRequest(BaseModel):
+    seed: Optional[int] = Field(None, ge=0)  # None reseeds from OS entropy
+
+
+@router.post("/roll")
+def roll_dice(request: DiceRollRequest, user_id: int = Depends(get_current_user_id)):
+    """Roll an expression once (every die shown) or `times` times (totals and summary)"""
+    try:
+        expression = compile_expression(request.expression)
+        check_dice_budget(expression, request.times)
+    except DiceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    stream = stream_for(user_id, request.seed)
+    with stream.lock:
+        if request.times == 1:
+            return roll(expression, stream.generator)
+        totals = roll_totals(expression, stream.generator, request.times)
+
+    return {
+        "expression": expression.text,
+        "times": request.times,
+        "totals": totals.tolist(),
+        "min": int(totals.min()),
+        "max": int(totals.max()),
+        "mean": float(totals.mean())
+    }
+
+
+@router.put("/seed")
+def seed_dice(request: DiceSeedRequest, user_id: int = Depends(get_current_user_id)):
+    """Restart the caller's dice stream from a seed, making later rolls reproducible"""
+    dice_streams.reseed(user_id, request.seed)
+    return {"seed": request.seed}
+
+
+@router.get("/odds")
+def dice_odds(
+    expression: str,
+    target: Optional[int] = None,
+    distribution: bool = False,
+    user_id: int = Depends(get_current_user_id)
+):
+    """Exact distribution of an expression, and the chance of at least `target`"""
+    try:
+        compiled = compile_expression(expression)
+        result = expression_distribution(compiled)
+    except DiceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    summary = {"expression": compiled.text, **describe(result, distribution)}
+    if target is not None:
+        summary["target"] = target
+        summary["chance_at_least"] = round(result.chance_at_least(target), 6)
+    return summary
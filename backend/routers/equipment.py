@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from backend.equipment import ITEMS, ITEMS_BY_CATEGORY
+from backend.http_cache import GAME_DATA_CACHE_CONTROL, StaticJSON
+
+router = APIRouter(prefix="/api/equipment", tags=["equipment"])
+
+
+def _item_entry(item) -> dict:
+    entry = item._asdict()
+    for name in ("weapon", "armor"):
+        if entry[name] is not None:
+            entry[name] = entry[name]._asdict()
+    return entry
+
+
+# The catalogue only changes on deploy, like the rest of the game data
+ENTRIES = {key: _item_entry(item) for key, item in ITEMS.items()}
+CATALOGUE_RESPONSE = StaticJSON({"count": len(ENTRIES), "items": list(ENTRIES.values())}, GAME_DATA_CACHE_CONTROL)
+ITEM_RESPONSES = {key: StaticJSON(entry, GAME_DATA_CACHE_CONTROL) for key, entry in ENTRIES.items()}
+
+
+@router.get("/")
+def list_equipment(category: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    """Catalogue items, optionally of one category (weapon, armor, gear, tool, ...)"""
+    if category is None:
+        return CATALOGUE_RESPONSE.response(if_none_match)
+    items = [ENTRIES[key] for key in ITEMS_BY_CATEGORY.get(category.lower(), ())]
+    return {"count": len(items), "items": items}
+
+
+@router.get("/{key}")
+def get_item(key: str, if_none_match: Optional[str] = Header(None)):
+    """One catalogue item by key ("chain-mail")"""
+    cached = ITEM_RESPONSES.get(key)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return cached.response(if_none_match)
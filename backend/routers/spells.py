@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from backend.http_cache import GAME_DATA_CACHE_CONTROL, StaticJSON
+from backend.spells import MAX_SPELL_LEVEL, SPELLS, filter_mask, spell_entry, spell_ids, spell_summary
+
+router = APIRouter(prefix="/api/spells", tags=["spells"])
+
+# The catalogue only changes on deploy, like the rest of the game data
+SUMMARIES = {spell_id: spell_summary(spell) for spell_id, spell in SPELLS.items()}
+CATALOGUE_RESPONSE = StaticJSON({"count": len(SUMMARIES), "spells": list(SUMMARIES.values())}, GAME_DATA_CACHE_CONTROL)
+SPELL_RESPONSES = {spell_id: StaticJSON(spell_entry(spell), GAME_DATA_CACHE_CONTROL) for spell_id, spell in SPELLS.items()}
+
+
+@router.get("/")
+def list_spells(
+    class_name: Optional[str] = Query(None, alias="class"),
+    level: Optional[int] = Query(None, ge=0, le=MAX_SPELL_LEVEL),
+    max_level: Optional[int] = Query(None, ge=0, le=MAX_SPELL_LEVEL),
+    school: Optional[str] = None,
+    ritual: Optional[bool] = None,
+    concentration: Optional[bool] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Spell summaries (no descriptions) matching every given filter, by id"""
+    filters = (class_name, level, max_level, school, ritual, concentration)
+    if all(value is None for value in filters):
+        return CATALOGUE_RESPONSE.response(if_none_match)
+    spells = [SUMMARIES[spell_id] for spell_id in spell_ids(filter_mask(*filters))]
+    return {"count": len(spells), "spells": spells}
+
+
+@router.get("/{spell_id}")
+def get_spell(spell_id: int, if_none_match: Optional[str] = Header(None)):
+    """One spell with its full description"""
+    cached = SPELL_RESPONSES.get(spell_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Spell not found")
+    return cached.response(if_none_match)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.srd_index import SRD_SEARCH_MAX_RESULTS, get_section, search
+
+router = APIRouter(prefix="/api/srd", tags=["srd"])
+
+
+@router.get("/search")
+def search_srd(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(10, ge=1, le=SRD_SEARCH_MAX_RESULTS)):
+    """Full-text search over the SRD; snippets mark matches with <mark>"""
+    return {"query": q, "results": search(q, limit)}
+
+
+@router.get("/sections/{section_id}")
+def read_srd_section(section_id: int):
+    """Full text of a section returned by a search"""
+    section = get_section(section_id)
+    if section is None:
+        raise HTTPException(status_code=404, detail="SRD section not found")
+    return section
@@ -0,0 +1,201 @@
+"""
+Spell catalogue.
+
+The SRD spells (compiled by backend.srd_data) keyed by their stable
+integer id, with bitmask indexes: bit i of a mask is set when spell i
+matches, so a filter such as "Wizard spells of level 1-3 that can be cast
+as rituals" is an AND of a few ints, and the result is read off the set
+bits in id order.
+
+Character.spells stores compact references:
+
+    {"known": [3, 195], "prepared": [195], "slots": {...}}
+
+compact_spells() validates a spells document from a client, accepting
+ids or spell names, and returns it with ids; expand_spells() turns them
+back into catalogue entries on demand.
+"""
+
+from itertools import accumulate
+from operator import or_
+from types import MappingProxyType
+from typing import Optional
+
+from backend.game_data import SRD
+
+SPELL_LISTS = ("known", "prepared")
+MAX_SPELL_LEVEL = 9
+
+SPELLS = MappingProxyType({spell.id: spell for spell in SRD.spells})
+SPELL_IDS_BY_NAME = MappingProxyType({spell.name.lower(): spell.id for spell in SRD.spells})
+
+
+class SpellError(ValueError):
+    """An unknown spell reference or a malformed spells document"""
+
+
+# ============== INDEXES ==============
+
+def _mask(predicate) -> int:
+    mask = 0
+    for spell in SRD.spells:
+        if predicate(spell):
+            mask |= 1 << spell.id
+    return mask
+
+
+ALL_SPELLS = _mask(lambda spell: True)
+CLASS_MASKS = MappingProxyType({
+    class_name.lower(): _mask(lambda spell, class_name=class_name: class_name in spell.classes)
+    for class_name in sorted({class_name for spell in SRD.spells for class_name in spell.classes})
+})
+SCHOOL_MASKS = MappingProxyType({
+    school.lower(): _mask(lambda spell, school=school: spell.school == school)
+    for school in sorted({spell.school for spell in SRD.spells})
+})
+LEVEL_MASKS = tuple(_mask(lambda spell, level=level: spell.level == level) for level in range(MAX_SPELL_LEVEL + 1))
+# UP_TO_LEVEL_MASKS[n]: spells of level 0..n
+UP_TO_LEVEL_MASKS = tuple(accumulate(LEVEL_MASKS, or_))
+RITUAL_MASK = _mask(lambda spell: spell.ritual)
+CONCENTRATION_MASK = _mask(lambda spell: spell.concentration)
+
+
+def spell_ids(mask: int) -> list:
+    """Ids of the set bits of `mask`, ascending"""
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def filter_mask(
+    class_name: Optional[str] = None,
+    level: Optional[int] = None,
+    max_level: Optional[int] = None,
+    school: Optional[str] = None,
+    ritual: Optional[bool] = None,
+    concentration: Optional[bool] = None
+) -> int:
+    """Mask of the spells matching every given filter (class and school are case-insensitive)"""
+    mask = ALL_SPELLS
+    if class_name is not None:
+        mask &= CLASS_MASKS.get(class_name.lower(), 0)
+    if school is not None:
+        mask &= SCHOOL_MASKS.get(school.lower(), 0)
+    if level is not None:
+        mask &= LEVEL_MASKS[level] if 0 <= level <= MAX_SPELL_LEVEL else 0
+    if max_level is not None:
+        mask &= UP_TO_LEVEL_MASKS[min(max_level, MAX_SPELL_LEVEL)] if max_level >= 0 else 0
+    if ritual is not None:
+        mask &= RITUAL_MASK if ritual else ~RITUAL_MASK
+    if concentration is not None:
+        mask &= CONCENTRATION_MASK if concentration else ~CONCENTRATION_MASK
+    return mask
+
+
+# ============== SPELLCASTING ==============
+
+FULL_CASTERS = frozenset(("Bard", "Cleric", "Druid", "Sorcerer", "Wizard"))
+HALF_CASTERS = frozenset(("Paladin", "Ranger"))
+
+
+def max_spell_level(class_name: str, level: int) -> Optional[int]:
+    """Highest level of spell slot a class has at a character level (None for non-casters)"""
+    level = max(1, min(int(level or 1), 20))
+    if class_name in FULL_CASTERS:
+        return min(MAX_SPELL_LEVEL, (level + 1) // 2)
+    if class_name in HALF_CASTERS:
+        return min(5, (level + 3) // 4)
+    if class_name == "Warlock":
+        return min(5, (level + 1) // 2)
+    return None
+
+
+def preparable_mask(class_name: str, level: int) -> int:
+    """Levelled spells on the class's list that its slots at `level` can cast"""
+    highest = max_spell_level(class_name, level)
+    if highest is None:
+        return 0
+    return CLASS_MASKS.get(class_name.lower(), 0) & UP_TO_LEVEL_MASKS[highest] & ~LEVEL_MASKS[0]
+
+
+# ============== CHARACTER REFERENCES ==============
+
+def spell_id(reference) -> int:
+    """Catalogue id for a spell id or (case-insensitive) name"""
+    if isinstance(reference, int) and not isinstance(reference, bool):
+        if reference in SPELLS:
+            return reference
+    elif isinstance(reference, str):
+        found = SPELL_IDS_BY_NAME.get(" ".join(reference.lower().split()))
+        if found is not None:
+            return found
+    raise SpellError(f"Unknown spell: {reference!r}")
+
+
+def _compact_reference(reference, strict: bool):
+    try:
+        return spell_id(reference)
+    except SpellError:
+        if strict or not isinstance(reference, (str, int)):
+            raise
+        return reference
+
+
+def compact_spells(spells: dict, strict: bool = True) -> dict:
+    """
+    A spells document with its known/prepared lists as deduplicated spell
+    ids, in order. Unknown references raise SpellError, or with
+    strict=False (migrating stored data, restoring backups) are kept as is.
+    """
+    if not isinstance(spells, dict):
+        raise SpellError("spells must be an object")
+    compacted = dict(spells)
+    for name in SPELL_LISTS:
+        if name not in spells:
+            continue
+        references = spells[name]
+        if not isinstance(references, list):
+            raise SpellError(f"spells.{name} must be a list of spell ids or names")
+        compacted[name] = list(dict.fromkeys(_compact_reference(reference, strict) for reference in references))
+    return compacted
+
+
+def spell_summary(spell) -> dict:
+    """Catalogue entry without the description"""
+    return {
+        "id": spell.id,
+        "name": spell.name,
+        "level": spell.level,
+        "school": spell.school,
+        "classes": list(spell.classes),
+        "ritual": spell.ritual,
+        "concentration": spell.concentration,
+    }
+
+
+def spell_entry(spell) -> dict:
+    return dict(spell._asdict(), classes=list(spell.classes))
+
+
+def expand_spells(spells: Optional[dict], full: bool = False) -> dict:
+    """
+    A stored spells document with its references replaced by catalogue
+    entries (summaries, or full entries with `full`). References that don't
+    resolve, such as names saved before spells were validated, are kept as
+    {"id": None, "name": ...}.
+    """
+    expanded = dict(spells or {})
+    for name in SPELL_LISTS:
+        entries = []
+        for reference in expanded.get(name) or []:
+            try:
+                spell = SPELLS[spell_id(reference)]
+            except SpellError:
+                entries.append({"id": None, "name": str(reference)})
+                continue
+            entries.append(spell_entry(spell) if full else spell_summary(spell))
+        expanded[name] = entries
+    return expanded
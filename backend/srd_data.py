@@ -0,0 +1,686 @@
+"""
+SRD game data compiler.
+
+Reads SRD_CC_v5.2.1.md in one streaming pass and extracts the rules tables
+the backend used to copy by hand:
+
+- Core [Class] Traits tables: primary abilities, hit die, saving throws,
+  skill choices, weapon and armor proficiencies, tools, starting equipment,
+  plus the class (and SRD subclass) feature levels
+- Background Descriptions: ability scores, origin feat, skills, tool, equipment
+- Feats: category, prerequisite, repeatable
+- Character Advancement: XP threshold and proficiency bonus per level
+- Spell Descriptions: level, school, class lists, casting time (and
+  ritual), range, components, duration (and concentration), text
+- Equipment: coins, the Weapons and Armor tables, tools, the Adventuring
+  Gear, Ammunition and spellcasting focus tables (weight, cost, and the
+  weapon and armor stats)
+
+The result is a frozen SRDData (NamedTuples of tuples) pickled to
+SRD_DATA_PATH behind a small header holding SRD_DATA_VERSION and the
+SHA-256 of the SRD and of the spell id registry. load_srd_data() reads the
+header first and unpickles the payload only if it matches; otherwise it
+recompiles and rewrites the file. So the SRD is parsed once per change (or
+parser version), and every other import is a hash check and a pickle load.
+
+    python -m backend.srd_data       # force a rebuild and print a summary
+
+The artefact is only ever written by this module; don't point
+SRD_DATA_PATH at a file from an untrusted source (it is a pickle).
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import time
+from fractions import Fraction
+from typing import List, NamedTuple, Optional
+
+from backend.srd_index import BASE_DIR, PAGE_BREAK, SRD_PATH, join_lines, srd_hash, srd_lines
+
+SRD_DATA_PATH = os.getenv("SRD_DATA_PATH", os.path.join(BASE_DIR, "srd_data.pickle"))
+SRD_DATA_VERSION = 3
+# One spell name per line; the line number is the spell's id. Append-only, so
+# ids stored in Character.spells never change meaning.
+SPELL_IDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spell_ids.txt")
+
+
+class ClassTraits(NamedTuple):
+    name: str
+    primary_abilities: tuple    # Lowercase ability names
+    hit_die: str                # "d12"
+    saves: tuple                # Lowercase ability names
+    skill_choices: int
+    skill_options: Optional[tuple]  # None: any skill
+    weapons: tuple              # "simple", "martial", "martial_light", "martial_finesse_light"
+    armor: tuple                # "light", "medium", "heavy", "shields"
+    tools: str                  # As written ("" if none)
+    starting_equipment: str
+    features: tuple             # (level, feature name), in SRD order
+    subclass: Optional[str]     # The SRD's one subclass for the class
+    subclass_features: tuple
+
+
+class Background(NamedTuple):
+    name: str
+    ability_scores: tuple
+    feat: str
+    skills: tuple
+    tool: str
+    equipment: str
+
+
+class Feat(NamedTuple):
+    name: str
+    category: str               # "Origin", "General", "Fighting Style", "Epic Boon"
+    prerequisite: Optional[str]
+    repeatable: bool
+
+
+class Spell(NamedTuple):
+    id: int                     # Stable catalogue id (see SPELL_IDS_PATH)
+    name: str
+    level: int                  # 0 for cantrips
+    school: str
+    classes: tuple
+    casting_time: str
+    ritual: bool
+    range: str
+    components: str
+    concentration: bool
+    duration: str
+    description: str
+
+
+class WeaponStats(NamedTuple):
+    category: str               # "Simple" or "Martial"
+    ranged: bool
+    damage: str                 # "1d8" ("1" for the Blowgun)
+    damage_type: str
+    properties: tuple           # Property names: ("Ammunition", "Loading", "Two-Handed")
+    mastery: str
+    range: Optional[tuple]      # (normal, long) in feet, for Thrown and Ammunition weapons
+    ammunition: Optional[str]   # "Arrow", "Bolt", ...
+    versatile: Optional[str]    # Two-handed damage die
+
+
+class ArmorStats(NamedTuple):
+    category: str               # "Light", "Medium", "Heavy" or "Shield"
+    armor_class: int            # Base AC, or the Shield's bonus
+    dex_cap: Optional[int]      # Most Dex modifier added (None: all of it, 0: none)
+    strength: Optional[int]     # Strength needed to avoid the speed penalty
+    stealth_disadvantage: bool
+
+
+class Item(NamedTuple):
+    key: str                    # "chain-mail", "alchemists-fire", "gp"
+    name: str
+    category: str               # "coin", "weapon", "armor", "tool", "gear", "ammunition", "focus"
+    subcategory: str            # "Martial Melee", "Heavy", "Artisan’s Tools", "Holy Symbol", ...
+    weight: Optional[float]     # Pounds for `amount` of the item; None if it varies
+    cost_cp: Optional[int]      # Copper pieces for `amount` of the item; None if it varies
+    amount: int = 1             # Bundle size (ammunition is sold by the 20)
+    weapon: Optional[WeaponStats] = None
+    armor: Optional[ArmorStats] = None
+
+
+class SRDData(NamedTuple):
+    srd_sha256: str
+    classes: tuple
+    backgrounds: tuple
+    feats: tuple
+    spells: tuple               # Sorted by id
+    items: tuple                # In SRD order
+    xp_thresholds: tuple        # Index 0 is level 1
+    proficiency_bonus: tuple    # Index 0 is level 1
+
+
+# ============== FIELD PARSERS ==============
+
+_ABILITY_NAMES = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+_TRAIT_LABELS = (
+    "Primary Ability", "Hit Point Die", "Saving Throw Proficiencies", "Skill Proficiencies",
+    "Weapon Proficiencies", "Tool Proficiencies", "Armor Training", "Starting Equipment"
+)
+_TRAIT_SPLIT = re.compile("(" + "|".join(_TRAIT_LABELS) + ")")
+_BACKGROUND_LABELS = re.compile(r"(Ability Scores|Feat|Skill Proficiencies|Tool Proficiency|Equipment):")
+_CORE_TRAITS = re.compile(r"^Core (\w+) Traits$")
+_FEATURE = re.compile(r"Level (\d{1,2}): ([A-Z].*)$")
+_FEAT_CATEGORY = re.compile(r"^(Origin|General|Fighting Style|Epic Boon) Feat(?: \(Prerequisite: (.*))?$")
+_ADVANCEMENT_ROW = re.compile(r"^(\d{1,2}) ([\d,]+) \+(\d)")
+_SPELL_HEADER = re.compile(r"^(?:Level ([1-9]) ([A-Z][a-z]+)|([A-Z][a-z]+) Cantrip) \((.*)$")
+_SPELL_FIELDS = re.compile(r"(Casting Time|Range|Components?|Duration):")
+_GLUED_WORD = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_TRAILING_NAME = re.compile(r"([A-Z][a-z]+(?: [A-Z][a-z]+)*)$")
+
+
+def _items(text: str) -> List[str]:
+    """ "A, B, or C" / "A and B" -> ["A", "B", "C"] """
+    return [item.strip() for item in re.split(r",\s*(?:or |and )?|\s+(?:or|and)\s+", text) if item.strip()]
+
+
+def _abilities(text: str) -> tuple:
+    return tuple(item.lower() for item in _items(text) if item.lower() in _ABILITY_NAMES)
+
+
+def _skill_choices(text: str) -> tuple:
+    """ "Choose 2: Athletics, ... or Survival" -> (2, (...)); "Choose any 3 skills" -> (3, None) """
+    match = re.match(r"Choose (any )?(\d+)(?: skills)?:?\s*(.*)", text)
+    if match is None:
+        return 0, ()
+    if match.group(1):
+        return int(match.group(2)), None
+    return int(match.group(2)), tuple(_items(match.group(3)))
+
+
+def _weapons(text: str) -> tuple:
+    """ "Simple weapons and Martial weapons that have the Finesse or Light property" -> ("simple", "martial_finesse_light") """
+    weapons = []
+    if "Simple" in text:
+        weapons.append("simple")
+    if "Martial" in text:
+        restricted = re.search(r"Martial weapons that have the (.*?) property", text)
+        if restricted:
+            weapons.append("martial_" + "_".join(word.lower() for word in _items(restricted.group(1))))
+        else:
+            weapons.append("martial")
+    return tuple(weapons)
+
+
+def _armor(text: str) -> tuple:
+    """ "Light and Medium armor and Shields" -> ("light", "medium", "shields") """
+    words = re.findall(r"Light|Medium|Heavy|Shields", text)
+    return tuple(word.lower() for word in words)
+
+
+def _class_traits(name: str, lines: List[str]) -> dict:
+    text = join_lines(lines).replace("\n", " ")
+    parts = _TRAIT_SPLIT.split(text)
+    fields = {label: value.strip() for label, value in zip(parts[1::2], parts[2::2])}
+    choose, options = _skill_choices(fields.get("Skill Proficiencies", ""))
+    return {
+        "name": name,
+        "primary_abilities": _abilities(fields.get("Primary Ability", "")),
+        "hit_die": fields.get("Hit Point Die", "").split(" ")[0].lower(),
+        "saves": _abilities(fields.get("Saving Throw Proficiencies", "")),
+        "skill_choices": choose,
+        "skill_options": options,
+        "weapons": _weapons(fields.get("Weapon Proficiencies", "")),
+        "armor": () if fields.get("Armor Training") == "None" else _armor(fields.get("Armor Training", "")),
+        "tools": fields.get("Tool Proficiencies", ""),
+        "starting_equipment": fields.get("Starting Equipment", ""),
+        "features": [],
+        "subclass": None,
+        "subclass_features": [],
+    }
+
+
+def _background(name: str, lines: List[str]) -> Background:
+    parts = _BACKGROUND_LABELS.split(join_lines(lines).replace("\n", " "))
+    fields = {label: value.strip() for label, value in zip(parts[1::2], parts[2::2])}
+    return Background(
+        name=name,
+        ability_scores=_abilities(fields.get("Ability Scores", "")),
+        feat=re.sub(r"\s*\(see “Feats”\)", "", fields.get("Feat", "")),
+        skills=tuple(_items(fields.get("Skill Proficiencies", ""))),
+        tool=fields.get("Tool Proficiency", ""),
+        equipment=fields.get("Equipment", ""),
+    )
+
+
+def _spell_name(name: str) -> str:
+    """Undo small-caps extraction artefacts ("Acid SplASh")"""
+    return " ".join(word.capitalize() if word[1:] != word[1:].lower() else word for word in name.split())
+
+
+def _spell(name: str, header, lines: List[str]) -> dict:
+    """Spell fields from its header match and the lines after it; the text starts after the Duration line"""
+    level, school, cantrip_school, classes = header.groups()
+    text_start = next((i + 1 for i, line in enumerate(lines) if "Duration:" in line), len(lines))
+    if text_start <= len(lines):
+        # "Duration:  1 hourYou touch a rope...": the text can be glued to the duration
+        glued = _GLUED_WORD.search(lines[text_start - 1].partition("Duration:")[2])
+        if glued:
+            line = lines[text_start - 1]
+            cut = len(line) - len(line.partition("Duration:")[2]) + glued.start()
+            lines = lines[:text_start - 1] + [line[:cut], line[cut:]] + lines[text_start:]
+    parts = _SPELL_FIELDS.split(join_lines([classes] + lines[:text_start]).replace("\n", " "))
+    fields = {label: " ".join(value.split()) for label, value in zip(parts[1::2], parts[2::2])}
+    casting_time, duration = fields.get("Casting Time", ""), fields.get("Duration", "")
+    return {
+        "name": _spell_name(name),
+        "level": int(level) if level else 0,
+        "school": school or cantrip_school,
+        "classes": tuple(_items(parts[0].strip().rstrip(")"))),
+        "casting_time": casting_time,
+        "ritual": casting_time.endswith("or Ritual"),
+        "range": fields.get("Range", ""),
+        "components": fields.get("Components", fields.get("Component", "")),
+        "concentration": duration.startswith("Concentration"),
+        "duration": duration,
+        "description": join_lines(lines[text_start:]),
+    }
+
+
+def _spell_ids(path: str = SPELL_IDS_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as registry:
+            return {name.strip(): i for i, name in enumerate(registry, 1) if name.strip()}
+    except FileNotFoundError:
+        return {}
+
+
+def _assign_spell_ids(spells: List[dict], registry: dict) -> tuple:
+    """Registered names keep their id; spells new to the SRD get ids after the registry's"""
+    next_id = max(registry.values(), default=0) + 1
+    assigned = []
+    for spell in spells:
+        spell_id = registry.get(spell["name"])
+        if spell_id is None:
+            spell_id, next_id = next_id, next_id + 1
+        assigned.append(Spell(id=spell_id, **spell))
+    return tuple(sorted(assigned))
+
+
+# ============== EQUIPMENT ==============
+
+_COIN_VALUES_CP = {"CP": 1, "SP": 10, "EP": 50, "GP": 100, "PP": 1000}
+_WEIGHT = r"(?P<weight>[\d/½]+ lb\.(?: \(full\))?|—|Varies)"
+_COST = r"(?P<cost>[\d,]+ [CSEGP]P|Varies)"
+_COIN_ROW = re.compile(r"^(?P<name>\w+ Piece) \((?P<code>[CSEGP]P)\) (?P<value>[\d/]+)$")
+_WEAPON_GROUP = re.compile(r"^(Simple|Martial) (Melee|Ranged) Weapons$")
+_WEAPON_ROW = re.compile(
+    r"^(?P<name>[A-Z][A-Za-z ]+?) (?P<damage>\d+d\d+|\d+) (?P<damage_type>Bludgeoning|Piercing|Slashing) "
+    r"(?P<properties>.+?) ?(?P<mastery>Cleave|Graze|Nick|Push|Sap|Slow|Topple|Vex) " + _WEIGHT + " " + _COST + "$"
+)
+_ARMOR_GROUP = re.compile(r"^(Light|Medium|Heavy) Armor \(|^(Shield) \(")
+_ARMOR_ROW = re.compile(
+    r"^(?P<name>[A-Z][A-Za-z ]+?) (?P<ac>\+?\d+)(?P<dex> \+ Dex modifier(?: \(max (?P<cap>\d+)\))?)? "
+    r"(?:Str (?P<strength>\d+)|—) (?P<stealth>Disadvantage|—) " + _WEIGHT + " " + _COST + "$"
+)
+_GEAR_ROW = re.compile(r"^(?P<name>[A-Z].*?) " + _WEIGHT + " " + _COST + "$")
+_AMMUNITION_ROW = re.compile(r"^(?P<name>[A-Z][A-Za-z, ]+?) (?P<amount>\d+) [A-Z][a-z]+ " + _WEIGHT + " " + _COST + "$")
+_TOOL_NAME = re.compile(r"(?P<name>[A-Z][^()]*?) \((?P<cost>[\d,]+ [CSEGP]P|Varies)\)$")
+_TOOL_WEIGHT = re.compile(r"Weight:\s*(?P<weight>[\d/½]+ lb\.|—|Varies)")
+_FOCUS_TABLES = {"Arcane Focuses": "Arcane Focus", "Druidic Focuses": "Druidic Focus", "Holy Symbols": "Holy Symbol"}
+_GEAR_HEADER = "Item Weight Cost"
+
+
+def item_key(name: str) -> str:
+    """ "Alchemist’s Fire" -> "alchemists-fire" """
+    return re.sub(r"[^a-z0-9]+", "-", re.sub(r"[’']", "", name.lower())).strip("-")
+
+
+def _weight(text: str) -> Optional[float]:
+    """ "1/4 lb." -> 0.25, "58½ lb." -> 58.5, "—" -> 0.0, "Varies" -> None """
+    if text == "Varies":
+        return None
+    if text == "—":
+        return 0.0
+    number = text.split(" ")[0]
+    half = number.endswith("½")
+    number = number.rstrip("½") or "0"
+    return float(Fraction(number) + (Fraction(1, 2) if half else 0))
+
+
+def _cost(text: str) -> Optional[int]:
+    """ "1,500 GP" -> 150000 (copper pieces); "Varies" -> None """
+    if text == "Varies":
+        return None
+    amount, coin = text.split(" ")
+    return int(amount.replace(",", "")) * _COIN_VALUES_CP[coin]
+
+
+def _weapon(category: str, kind: str, row) -> WeaponStats:
+    names, weapon_range, ammunition, versatile = [], None, None, None
+    properties = row.group("properties").strip()
+    for part in ([] if properties == "—" else properties.split(",")):
+        name, _, detail = part.strip().partition(" (")
+        detail = detail.rstrip(")")
+        names.append(name)
+        if name in ("Thrown", "Ammunition"):
+            distances, _, ammunition_type = detail.partition("; ")
+            normal, long = distances.replace("Range ", "").split("/")
+            weapon_range = (int(normal), int(long))
+            ammunition = ammunition_type or ammunition
+        elif name == "Versatile":
+            versatile = detail
+    return WeaponStats(
+        category=category,
+        ranged=kind == "Ranged",
+        damage=row.group("damage"),
+        damage_type=row.group("damage_type"),
+        properties=tuple(names),
+        mastery=row.group("mastery"),
+        range=weapon_range,
+        ammunition=ammunition,
+        versatile=versatile,
+    )
+
+
+def _armor_stats(category: str, row) -> ArmorStats:
+    if category == "Shield":
+        dex_cap = 0
+    elif row.group("dex"):
+        dex_cap = int(row.group("cap")) if row.group("cap") else None
+    else:
+        dex_cap = 0
+    return ArmorStats(
+        category=category,
+        armor_class=int(row.group("ac").lstrip("+")),
+        dex_cap=dex_cap,
+        strength=int(row.group("strength")) if row.group("strength") else None,
+        stealth_disadvantage=row.group("stealth") == "Disadvantage",
+    )
+
+
+class _EquipmentParser:
+    """
+    Items from the Equipment chapter, fed one line at a time. A table header
+    line selects the row pattern until a line doesn't match it; tools are
+    prose entries ("Name (cost)" then "Ability: ... Weight: ...").
+    """
+
+    def __init__(self):
+        self.items = []
+        self.table = None
+        self.group = ()
+        self.pending = ""       # A weapon row wrapped onto the next line
+        self.previous = ""
+
+    def _add(self, name: str, category: str, subcategory: str, weight: str, cost: str, **fields):
+        self.items.append(Item(
+            key=fields.pop("key", None) or item_key(name), name=name, category=category, subcategory=subcategory,
+            weight=_weight(weight), cost_cp=_cost(cost), **fields
+        ))
+
+    def _header(self, stripped: str) -> bool:
+        weapon_group = _WEAPON_GROUP.match(stripped)
+        armor_group = _ARMOR_GROUP.match(stripped)
+        if stripped == "Coin Values":
+            self.table = "coins"
+        elif weapon_group:
+            self.table, self.group = "weapons", weapon_group.groups()
+        elif armor_group:
+            self.table, self.group = "armor", (armor_group.group(1) or armor_group.group(2),)
+        elif stripped == _GEAR_HEADER:
+            self.table = "gear"
+        elif stripped == "Type Amount Storage Weight Cost":
+            self.table = "ammunition"
+        elif stripped in ("Focus Weight Cost", "Symbol Weight Cost") and self.previous in _FOCUS_TABLES:
+            self.table, self.group = "focus", (_FOCUS_TABLES[self.previous],)
+        elif stripped in ("Artisan’s Tools", "Other Tools"):
+            self.group = (stripped,)
+        else:
+            return stripped in ("Coin Value in GP", "Name Damage Properties Mastery Weight Cost",
+                                "Armor Armor Class (AC) Strength Stealth Weight Cost")
+        return True
+
+    def _row(self, stripped: str) -> bool:
+        """Add the item in a row of the current table; False if the line isn't one"""
+        if self.table == "coins":
+            row = _COIN_ROW.match(stripped)
+            if row:
+                self.items.append(Item(
+                    key=row.group("code").lower(), name=row.group("name"), category="coin", subcategory="",
+                    weight=1 / 50, cost_cp=int(Fraction(row.group("value")) * 100)
+                ))
+            return bool(row)
+        if self.table == "weapons":
+            text = f"{self.pending} {stripped}" if self.pending else stripped
+            row = _WEAPON_ROW.match(text)
+            if row is None and re.match(r"^[A-Z][A-Za-z ]+ (\d+d\d+|\d+) [A-Z]", text) and not self.pending:
+                self.pending = text
+                return True
+            self.pending = ""
+            if row:
+                category, kind = self.group
+                self._add(row.group("name"), "weapon", f"{category} {kind}", row.group("weight"), row.group("cost"),
+                          weapon=_weapon(category, kind, row))
+            return bool(row)
+        if self.table == "armor":
+            row = _ARMOR_ROW.match(stripped)
+            if row:
+                category = self.group[0]
+                self._add(row.group("name"), "armor", category, row.group("weight"), row.group("cost"),
+                          armor=_armor_stats(category, row))
+            return bool(row)
+        if self.table == "ammunition":
+            row = _AMMUNITION_ROW.match(stripped)
+            if row:
+                self._add(row.group("name"), "ammunition", "", row.group("weight"), row.group("cost"),
+                          amount=int(row.group("amount")))
+            return bool(row)
+        if self.table in ("gear", "focus"):
+            row = _GEAR_ROW.match(stripped)
+            if row and not (row.group("weight") == row.group("cost") == "Varies"):
+                if self.table == "gear":
+                    self._add(row.group("name"), "gear", "", row.group("weight"), row.group("cost"))
+                else:
+                    # "Staff (also a Quarterstaff)" -> "Arcane Focus, Staff"
+                    name = f"{self.group[0]}, {row.group('name').split(' (')[0]}"
+                    self._add(name, "focus", self.group[0], row.group("weight"), row.group("cost"))
+            return bool(row)
+        return False
+
+    def feed(self, line: str) -> None:
+        stripped = " ".join(line.split())
+        if stripped.endswith(_GEAR_HEADER) and stripped != _GEAR_HEADER:
+            # "Ink — 10 GPItem Weight Cost": the table header repeated after a page break
+            stripped = stripped[:-len(_GEAR_HEADER)]
+        if not self._header(stripped):
+            tool_weight = _TOOL_WEIGHT.search(stripped) if stripped.startswith("Ability:") else None
+            if tool_weight:
+                tool = _TOOL_NAME.search(self.previous)
+                if tool:
+                    # The name can be glued to the end of the previous entry ("Spell ScrollCarpenter’s Tools")
+                    name = _GLUED_WORD.split(tool.group("name"))[-1]
+                    self._add(name, "tool", self.group[0] if self.group else "", tool_weight.group("weight"), tool.group("cost"))
+            elif self.table and not self._row(stripped):
+                self.table = None
+        self.previous = stripped
+
+
+# ============== STREAMING PARSER ==============
+
+def compile_srd(lines, srd_sha256: str = "", spell_ids: Optional[dict] = None) -> SRDData:
+    """
+    Extract SRDData from SRD lines in one pass. `lines` can be an open file.
+    A small state machine tracks which part of the SRD it is in; each table
+    is buffered only until it ends. Spell ids come from `spell_ids` (name ->
+    id), by default the SPELL_IDS_PATH registry.
+    """
+    classes, backgrounds, feats, advancement, spells = [], [], [], [], []
+    equipment = _EquipmentParser()
+    state = None            # "traits", "class", "backgrounds", "feats", "equipment", "advancement", "spells"
+    spell_header = None
+    current = None          # Class being read
+    buffer, name = [], None
+    previous = ""
+    subclass_pending = False
+
+    for _, line in srd_lines(lines):
+        stripped = line.strip()
+        if stripped == PAGE_BREAK:
+            continue
+
+        match = _CORE_TRAITS.match(stripped)
+        if match:
+            state, buffer = "traits", []
+            current = {"name": match.group(1)}
+            classes.append(current)
+            continue
+
+        if state == "traits":
+            if "Becoming a" in stripped:
+                head = stripped.split("Becoming a")[0]
+                if head:
+                    buffer.append(head)
+                current.update(_class_traits(current["name"], buffer))
+                state = "class"
+            else:
+                buffer.append(line)
+            continue
+
+        if state == "class":
+            if stripped == "Character Origins":
+                state = None
+            elif subclass_pending:
+                current["subclass"] = (current["subclass"] + " " + stripped).strip()
+                subclass_pending = line.endswith(" ")
+            elif f"{current['name']} Subclass:" in stripped:
+                current["subclass"] = stripped.split("Subclass:", 1)[1].strip()
+                # A wrapped subclass title leaves a trailing space on the line
+                subclass_pending = not current["subclass"] or line.endswith(" ")
+            else:
+                feature = _FEATURE.search(stripped)
+                if feature:
+                    key = "subclass_features" if current["subclass"] else "features"
+                    current[key].append((int(feature.group(1)), feature.group(2).strip()))
+            continue
+
+        if stripped == "Character Advancement":
+            state = "advancement"
+            continue
+        if state == "advancement":
+            row = _ADVANCEMENT_ROW.match(stripped)
+            if row:
+                advancement.append((int(row.group(2).replace(",", "")), int(row.group(3))))
+                if int(row.group(1)) == 20:
+                    state = None
+            continue
+
+        if stripped == "Background Descriptions":
+            state, buffer, name = "backgrounds", [], None
+            continue
+        if state == "backgrounds":
+            if stripped == "Character Species":
+                if name is not None:
+                    backgrounds.append(_background(name, buffer))
+                state = None
+            elif stripped.startswith("Ability Scores:"):
+                # The name is the line before, or glued to the end of it ("... 50 GPSage")
+                last = buffer.pop().strip() if buffer else ""
+                trailing = _TRAILING_NAME.search(last)
+                next_name = trailing.group(1) if trailing else last
+                if last[:-len(next_name)].strip():
+                    buffer.append(last[:-len(next_name)])
+                if name is not None:
+                    backgrounds.append(_background(name, buffer))
+                name, buffer = next_name, [line]
+            else:
+                buffer.append(line)
+            continue
+
+        if state == "equipment":
+            if stripped == "Mounts and Vehicles":
+                state = None
+            else:
+                equipment.feed(line)
+            continue
+
+        if stripped == "Spell Descriptions":
+            state, buffer = "spells", []
+            continue
+        if state == "spells":
+            header = _SPELL_HEADER.match(stripped)
+            if header or stripped == "Rules Glossary":
+                # The line before a spell's header is its name
+                next_name = buffer.pop().strip() if header and buffer else None
+                if spell_header is not None:
+                    spells.append(_spell(name, spell_header, buffer))
+                name, spell_header, buffer = next_name, header, []
+                if not header:
+                    state = None
+            else:
+                buffer.append(line)
+            continue
+
+        if stripped == "Origin Feats":
+            state = "feats"
+        if state == "feats":
+            if stripped == "Equipment":
+                state = "equipment"
+                continue
+            category = _FEAT_CATEGORY.match(stripped)
+            if category and previous:
+                prerequisite = category.group(2)
+                feats.append([previous, category.group(1), prerequisite, False, prerequisite is not None and not prerequisite.endswith(")")])
+            elif feats and feats[-1][4]:
+                # Prerequisite continues on the next line until its closing parenthesis
+                feats[-1][2] += " " + stripped
+                feats[-1][4] = not stripped.endswith(")")
+            elif feats and stripped.startswith("Repeatable."):
+                feats[-1][3] = True
+            previous = stripped
+
+    return SRDData(
+        srd_sha256=srd_sha256,
+        classes=tuple(
+            ClassTraits(**dict(c, features=tuple(c["features"]), subclass_features=tuple(c["subclass_features"])))
+            for c in classes
+        ),
+        backgrounds=tuple(backgrounds),
+        feats=tuple(
+            Feat(name, category, prerequisite[:-1] if prerequisite else None, repeatable)
+            for name, category, prerequisite, repeatable, _ in feats
+        ),
+        spells=_assign_spell_ids(spells, _spell_ids() if spell_ids is None else spell_ids),
+        items=tuple(equipment.items),
+        xp_thresholds=tuple(xp for xp, _ in advancement),
+        proficiency_bonus=tuple(bonus for _, bonus in advancement),
+    )
+
+
+# ============== ARTEFACT ==============
+
+def _header(digest: str) -> dict:
+    try:
+        spell_ids = srd_hash(SPELL_IDS_PATH)
+    except FileNotFoundError:
+        spell_ids = None
+    return {"version": SRD_DATA_VERSION, "srd_sha256": digest, "spell_ids_sha256": spell_ids}
+
+
+def content_hash(data: SRDData) -> str:
+    """SHA-256 of the compiled data: changes with the SRD, the parser and the spell ids"""
+    return hashlib.sha256(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def build_srd_data(srd_path: Optional[str] = None, artefact_path: Optional[str] = None) -> SRDData:
+    """Compile the SRD and write the artefact (atomically; skipped if the path isn't writable)"""
+    srd_path, artefact_path = srd_path or SRD_PATH, artefact_path or SRD_DATA_PATH
+    digest = srd_hash(srd_path)
+    with open(srd_path, encoding="utf-8") as source:
+        data = compile_srd(source, digest)
+    building = f"{artefact_path}.building"
+    try:
+        with open(building, "wb") as artefact:
+            pickle.dump(_header(digest), artefact, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, artefact, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(building, artefact_path)
+    except OSError:
+        pass
+    return data
+
+
+def load_srd_data(srd_path: Optional[str] = None, artefact_path: Optional[str] = None) -> SRDData:
+    """The compiled SRD data, from the artefact if it matches the SRD, else freshly built"""
+    srd_path, artefact_path = srd_path or SRD_PATH, artefact_path or SRD_DATA_PATH
+    try:
+        with open(artefact_path, "rb") as artefact:
+            if pickle.load(artefact) == _header(srd_hash(srd_path)):
+                return pickle.load(artefact)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+    return build_srd_data(srd_path, artefact_path)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    data = build_srd_data()
+    print(f"Compiled {SRD_DATA_PATH} in {time.perf_counter() - start:.3f}s: "
+          f"{len(data.classes)} classes, {len(data.backgrounds)} backgrounds, {len(data.feats)} feats, "
+          f"{len(data.spells)} spells, {len(data.items)} items, "
+          f"{len(data.xp_thresholds)} levels")
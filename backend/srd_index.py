@@ -0,0 +1,319 @@
+"""
+SRD full-text search.
+
+SRD_CC_v5.2.1.md is text extracted from the SRD PDF: no markup, words
+hyphenated across lines, page footers ("System Reference Document
+5.2.1NN") and headings often glued to the end of the previous line. The
+build step cleans that up, splits the text into sections at heading-like
+lines and writes them to an SQLite FTS5 table (porter stemming, BM25
+ranking, titles weighted above body text):
+
+    python -m backend.srd_index          # (re)build SRD_INDEX_PATH
+
+The index records the SHA-256 of the SRD it was built from. At startup
+ensure_index() rebuilds it only if the file is missing or the SRD changed;
+searches then open it read-only and memory-mapped, one connection per
+thread, so a query is a few page reads from the OS page cache.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRD_PATH = os.getenv("SRD_PATH", os.path.join(BASE_DIR, "SRD_CC_v5.2.1.md"))
+SRD_INDEX_PATH = os.getenv("SRD_INDEX_PATH", "./srd_index.db")
+SRD_INDEX_VERSION = 2
+SRD_MMAP_SIZE = 64 * 1024 * 1024
+SRD_SEARCH_MAX_RESULTS = 50
+SRD_SEARCH_MAX_TERMS = 10
+
+
+class Section(NamedTuple):
+    title: str
+    chapter: str    # Nearest enclosing table-of-contents heading
+    line: int       # 1-based line of the heading in the SRD
+    body: str       # Paragraphs separated by "\n"
+
+
+# ============== PARSING ==============
+
+_FOOTER = re.compile(r"System Reference Document 5\.2\.1\d*")
+# "...on a character sheet.Ability Checks": a sentence end glued to a capitalized word
+_GLUED = re.compile(r"(?<=[a-z0-9][.!?”)])(?=[A-Z][a-z])")
+_TOC_ENTRY = re.compile(r"^(.*?)\s*\.{3,}\s*\d+\s*$")
+_SMALL_WORDS = frozenset(
+    "a an and as at by for from in into of on or per the to vs with".split()
+)
+_STOP_WORDS = frozenset("a an and are as at be by for from in is it of on or the to with".split())
+_SENTENCE_END = (".", "!", "?", ":", "”", ")", "]")
+PAGE_BREAK = "\0"
+
+
+def _is_heading(text: str) -> bool:
+    """Short Title Case line with no sentence punctuation"""
+    if not 2 <= len(text) <= 60 or not text[0].isupper() or text.endswith(("-", "—")):
+        return False
+    if any(char in text for char in ".,;:()“”•…=+/"):
+        return False
+    words = text.split()
+    if len(words) > 8:
+        return False
+    for word in words:
+        if word[0].isdigit():
+            return False
+        if word[0].islower() and word not in _SMALL_WORDS:
+            return False
+    return True
+
+
+def _contents(text: str) -> frozenset:
+    """Titles listed in the table of contents ("Ability Checks  ....... 6")"""
+    titles = set()
+    for line in text.splitlines():
+        match = _TOC_ENTRY.match(line)
+        if match:
+            titles.add(" ".join(match.group(1).split()))
+    return frozenset(titles)
+
+
+def srd_lines(lines: Iterable[str]) -> Iterator[tuple]:
+    """
+    (line number, text) for raw SRD lines (e.g. an open file), with the
+    table of contents dropped, glued headings split off, and each page
+    footer replaced by a PAGE_BREAK line
+    """
+    for number, raw in enumerate(lines, 1):
+        raw = raw.rstrip("\r\n")
+        if _TOC_ENTRY.match(raw):
+            continue
+        for piece in _FOOTER.sub(f"\n{PAGE_BREAK}\n", raw).split("\n"):
+            for part in _GLUED.split(piece):
+                if part.strip():
+                    yield number, part
+
+
+def join_lines(lines: List[str]) -> str:
+    """Undo line wrapping and hyphenation; an indented line starts a paragraph"""
+    paragraphs, current = [], ""
+    for line in lines:
+        if line.startswith(" ") and current:
+            paragraphs.append(current)
+            current = ""
+        line = line.strip()
+        if current.endswith("-") and current[-2:-1] != " " or current.endswith(" -"):
+            current = current.rstrip(" -") + line
+        elif current:
+            current += " " + line
+        else:
+            current = line
+    if current:
+        paragraphs.append(current)
+    return "\n".join(paragraphs)
+
+
+def parse_sections(text: str) -> List[Section]:
+    """
+    Split the SRD at heading lines. Headings listed in the table of
+    contents always start a section; one with no text before the next
+    heading is a chapter title for the sections after it. Any other
+    heading-like line must follow the end of a sentence or a page break,
+    and not another heading, which keeps table header rows with their
+    table. Text before the first heading (the rest of the table of
+    contents) is dropped.
+    """
+    contents = _contents(text)
+    sections = []
+    chapter, title, start, body = "", None, 0, []
+    previous, previous_heading = PAGE_BREAK, False
+    for number, line in srd_lines(text.splitlines()):
+        stripped = line.strip()
+        if stripped == PAGE_BREAK:
+            previous = PAGE_BREAK
+            continue
+        in_contents = stripped in contents
+        follows_chapter = previous_heading and not body and title in contents
+        if _is_heading(stripped) and (
+            in_contents
+            or follows_chapter
+            or not previous_heading and (previous == PAGE_BREAK or previous.endswith(_SENTENCE_END))
+        ):
+            if body and title:
+                sections.append(Section(title, chapter, start, join_lines(body)))
+            elif follows_chapter:
+                chapter = title
+            title, start, body = stripped, number, []
+            previous, previous_heading = stripped, True
+            continue
+        body.append(line)
+        previous, previous_heading = stripped, False
+    if body and title:
+        sections.append(Section(title, chapter, start, join_lines(body)))
+    return sections
+
+
+# ============== BUILD ==============
+
+def srd_hash(path: Optional[str] = None) -> str:
+    digest = hashlib.sha256()
+    with open(path or SRD_PATH, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _index_key(path: str) -> tuple:
+    """(SRD hash, index version) an index was built from, or None if unreadable"""
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    return meta.get("srd_sha256"), meta.get("version")
+
+
+def build_index(srd_path: Optional[str] = None, index_path: Optional[str] = None) -> int:
+    """Parse the SRD and write a fresh index, replacing `index_path` atomically. Returns the section count"""
+    srd_path, index_path = srd_path or SRD_PATH, index_path or SRD_INDEX_PATH
+    with open(srd_path, encoding="utf-8") as source:
+        text = source.read()
+    sections = parse_sections(text)
+
+    building = f"{index_path}.building"
+    if os.path.exists(building):
+        os.remove(building)
+    connection = sqlite3.connect(building)
+    try:
+        connection.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE VIRTUAL TABLE srd USING fts5(
+                title, chapter, body, line UNINDEXED,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+        """)
+        connection.executemany(
+            "INSERT INTO srd (rowid, title, chapter, body, line) VALUES (?, ?, ?, ?, ?)",
+            ((i, s.title, s.chapter, s.body, s.line) for i, s in enumerate(sections, 1))
+        )
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("srd_sha256", srd_hash(srd_path)),
+            ("version", str(SRD_INDEX_VERSION)),
+            ("built_at", str(int(time.time())))
+        ])
+        # Default ORDER BY rank: BM25 with title matches weighted 10x and chapter 2x
+        connection.execute("INSERT INTO srd (srd, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)')")
+        # Merge the FTS b-trees into one segment, then pack the file
+        connection.execute("INSERT INTO srd (srd) VALUES ('optimize')")
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    os.replace(building, index_path)
+    return len(sections)
+
+
+def ensure_index(srd_path: Optional[str] = None, index_path: Optional[str] = None) -> bool:
+    """Build the index unless it exists for this SRD and index version. Returns True if it was built"""
+    srd_path, index_path = srd_path or SRD_PATH, index_path or SRD_INDEX_PATH
+    if _index_key(index_path) == (srd_hash(srd_path), str(SRD_INDEX_VERSION)):
+        return False
+    build_index(srd_path, index_path)
+    return True
+
+
+# ============== SEARCH ==============
+
+_local = threading.local()
+_ensure_lock = threading.Lock()
+_ensured = False
+
+
+def _connection() -> sqlite3.Connection:
+    """This thread's read-only, memory-mapped connection to the index"""
+    global _ensured
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        if not _ensured:
+            with _ensure_lock:
+                if not _ensured:
+                    ensure_index()
+                    _ensured = True
+        # immutable: the file is only ever replaced whole, never written in place
+        connection = sqlite3.connect(f"file:{SRD_INDEX_PATH}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        connection.execute(f"PRAGMA mmap_size = {SRD_MMAP_SIZE}")
+        _local.connection = connection
+    return connection
+
+
+def open_index() -> None:
+    """Build the index if needed and open this thread's connection (app startup)"""
+    _connection()
+
+
+def match_query(query: str) -> str:
+    """
+    FTS5 MATCH expression for free text: every word must appear, the last
+    as a prefix (if 3+ letters) so partial input matches while typing.
+    Stop words are left out, since nearly every section matches them,
+    unless the query has nothing else (then they must match exactly). Words are quoted, so FTS5 operators and
+    punctuation in the input are taken literally.
+    """
+    words = re.findall(r"\w+", query.lower())[:SRD_SEARCH_MAX_TERMS]
+    if not words:
+        return ""
+    content = [word for word in words if word not in _STOP_WORDS]
+    expression = " ".join(f'"{word}"' for word in content or words)
+    return expression + "*" if content and len(content[-1]) >= 3 else expression
+
+
+_SEARCH_COLUMNS = "rowid, title, chapter, line, snippet(srd, 2, '<mark>', '</mark>', '…', 24), rank"
+
+
+def search(query: str, limit: int = 10) -> List[dict]:
+    """
+    Best matching sections, each with a highlighted snippet of its text:
+    sections titled exactly `query` first, then the rest by weighted BM25
+    """
+    expression = match_query(query)
+    if not expression:
+        return []
+    limit = min(limit, SRD_SEARCH_MAX_RESULTS)
+    connection = _connection()
+    # Title matches are few, so checking them apart keeps the main query a plain top-k by rank
+    exact = connection.execute(
+        f"SELECT {_SEARCH_COLUMNS} FROM srd WHERE srd MATCH ? AND lower(title) = ? ORDER BY rank LIMIT ?",
+        ("{title} : " + expression, " ".join(query.lower().split()), limit)
+    ).fetchall()
+    ranked = connection.execute(
+        f"SELECT {_SEARCH_COLUMNS} FROM srd WHERE srd MATCH ? ORDER BY rank LIMIT ?",
+        (expression, limit)
+    ).fetchall()
+    seen = {row[0] for row in exact}
+    rows = (exact + [row for row in ranked if row[0] not in seen])[:limit]
+    return [
+        {"id": id, "title": title, "chapter": chapter, "line": line, "snippet": snippet, "score": round(-score, 4)}
+        for id, title, chapter, line, snippet, score in rows
+    ]
+
+
+def get_section(section_id: int):
+    """Full text of one section, or None"""
+    row = _connection().execute(
+        "SELECT rowid, title, chapter, line, body FROM srd WHERE rowid = ?", (section_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("id", "title", "chapter", "line", "body"), row))
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    count = build_index()
+    print(f"Indexed {count} SRD sections into {SRD_INDEX_PATH} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,109 @@
+"""
+Shared fixtures: a fresh in-memory database per test, a TestClient signed
+in as USER, and a factory for characters.
+
+Run the suite from the repo root: `python -m pytest backend/tests`.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.auth import get_current_user
+from backend.database import Base, get_db
+from backend.identity import identity_cache
+from backend.main import app
+from backend.models import Character, User
+
+USER = {"email": "player@example.com", "name": "Player", "sub": "player-sub"}
+OTHER_USER = {"email": "other@example.com", "name": "Other", "sub": "other-sub"}
+
+CHARACTER_DEFAULTS = {
+    "name": "Hero",
+    "species": "Human",
+    "class_name": "Fighter",
+    "background": "Soldier",
+    "level": 1,
+    "stats": {
+        "strength": 16, "dexterity": 14, "constitution": 14,
+        "intelligence": 10, "wisdom": 12, "charisma": 8
+    },
+    "hp_max": 12,
+    "hp_current": 12,
+    "hit_dice_max": 1,
+    "hit_dice_current": 1,
+    "proficiencies": {
+        "skills": ["Athletics", "Perception"],
+        "saves": ["strength", "constitution"],
+        "tools": [], "weapons": ["simple", "martial"], "armor": ["light", "medium", "heavy", "shields"]
+    },
+    "speed": 30,
+}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def client(session_factory):
+    """TestClient on the test database, signed in as USER (the app's lifespan isn't run)"""
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_current_user] = lambda: USER
+    identity_cache.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    identity_cache.clear()
+
+
+def _user_id(db, user: dict) -> int:
+    db_user = db.query(User).filter(User.email == user["email"]).first()
+    if db_user is None:
+        db_user = User(email=user["email"], name=user["name"], google_id=user["sub"])
+        db.add(db_user)
+        db.flush()
+    return db_user.id
+
+
+@pytest.fixture
+def user_id(session_factory) -> int:
+    """Id of USER's row (created)"""
+    with session_factory() as db:
+        user_id = _user_id(db, USER)
+        db.commit()
+        return user_id
+
+
+@pytest.fixture
+def make_character(session_factory):
+    """make_character(owner=USER, **columns) inserts a character through the ORM and returns its id"""
+    def make(owner: dict = USER, **columns) -> int:
+        with session_factory() as db:
+            character = Character(user_id=_user_id(db, owner), **dict(CHARACTER_DEFAULTS, **columns))
+            db.add(character)
+            db.commit()
+            return character.id
+    return make
+
+
+@pytest.fixture
+def character_ids(make_character):
+    return [make_character(name=f"Hero {i}", level=1 + i) for i in range(3)]
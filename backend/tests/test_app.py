@@ -0,0 +1,27 @@
+"""Application wiring: routes and the worker thread pool"""
+
+import anyio
+import anyio.to_thread
+from fastapi.routing import APIRoute
+
+from backend import main
+
+
+def test_each_route_is_served_by_one_handler():
+    seen = set()
+    for route in main.app.routes:
+        if isinstance(route, APIRoute):
+            for method in route.methods:
+                assert (method, route.path) not in seen
+                seen.add((method, route.path))
+
+
+def test_lifespan_sizes_the_thread_pool(monkeypatch):
+    monkeypatch.setattr(main, "THREADPOOL_SIZE", 7)
+    monkeypatch.setattr(main, "open_index", lambda: None)
+
+    async def tokens():
+        async with main.lifespan(main.app):
+            return anyio.to_thread.current_default_thread_limiter().total_tokens
+
+    assert anyio.run(tokens) == 7
@@ -0,0 +1,69 @@
+"""POST /api/characters/bulk and python -m backend.bulk_import"""
+
+import json
+
+import pytest
+
+from backend import bulk_import
+from backend.routers.characters import BULK_IMPORT_BATCH_SIZE, BULK_IMPORT_MAX
+
+DEFINITION = {
+    "name": "Imported", "species": "Dwarf", "class_name": "Cleric", "background": "Acolyte", "level": 3,
+    "stats": {"strength": 14, "dexterity": 8, "constitution": 16, "intelligence": 10, "wisdom": 15, "charisma": 12},
+    "skill_choices": ["Medicine"],
+}
+SERVER_SET = ("id", "created_at", "updated_at")
+
+
+def _comparable(character: dict) -> dict:
+    character = {key: value for key, value in character.items() if key not in SERVER_SET}
+    character["proficiencies"]["skills"] = sorted(character["proficiencies"]["skills"])
+    return character
+
+
+def test_bulk_rows_match_single_creates(client):
+    single = client.post("/api/characters/", json=DEFINITION).json()
+    result = client.post("/api/characters/bulk", json={"characters": [DEFINITION, dict(DEFINITION, name="Second")]}).json()
+    assert (result["created"], result["failed"]) == (2, 0)
+    assert [row["index"] for row in result["results"]] == [0, 1]
+
+    expected = _comparable(client.get(f"/api/characters/{single['id']}").json())
+    imported = _comparable(client.get(f"/api/characters/{result['results'][0]['id']}").json())
+    assert imported == expected
+    assert imported["hp_max"] == single["hp_max"] and imported["speed"] == 25
+
+
+def test_failures_are_reported_per_row(client):
+    definitions = [DEFINITION, {"name": "No class"}, dict(DEFINITION, stats={"strength": 99}), dict(DEFINITION, name="Last")]
+    result = client.post("/api/characters/bulk", json={"characters": definitions}).json()
+    assert (result["created"], result["failed"]) == (2, 2)
+    assert [("id" in row, row["index"]) for row in result["results"]] == [(True, 0), (False, 1), (False, 2), (True, 3)]
+    assert len(client.get("/api/characters/party").json()["characters"]) == 2
+
+
+def test_large_imports_are_batched_and_capped(client):
+    count = BULK_IMPORT_BATCH_SIZE + 1
+    result = client.post("/api/characters/bulk", json={"characters": [DEFINITION] * count}).json()
+    ids = [row["id"] for row in result["results"]]
+    assert result["created"] == count and len(set(ids)) == count
+    too_many = client.post("/api/characters/bulk", json={"characters": [DEFINITION] * (BULK_IMPORT_MAX + 1)})
+    assert too_many.status_code == 413
+
+
+def test_cli_creates_the_user_and_reports_failures(tmp_path, monkeypatch, session_factory, client, capsys):
+    monkeypatch.setattr(bulk_import, "SessionLocal", session_factory)
+    path = tmp_path / "party.ndjson"
+    path.write_text("\n".join(json.dumps(d) for d in [DEFINITION, {"name": "Broken"}]) + "\n")
+    with pytest.raises(SystemExit) as exit_info:
+        bulk_import.main([str(path), "--user", "player@example.com"])
+    assert exit_info.value.code == 1
+    err = capsys.readouterr().err
+    assert "#1:" in err and "Created 1 character(s), 1 failed" in err
+    assert [c["name"] for c in client.get("/api/characters/party").json()["characters"]] == ["Imported"]
+
+
+def test_read_definitions_accepts_arrays_and_ndjson(tmp_path):
+    array, lines = tmp_path / "a.json", tmp_path / "b.ndjson"
+    array.write_text(json.dumps([DEFINITION, DEFINITION]))
+    lines.write_text(json.dumps(DEFINITION) + "\n\n" + json.dumps(DEFINITION) + "\n")
+    assert bulk_import.read_definitions(str(array)) == bulk_import.read_definitions(str(lines)) == [DEFINITION] * 2
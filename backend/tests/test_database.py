@@ -0,0 +1,58 @@
+"""Engine profiles: pragmas, profile selection and the single-writer queue"""
+
+import os
+import subprocess
+import sys
+import threading
+
+from sqlalchemy import create_engine, text
+
+from backend import database
+from backend.srd_index import BASE_DIR
+
+
+def _import_database(tmp_path, **env):
+    env = dict(os.environ, PYTHONPATH=BASE_DIR, **env)
+    return subprocess.run(
+        [sys.executable, "-c", "import backend.database as d; print(d.DB_POOL_SIZE, d.SERIALIZE_WRITES)"],
+        cwd=tmp_path, env=env, capture_output=True, text=True
+    )
+
+
+def test_production_pragmas_apply_to_every_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    database.apply_sqlite_pragmas(engine, database.SQLITE_PROFILES["production"]["pragmas"])
+    with engine.connect() as connection:
+        pragma = lambda name: connection.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert (pragma("synchronous"), pragma("busy_timeout"), pragma("temp_store")) == (1, 5000, 2)
+    engine.dispose()
+
+
+def test_profile_and_overrides_from_the_environment(tmp_path):
+    assert _import_database(tmp_path, DB_PROFILE="production").stdout.split() == ["8", "True"]
+    result = _import_database(tmp_path, DB_PROFILE="production", DB_POOL_SIZE="3", DB_SERIALIZE_WRITES="0")
+    assert result.stdout.split() == ["3", "False"]
+
+
+def test_unknown_profile_names_the_valid_ones(tmp_path):
+    result = _import_database(tmp_path, DB_PROFILE="prod")
+    assert result.returncode != 0
+    assert "Unknown DB_PROFILE 'prod'; expected one of: default, production" in result.stderr
+    assert "KeyError" not in result.stderr
+
+
+def test_serialized_writes_queue(monkeypatch):
+    monkeypatch.setattr(database, "SERIALIZE_WRITES", True)
+    entered = threading.Event()
+
+    def _writer():
+        with database.serialized_write():
+            entered.set()
+
+    with database.serialized_write():
+        thread = threading.Thread(target=_writer)
+        thread.start()
+        assert not entered.wait(0.1)
+    thread.join(1)
+    assert entered.is_set()
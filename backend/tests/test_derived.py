@@ -0,0 +1,70 @@
+"""Batch derived stats: the NumPy path must agree exactly with the per-character kernel"""
+
+import json
+import random
+from types import SimpleNamespace
+
+from backend.derived import BATCH_MIN_SIZE, derived_summaries, pack, roll_table
+from backend.game_data import ABILITIES, SKILL_NAMES, attack_roll, compile_character, save_roll, skill_roll
+
+ROLLS = (
+    [("skill", i) for i in range(len(SKILL_NAMES))]
+    + [("save", i) for i in range(len(ABILITIES))]
+    + [("attack", i) for i in range(len(ABILITIES))]
+)
+KERNELS = {"skill": skill_roll, "save": save_roll, "attack": attack_roll}
+
+
+def random_characters(count, seed=12):
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=i, name=f"Hero {i}", level=rng.randint(1, 20), armor_class=rng.choice([None, 10, 12]),
+            stats={ability: rng.randint(1, 30) for ability in ABILITIES if rng.random() < 0.9},
+            proficiencies={
+                "skills": rng.sample(SKILL_NAMES, rng.randint(0, 6)),
+                "saves": rng.sample(ABILITIES, rng.randint(0, 2)),
+            },
+            inventory=None, equipped_armor_class=None
+        )
+        for i in range(count)
+    ]
+
+
+def test_large_batches_are_packed():
+    characters = random_characters(BATCH_MIN_SIZE)
+    characters[3].stats = {"strength": 12.0}
+    _, packed, scalar = pack(characters)
+    assert scalar == [3] and len(packed) == BATCH_MIN_SIZE - 1
+    _, packed, scalar = pack(characters[:BATCH_MIN_SIZE - 1])
+    assert packed == [] and len(scalar) == BATCH_MIN_SIZE - 1
+
+
+def test_roll_table_matches_the_kernel():
+    characters = random_characters(3 * BATCH_MIN_SIZE)
+    for character, row in zip(characters, roll_table(characters, ROLLS)):
+        compiled = compile_character(character.stats, character.proficiencies, character.level)
+        expected = [KERNELS[kind](compiled, index) for kind, index in ROLLS]
+        assert json.dumps(row) == json.dumps(expected)
+
+
+def test_summaries_match_one_at_a_time():
+    characters = random_characters(3 * BATCH_MIN_SIZE)
+    characters[5].stats = {"dexterity": 14.0}
+    batch = derived_summaries(characters)
+    single = [derived_summaries([character])[0] for character in characters]
+    assert json.dumps(batch) == json.dumps(single)
+
+
+def test_endpoint_matches_the_sheets(client, make_character):
+    ids = [make_character(name=f"Hero {i}", level=1 + i % 20, stats={**dict.fromkeys(ABILITIES, 10), "dexterity": 8 + i % 12})
+           for i in range(BATCH_MIN_SIZE + 4)]
+    summaries = client.get("/api/characters/derived").json()["characters"]
+    assert [summary["id"] for summary in summaries] == ids
+    for summary in summaries:
+        sheet = client.get(f"/api/characters/{summary['id']}/sheet").json()
+        assert summary["modifiers"] == sheet["modifiers"]
+        assert summary["armor_class"] == sheet["armor_class"]
+        assert summary["skills"] == {line["skill"]: line["total_modifier"] for line in sheet["skills"]}
+        assert summary["saves"] == {line["ability"]: line["total_modifier"] for line in sheet["saves"]}
+        assert summary["attacks"]["ranged"] == sheet["attacks"]["ranged"]["to_hit"]
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from backend.dice import (
+    MAX_DICE_PER_REQUEST, MAX_DICE_PER_TERM, MAX_SIDES, MAX_TERMS,
+    DiceError, check_dice_budget, compile_expression, critical, roll, roll_totals
+)
+
+
+# ============== PARSER ==============
+
+def test_parses_terms():
+    expression = compile_expression("2d6 + 1d8 fire - 3")
+    assert [(t.sign, t.count, t.sides, t.keep, t.damage_type) for t in expression.terms] == [
+        (1, 2, 6, 2, None), (1, 1, 8, 1, "fire"), (-1, 3, 0, 3, None)
+    ]
+    assert expression.dice_count == 3
+
+
+def test_normalizes_case_and_whitespace():
+    assert compile_expression("  2D6   +3 ") is compile_expression("2d6 +3")
+
+
+def test_percentile_and_implicit_count():
+    (term,) = compile_expression("d%").terms
+    assert (term.count, term.sides) == (1, 100)
+
+
+def test_keep_and_advantage():
+    keep, = compile_expression("4d6kh3").terms
+    assert (keep.count, keep.keep, keep.keep_highest) == (4, 3, True)
+    adv, = compile_expression("1d20adv").terms
+    assert (adv.count, adv.keep, adv.keep_highest, adv.text) == (2, 1, True, "1d20adv")
+    dis, = compile_expression("1d20dis").terms
+    assert (dis.count, dis.keep, dis.keep_highest) == (2, 1, False)
+
+
+@pytest.mark.parametrize("text", [
+    "", "   ", "2d", "d", "2d6 3", "2d6 +", "2x6", "2d6kh5", "4d6kh0", "2d20adv",
+    f"{MAX_DICE_PER_TERM + 1}d6", f"1d{MAX_SIDES + 1}", "0d6", "1d0",
+    "+".join(["1"] * (MAX_TERMS + 1)),
+])
+def test_rejects_invalid_expressions(text):
+    with pytest.raises(DiceError):
+        compile_expression(text)
+
+
+def test_limits_are_inclusive():
+    compile_expression(f"{MAX_DICE_PER_TERM}d{MAX_SIDES}")
+    compile_expression("+".join(["1"] * MAX_TERMS))
+
+
+def test_dice_budget():
+    expression = compile_expression("10d6")
+    check_dice_budget(expression, MAX_DICE_PER_REQUEST // 10)
+    with pytest.raises(DiceError):
+        check_dice_budget(expression, MAX_DICE_PER_REQUEST // 10 + 1)
+    # Constants cost nothing
+    check_dice_budget(compile_expression("5"), MAX_DICE_PER_REQUEST * 2)
+
+
+# ============== CRITICAL HITS ==============
+
+def test_critical_doubles_dice_not_constants():
+    crit = critical(compile_expression("2d6+1d8+3"))
+    assert [(t.count, t.sides, t.keep) for t in crit.terms] == [(4, 6, 4), (2, 8, 2), (3, 0, 3)]
+
+
+def test_critical_rolls_keep_terms_twice():
+    crit = critical(compile_expression("4d6kh3+2"))
+    assert [(t.count, t.sides, t.keep) for t in crit.terms] == [(4, 6, 3), (4, 6, 3), (2, 0, 2)]
+    assert crit.dice_count == 8
+
+
+# ============== ROLLING ==============
+
+def test_roll_totals_within_bounds():
+    totals = roll_totals(compile_expression("4d6kh3-1"), np.random.Generator(np.random.PCG64(1)), 5000)
+    assert totals.shape == (5000,)
+    assert totals.min() >= 2 and totals.max() <= 17
+
+
+def test_roll_totals_reproducible_from_seed():
+    expression = compile_expression("3d8+1d4")
+    first = roll_totals(expression, np.random.Generator(np.random.PCG64(7)), 100)
+    second = roll_totals(expression, np.random.Generator(np.random.PCG64(7)), 100)
+    assert np.array_equal(first, second)
+
+
+def test_roll_totals_enforces_budget():
+    with pytest.raises(DiceError):
+        roll_totals(compile_expression("1000d6"), np.random.Generator(np.random.PCG64(0)), MAX_DICE_PER_REQUEST)
+
+
+def test_roll_shows_kept_dice_and_damage_types():
+    result = roll(compile_expression("4d6kh3 fire + 2 fire - 1d4"), np.random.Generator(np.random.PCG64(3)))
+    keep, constant, penalty = result["terms"]
+    assert len(keep["rolls"]) == 4 and len(keep["kept"]) == 3
+    assert sorted(keep["kept"]) == sorted(keep["rolls"])[1:]
+    assert constant["subtotal"] == 2
+    assert penalty["term"] == "-1d4" and penalty["subtotal"] == -penalty["kept"][0]
+    assert result["by_type"] == {"fire": keep["subtotal"] + 2}
+    assert result["total"] == keep["subtotal"] + 2 + penalty["subtotal"]
@@ -0,0 +1,102 @@
+import pytest
+
+from backend.equipment import (
+    EquipmentInputs, equipped_armor_class, expand_inventory, find_item, inventory_summary, resolve_inventory
+)
+
+TRAINED = {"armor": ["Light", "Medium", "Heavy", "Shields"]}
+
+
+def _inputs(strength=10, dexterity=0, armor_training=("light", "medium", "heavy", "shields"), weapons=("simple",)):
+    return EquipmentInputs(
+        strength=strength, modifiers=(0, dexterity, 0, 0, 0, 0), proficiency_bonus=2,
+        weapon_training=weapons, armor_training=armor_training, base_armor_class=None, speed=30
+    )
+
+
+def test_find_item():
+    assert find_item("longsword") is find_item("Longsword") is find_item("LONGSWORD")
+    assert find_item("Sword of Kas") is None
+    assert find_item(None) is None
+
+
+def test_resolve_inventory():
+    resolved = resolve_inventory([
+        {"item": "longsword", "equipped": True},
+        {"item": "arrows", "quantity": 40},
+        {"item": "gp", "quantity": 25},
+        {"name": "Sword of Kas", "weight": 3},
+        "Rope, Hempen",
+    ])
+    assert [entry.name for entry in resolved.entries][:3] == ["Longsword", "Arrows", "Gold Piece"]
+    # Arrows come in bundles of 20 at 1 lb.; custom entries use their own weight
+    assert resolved.weight == pytest.approx(3.0 + 2.0 + 0.5 + 3.0 + resolved.entries[4].weight)
+    assert resolved.coins_cp == 2500
+    assert [entry.item.key for entry in resolved.weapons] == ["longsword"]
+    assert "Sword of Kas" in resolved.unknown
+    assert resolved.armor is None and resolved.shield is None
+
+
+@pytest.mark.parametrize("raw, quantity, weight", [
+    ({"item": "gp", "quantity": -3}, 1, 0.02),
+    ({"item": "gp", "quantity": "7"}, 1, 0.02),
+    ({"item": "gp", "quantity": True}, 1, 0.02),
+    ({"name": "Idol", "weight": True}, 1, 0.0),
+    (42, 1, 0.0),
+])
+def test_resolve_inventory_tolerates_bad_entries(raw, quantity, weight):
+    (entry,) = resolve_inventory([raw]).entries
+    assert (entry.quantity, entry.weight) == (quantity, pytest.approx(weight))
+
+
+def test_resolve_inventory_is_memoized():
+    assert resolve_inventory([{"item": "gp", "quantity": 1}]) is resolve_inventory([{"quantity": 1, "item": "gp"}])
+    assert resolve_inventory(None) is resolve_inventory([])
+
+
+def test_only_equipped_armor_counts():
+    resolved = resolve_inventory([{"item": "chain-mail"}, {"item": "leather-armor", "equipped": True}, {"item": "shield", "equipped": True}])
+    assert (resolved.armor.key, resolved.shield.key) == ("leather-armor", "shield")
+
+
+@pytest.mark.parametrize("inventory, dex, base, proficiencies, armor_class", [
+    ([], 3, None, TRAINED, 13),
+    ([], 3, 13, TRAINED, 16),
+    ([{"item": "leather-armor", "equipped": True}], 4, None, TRAINED, 15),
+    ([{"item": "scale-mail", "equipped": True}], 4, None, TRAINED, 16),
+    ([{"item": "chain-mail", "equipped": True}], 4, None, TRAINED, 16),
+    ([{"item": "chain-mail", "equipped": True}, {"item": "shield", "equipped": True}], 0, None, TRAINED, 18),
+    ([{"item": "shield", "equipped": True}], 2, None, {"armor": ["light"]}, 12),
+    ([{"item": "chain-mail"}], 1, None, TRAINED, 11),
+])
+def test_equipped_armor_class(inventory, dex, base, proficiencies, armor_class):
+    assert equipped_armor_class(inventory, dex, base, proficiencies) == armor_class
+
+
+def test_summary_encumbrance():
+    heavy = [{"item": "plate-armor", "equipped": True}]
+    assert inventory_summary(heavy, _inputs(strength=15))["speed"] == 30
+    assert inventory_summary(heavy, _inputs(strength=14))["speed"] == 20
+    # 4 x 65 lb. is over Str 10 x 15 but under x 30
+    over = inventory_summary([{"item": "plate-armor", "quantity": 4}], _inputs(strength=10))
+    assert over["over_capacity"] and over["speed"] == 5
+    assert inventory_summary([{"item": "plate-armor", "quantity": 5}], _inputs(strength=10))["speed"] == 0
+
+
+def test_summary_attacks_and_training():
+    summary = inventory_summary(
+        [{"item": "dagger"}, {"item": "longsword", "equipped": True}, {"item": "chain-mail", "equipped": True}],
+        _inputs(dexterity=3, armor_training=("light",))
+    )
+    dagger, longsword = summary["attacks"]
+    assert (dagger["ability"], dagger["proficient"], dagger["to_hit"], dagger["damage"]) == ("dexterity", True, 5, "1d4+3")
+    assert (longsword["ability"], longsword["proficient"], longsword["to_hit"]) == ("strength", False, 0)
+    assert summary["untrained_armor"] == ["Chain Mail"]
+    assert summary["stealth_disadvantage"]
+
+
+def test_expand_inventory():
+    assert expand_inventory([{"item": "arrows", "quantity": 30}, {"name": "Idol", "weight": 2.5}]) == [
+        {"item": "arrows", "name": "Arrows", "category": "ammunition", "quantity": 30, "equipped": False, "weight": 1.5},
+        {"item": None, "name": "Idol", "category": None, "quantity": 1, "equipped": False, "weight": 2.5},
+    ]
@@ -0,0 +1,139 @@
+"""Conditional GETs (If-None-Match -> 304) and writes (If-Match -> 412)"""
+
+import pytest
+
+from backend.game_data import srd_version
+from backend.tests.conftest import OTHER_USER
+
+JSON_PATCH = {"Content-Type": "application/json-patch+json"}
+
+
+@pytest.fixture
+def character(character_ids, client):
+    url = f"/api/characters/{character_ids[0]}"
+    response = client.get(url)
+    assert response.status_code == 200
+    return url, response.headers["ETag"]
+
+
+def test_get_returns_version_etag(character):
+    url, etag = character
+    assert etag == f'"c{url.rsplit("/", 1)[1]}v1-{srd_version()}"'
+
+
+def test_if_none_match_current_is_304(client, character):
+    url, etag = character
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_if_none_match_lists_and_weak_tags(client, character):
+    url, etag = character
+    assert client.get(url, headers={"If-None-Match": f'"stale", W/{etag}'}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+
+
+@pytest.mark.parametrize("suffix", ["", "/sheet", "/inventory", "/spells"])
+def test_new_srd_data_changes_every_etag(client, character, monkeypatch, suffix):
+    url, _ = character
+    etag = client.get(url + suffix).headers["ETag"]
+    monkeypatch.setattr("backend.routers.characters.srd_version", lambda: "0" * 12)
+    response = client.get(url + suffix, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag.replace(srd_version(), "0" * 12)
+
+
+def test_if_match_from_older_srd_data_is_412(client, character, monkeypatch):
+    url, etag = character
+    monkeypatch.setattr("backend.routers.characters.srd_version", lambda: "0" * 12)
+    assert client.put(url, json={"hp_current": 3}, headers={"If-Match": etag}).status_code == 412
+
+
+def test_if_none_match_stale_is_200(client, character):
+    url, etag = character
+    assert client.put(url, json={"hp_current": 5}).status_code == 200
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["hp_current"] == 5
+
+
+def test_if_none_match_missing_character_is_404(client, character_ids):
+    assert client.get("/api/characters/9999", headers={"If-None-Match": '"c9999v1"'}).status_code == 404
+
+
+def test_if_none_match_other_users_character_is_404(client, make_character):
+    other = make_character(owner=OTHER_USER)
+    assert client.get(f"/api/characters/{other}", headers={"If-None-Match": f'"c{other}v1"'}).status_code == 404
+
+
+@pytest.mark.parametrize("suffix", ["sheet", "inventory", "spells", "spells/preparable"])
+def test_representations_have_their_own_etags(client, character, suffix):
+    url, etag = character
+    response = client.get(f"{url}/{suffix}")
+    assert response.status_code == 200
+    representation = response.headers["ETag"]
+    assert representation != etag
+    assert client.get(f"{url}/{suffix}", headers={"If-None-Match": representation}).status_code == 304
+    # The detail ETag doesn't validate another representation
+    assert client.get(f"{url}/{suffix}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_match_current_writes(client, character):
+    url, etag = character
+    response = client.put(url, json={"hp_current": 4}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag.replace("v1", "v2")
+
+
+def test_if_match_stale_is_412(client, character):
+    url, etag = character
+    assert client.put(url, json={"hp_current": 4}).status_code == 200
+    response = client.put(url, json={"hp_current": 1}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(url).json()["hp_current"] == 4
+
+
+def test_if_match_stale_patch_is_412(client, character):
+    url, etag = character
+    assert client.put(url, json={"hp_current": 4}).status_code == 200
+    merge = client.patch(url, json={"hp_current": 1}, headers={"If-Match": etag, "Content-Type": "application/merge-patch+json"})
+    assert merge.status_code == 412
+    operations = [{"op": "replace", "path": "/hp_current", "value": 1}]
+    assert client.patch(url, json=operations, headers={"If-Match": etag, **JSON_PATCH}).status_code == 412
+    assert client.get(url).json()["hp_current"] == 4
+
+
+def test_if_match_any_listed_version(client, character):
+    url, etag = character
+    response = client.patch(
+        url, json=[{"op": "replace", "path": "/hp_current", "value": 2}],
+        headers={"If-Match": f'"c0v1", {etag}', **JSON_PATCH}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag.replace("v1", "v2")
+
+
+def test_if_match_weak_or_foreign_etag_never_matches(client, character):
+    url, etag = character
+    assert client.put(url, json={"hp_current": 3}, headers={"If-Match": f"W/{etag}"}).status_code == 412
+    assert client.put(url, json={"hp_current": 3}, headers={"If-Match": '"something-else"'}).status_code == 412
+
+
+def test_if_match_star_is_unconditional(client, character):
+    url, _ = character
+    assert client.put(url, json={"hp_current": 3}).status_code == 200
+    assert client.put(url, json={"hp_current": 2}, headers={"If-Match": "*"}).status_code == 200
+
+
+def test_if_match_missing_character_is_404(client, character_ids):
+    assert client.put("/api/characters/9999", json={"hp_current": 1}, headers={"If-Match": '"c9999v1"'}).status_code == 404
+
+
+def test_failed_json_patch_test_is_409(client, character):
+    url, etag = character
+    operations = [{"op": "test", "path": "/hp_current", "value": -1}, {"op": "replace", "path": "/hp_current", "value": 1}]
+    assert client.patch(url, json=operations, headers={"If-Match": etag, **JSON_PATCH}).status_code == 409
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
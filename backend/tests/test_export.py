@@ -0,0 +1,75 @@
+"""NDJSON export (keyset pages) and import"""
+
+import json
+
+from sqlalchemy import create_engine
+
+from backend.database import Base
+from backend.export import import_ndjson, ndjson_export
+from backend.tests.conftest import OTHER_USER
+
+
+def _lines(chunks) -> list:
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+def test_export_pages_cover_every_row_once(engine, user_id, make_character):
+    ids = [make_character(name=f"Hero {i}") for i in range(5)]
+    make_character(owner=OTHER_USER)
+    for batch_size in (1, 2, 5, 500):
+        chunks = list(ndjson_export(engine, user_id, batch_size=batch_size))
+        assert [row["id"] for row in _lines(chunks)] == ids
+        assert len(chunks) == -(-len(ids) // batch_size)
+
+
+def test_no_connection_is_held_between_pages(tmp_path, make_character):
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(file_engine)
+    with file_engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO characters (name, version) VALUES ('a', 1), ('b', 1), ('c', 1)")
+    chunks = ndjson_export(file_engine, batch_size=1)
+    for _ in chunks:
+        assert file_engine.pool.checkedout() == 0
+    file_engine.dispose()
+
+
+def test_http_export_is_the_users_characters(client, character_ids, make_character):
+    make_character(owner=OTHER_USER)
+    response = client.get("/api/characters/export", headers={"Accept-Encoding": "identity"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = _lines([response.content])
+    assert [row["id"] for row in rows] == character_ids
+    assert not any("user_id" in row or "derived" in row for row in rows)
+
+
+def test_http_export_gzip(client, character_ids):
+    response = client.get("/api/characters/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    # The client decodes the gzip stream
+    assert response.content == client.get("/api/characters/export", headers={"Accept-Encoding": "identity"}).content
+
+
+def test_admin_export_round_trips(engine, make_character):
+    make_character(spells={"known": [1, 2], "prepared": [2], "slots": {"1": 2}}, inventory=[{"item": "rope"}])
+    make_character(owner=OTHER_USER, name="Other")
+    exported = b"".join(ndjson_export(engine))
+    assert {row["owner"] for row in _lines([exported])} == {"player@example.com", "other@example.com"}
+
+    restored = create_engine("sqlite://")
+    Base.metadata.create_all(restored)
+    result = import_ndjson(exported.splitlines(), restored, keep_ids=True)
+    assert result == {"imported": 2, "errors": []}
+    assert b"".join(ndjson_export(restored)) == exported
+    restored.dispose()
+
+
+def test_import_reports_bad_lines(engine, user_id):
+    lines = [
+        json.dumps({"name": "Good", "stats": {"strength": 12}}),
+        "not json",
+        json.dumps({"name": "Bad", "stats": {"strength": 99}}),
+        json.dumps({"name": "Extra", "unknown": 1}),
+    ]
+    result = import_ndjson(lines, engine, user_id=user_id)
+    assert result["imported"] == 1
+    assert [error["line"] for error in result["errors"]] == [2, 3, 4]
@@ -0,0 +1,44 @@
+"""Pre-serialized game data: content-hash ETags and long-lived caching"""
+
+import pytest
+
+from backend.game_data import CLASS_HIT_DICE
+from backend.http_cache import GAME_DATA_CACHE_CONTROL
+
+GAME_DATA = [
+    "/api/characters/game-data/species",
+    "/api/characters/game-data/classes",
+    "/api/characters/game-data/subclasses/Wizard",
+    "/api/characters/game-data/backgrounds",
+    "/api/characters/game-data/feats",
+    "/api/spells/",
+    "/api/equipment/",
+]
+
+
+@pytest.mark.parametrize("path", GAME_DATA)
+def test_cached_payloads_revalidate_with_304(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == GAME_DATA_CACHE_CONTROL
+    etag = response.headers["ETag"]
+    assert client.get(path).content == response.content
+
+    revalidated = client.get(path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_payloads_have_distinct_etags(client):
+    assert len({client.get(path).headers["ETag"] for path in GAME_DATA}) == len(GAME_DATA)
+
+
+def test_classes_use_the_compiled_hit_dice(client):
+    classes = client.get("/api/characters/game-data/classes").json()["classes"]
+    assert classes and all(c["hit_die"] == CLASS_HIT_DICE[c["name"]] for c in classes)
+
+
+def test_unknown_subclass_list_is_404(client):
+    assert client.get("/api/characters/game-data/subclasses/Juggler").status_code == 404
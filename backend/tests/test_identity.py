@@ -0,0 +1,70 @@
+"""Session identity: one users lookup, then the TTL LRU cache"""
+
+import pytest
+from sqlalchemy import event
+
+from backend import identity
+from backend.auth import get_current_user
+from backend.identity import TTLCache, identity_cache
+from backend.main import app
+from backend.models import User
+from backend.tests.conftest import USER
+
+
+@pytest.fixture
+def user_queries(engine):
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c"), len(cache)) == (1, None, 3, 2)
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(identity.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=8, ttl=5)
+    cache.set("a", 1)
+    now[0] += 4.9
+    assert cache.get("a") == 1
+    now[0] += 0.2
+    assert cache.get("a") is None and len(cache) == 0
+
+
+def test_user_is_looked_up_once(client, character_ids, user_queries):
+    for _ in range(3):
+        assert client.get(f"/api/characters/{character_ids[0]}").status_code == 200
+    assert len(user_queries) == 1
+
+
+def test_misses_are_not_cached(client, user_queries):
+    assert client.get("/api/characters/party").status_code == 404
+    body = {"name": "New", "species": "Human", "class_name": "Fighter", "background": "Soldier"}
+    assert client.post("/api/characters/", json=body).status_code == 200
+    assert len(client.get("/api/characters/party").json()["characters"]) == 1
+
+
+def test_user_writes_invalidate_the_cache(client, session_factory, user_id):
+    identity_cache.set(USER["email"], user_id)
+    with session_factory() as db:
+        db.query(User).filter(User.id == user_id).one().name = "Renamed"
+        db.commit()
+    assert identity_cache.get(USER["email"]) is None
+
+
+def test_no_session_is_401(client):
+    app.dependency_overrides[get_current_user] = lambda: None
+    assert client.get("/api/characters/party").status_code == 401
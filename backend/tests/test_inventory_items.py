@@ -0,0 +1,89 @@
+"""inventory_items: dual writes, rebuild and the item query endpoints"""
+
+import pytest
+from sqlalchemy import select
+
+from backend import inventory_items
+from backend.inventory_items import inventory_item_rows, rebuild_inventory_items, sync_inventory_items
+from backend.models import InventoryItem
+from backend.routers import characters
+from backend.tests.conftest import OTHER_USER
+
+JSON_PATCH = {"Content-Type": "application/json-patch+json"}
+FIGHTER = [{"item": "longsword", "equipped": True}, {"item": "gp", "quantity": 25}]
+ROGUE = [{"item": "Longsword"}, {"item": "sp", "quantity": 30}, {"name": "Sword of Kas", "weight": 3}]
+
+
+def _rows(session_factory):
+    with session_factory() as db:
+        return db.execute(
+            select(InventoryItem.character_id, InventoryItem.position, InventoryItem.item_key, InventoryItem.quantity)
+            .order_by(InventoryItem.character_id, InventoryItem.position)
+        ).all()
+
+
+@pytest.fixture
+def party(client, make_character, session_factory):
+    """USER's Fighter and Rogue, written through the API, and OTHER_USER's character carrying the same items"""
+    ids = [make_character(name="Fighter"), make_character(name="Rogue")]
+    for character_id, inventory in zip(ids, (FIGHTER, ROGUE)):
+        assert client.put(f"/api/characters/{character_id}", json={"inventory": inventory}).status_code == 200
+    other = make_character(owner=OTHER_USER, name="Other", inventory=ROGUE)
+    with session_factory() as db:
+        sync_inventory_items(db, [(other, ROGUE)])
+        db.commit()
+    return ids, other
+
+
+def test_rows_resolve_against_the_catalogue():
+    rows = inventory_item_rows(7, ROGUE)
+    assert [(row["item_key"], row["category"], row["quantity"]) for row in rows] == [
+        ("longsword", "weapon", 1), ("sp", "coin", 30), ("sword-of-kas", None, 1)
+    ]
+    assert rows[1]["value_cp"] == 300 and rows[2]["value_cp"] is None
+    assert inventory_item_rows(7, [{"quantity": 2}]) == []
+
+
+def test_writes_keep_the_rows_in_step(client, party, session_factory):
+    (fighter, rogue), other = party
+    assert [row[2] for row in _rows(session_factory) if row[0] == fighter] == ["longsword", "gp"]
+
+    operation = {"op": "add", "path": "/inventory/-", "value": {"item": "gp", "quantity": 5}}
+    assert client.patch(f"/api/characters/{fighter}", json=[operation], headers=JSON_PATCH).status_code == 200
+    assert client.put(f"/api/characters/{rogue}", json={"inventory": []}).status_code == 200
+    assert [row for row in _rows(session_factory) if row[0] != other] == [
+        (fighter, 0, "longsword", 1), (fighter, 1, "gp", 25), (fighter, 2, "gp", 5)
+    ]
+
+
+def test_rebuild_matches_the_dual_writes(party, engine, session_factory):
+    written = _rows(session_factory)
+    with engine.begin() as connection:
+        rebuild_inventory_items(connection, batch_size=1)
+    assert _rows(session_factory) == written
+
+
+def test_item_holders(client, party):
+    (fighter, rogue), _ = party
+    body = client.get("/api/characters/items/Longsword").json()
+    assert body["item"] == "longsword" and body["quantity"] == 2
+    assert [(h["id"], h["equipped"]) for h in body["holders"]] == [(fighter, True), (rogue, False)]
+    assert [h["name"] for h in client.get("/api/characters/items/Sword of Kas").json()["holders"]] == ["Rogue"]
+    assert client.get("/api/characters/items/chain-mail").json() == {"item": "chain-mail", "holders": [], "quantity": 0}
+
+
+def test_party_items(client, party):
+    (fighter, _), _ = party
+    body = client.get("/api/characters/items").json()
+    assert body["coins_gp"] == 25 + 3
+    assert {item["item"]: item["holders"] for item in body["items"]} == {"gp": 1, "longsword": 2, "sp": 1, "sword-of-kas": 1}
+    only_fighter = client.get("/api/characters/items", params={"ids": [fighter]}).json()
+    assert [item["item"] for item in only_fighter["items"]] == ["gp", "longsword"]
+
+
+def test_json_scan_fallback_gives_the_same_answers(client, party, monkeypatch):
+    paths = ["/api/characters/items", "/api/characters/items/longsword", "/api/characters/items/Sword of Kas"]
+    indexed = [client.get(path).json() for path in paths]
+    monkeypatch.setattr(characters, "INVENTORY_ITEMS_ENABLED", False)
+    monkeypatch.setattr(inventory_items, "INVENTORY_ITEMS_ENABLED", False)
+    assert [client.get(path).json() for path in paths] == indexed
@@ -0,0 +1,177 @@
+import pytest
+from sqlalchemy import select, update
+
+from backend.json_patch import (
+    JsonPatchConflict, JsonPatchError, apply_json_patch, apply_merge_patch, parse_pointer,
+    sqlite_json_patch, sqlite_merge_patch
+)
+from backend.models import Character
+
+
+# ============== RFC 6901 / 6902 ==============
+
+def test_pointer_escapes():
+    assert parse_pointer("") == []
+    assert parse_pointer("/a~1b/m~0n/~01") == ["a/b", "m~n", "~1"]
+    with pytest.raises(JsonPatchError):
+        parse_pointer("a/b")
+
+
+def test_add_replace_remove():
+    doc = {"hp": 10, "items": ["rope"]}
+    patched = apply_json_patch(doc, [
+        {"op": "replace", "path": "/hp", "value": 7},
+        {"op": "add", "path": "/items/-", "value": "torch"},
+        {"op": "add", "path": "/items/0", "value": "map"},
+        {"op": "add", "path": "/notes", "value": {"a": 1}},
+        {"op": "remove", "path": "/notes/a"},
+    ])
+    assert patched == {"hp": 7, "items": ["map", "rope", "torch"], "notes": {}}
+    assert doc == {"hp": 10, "items": ["rope"]}
+
+
+def test_add_replaces_existing_member_and_whole_document():
+    assert apply_json_patch({"a": 1}, [{"op": "add", "path": "/a", "value": 2}]) == {"a": 2}
+    assert apply_json_patch({"a": 1}, [{"op": "replace", "path": "", "value": [1]}]) == [1]
+
+
+def test_move_and_copy():
+    doc = {"a": {"b": 1}, "list": [1, 2, 3]}
+    assert apply_json_patch(doc, [{"op": "move", "from": "/a/b", "path": "/c"}]) == {"a": {}, "c": 1, "list": [1, 2, 3]}
+    assert apply_json_patch(doc, [{"op": "move", "from": "/list/0", "path": "/list/-"}])["list"] == [2, 3, 1]
+    copied = apply_json_patch(doc, [{"op": "copy", "from": "/a", "path": "/d"}])
+    copied["d"]["b"] = 5
+    assert copied["a"] == {"b": 1}
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(doc, [{"op": "move", "from": "/a", "path": "/a/b/c"}])
+
+
+def test_test_operation():
+    doc = {"flag": True, "count": 1, "list": [1, {"x": None}]}
+    apply_json_patch(doc, [{"op": "test", "path": "/list", "value": [1, {"x": None}]}])
+    # true and 1 are different JSON values
+    with pytest.raises(JsonPatchConflict):
+        apply_json_patch(doc, [{"op": "test", "path": "/flag", "value": 1}])
+    with pytest.raises(JsonPatchConflict):
+        apply_json_patch(doc, [{"op": "test", "path": "/count", "value": True}])
+
+
+def test_patch_is_atomic():
+    doc = {"hp": 10}
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(doc, [{"op": "replace", "path": "/hp", "value": 1}, {"op": "remove", "path": "/missing"}])
+    assert doc == {"hp": 10}
+
+
+@pytest.mark.parametrize("operations", [
+    {"op": "add", "path": "/a", "value": 1},
+    [{"op": "add", "path": "/a"}],
+    [{"path": "/a", "value": 1}],
+    [{"op": "frobnicate", "path": "/a"}],
+    [{"op": "move", "path": "/a"}],
+    [{"op": "replace", "path": "/missing", "value": 1}],
+    [{"op": "remove", "path": ""}],
+    [{"op": "add", "path": "/list/5", "value": 1}],
+    [{"op": "add", "path": "/list/01", "value": 1}],
+    [{"op": "remove", "path": "/list/-"}],
+    [{"op": "add", "path": "/hp/x", "value": 1}],
+])
+def test_invalid_patches(operations):
+    with pytest.raises(JsonPatchError):
+        apply_json_patch({"hp": 1, "list": [0]}, operations)
+
+
+# ============== RFC 7396 ==============
+
+@pytest.mark.parametrize("target, patch, result", [
+    # Examples from RFC 7396 appendix A
+    ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+    ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+    ({"a": "b"}, {"a": None}, {}),
+    ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+    ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+    ({"a": "c"}, {"a": ["b"]}, {"a": ["b"]}),
+    ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+    ({"a": [{"b": "c"}]}, {"a": [1]}, {"a": [1]}),
+    (["a", "b"], ["c", "d"], ["c", "d"]),
+    ({"a": "b"}, ["c"], ["c"]),
+    ({"a": "foo"}, None, None),
+    ({"a": "foo"}, "bar", "bar"),
+    ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+    ([1, 2], {"a": "b", "c": None}, {"a": "b"}),
+    ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}}),
+])
+def test_merge_patch(target, patch, result):
+    assert apply_merge_patch(target, patch) == result
+
+
+def test_merge_patch_leaves_input_alone():
+    target = {"a": {"b": 1}}
+    apply_merge_patch(target, {"a": {"b": None}})
+    assert target == {"a": {"b": 1}}
+
+
+# ============== SQLITE PUSHDOWN ==============
+
+COLUMNS = {"hp_current": Character.hp_current, "proficiencies": Character.proficiencies}
+OBJECTS = {("proficiencies",)}
+
+
+def _stored(engine, character_id):
+    with engine.connect() as connection:
+        return dict(connection.execute(
+            select(Character.hp_current, Character.proficiencies).where(Character.id == character_id)
+        ).one()._mapping)
+
+
+def test_pushdown_matches_python(engine, make_character):
+    character_id = make_character()
+    operations = [
+        {"op": "replace", "path": "/hp_current", "value": 3},
+        {"op": "add", "path": "/proficiencies/languages", "value": ["Common", "Elvish"]},
+        {"op": "replace", "path": "/proficiencies/armor", "value": ["light", "shields"]},
+        {"op": "remove", "path": "/proficiencies/tools"},
+    ]
+    expected = apply_json_patch(_stored(engine, character_id), operations)
+    values, guards = sqlite_json_patch(COLUMNS, OBJECTS, operations)
+    with engine.begin() as connection:
+        result = connection.execute(update(Character).where(Character.id == character_id, *guards).values(**values))
+    assert result.rowcount == 1
+    assert _stored(engine, character_id) == expected
+
+
+def test_pushdown_guards_reject_missing_targets(engine, make_character):
+    character_id = make_character()
+    values, guards = sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "remove", "path": "/proficiencies/missing"}])
+    with engine.begin() as connection:
+        result = connection.execute(update(Character).where(Character.id == character_id, *guards).values(**values))
+    assert result.rowcount == 0
+
+
+def test_merge_pushdown_matches_python(engine, make_character):
+    character_id = make_character()
+    patch = {"armor": ["heavy"], "tools": None, "languages": ["Dwarvish"]}
+    expected = apply_merge_patch(_stored(engine, character_id)["proficiencies"], patch)
+    with engine.begin() as connection:
+        connection.execute(update(Character).where(Character.id == character_id).values(
+            proficiencies=sqlite_merge_patch(Character.proficiencies, patch)
+        ))
+    assert _stored(engine, character_id)["proficiencies"] == expected
+
+
+def test_pushdown_only_for_simple_member_patches():
+    assert sqlite_json_patch(COLUMNS, OBJECTS, []) is None
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "move", "from": "/a", "path": "/hp_current"}]) is None
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "test", "path": "/hp_current", "value": 3}]) is None
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "replace", "path": "/name", "value": "x"}]) is None
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "remove", "path": "/hp_current"}]) is None
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [
+        {"op": "replace", "path": "/proficiencies/armor", "value": []},
+        {"op": "remove", "path": "/proficiencies/armor/0"},
+    ]) is None
+
+
+def test_no_pushdown_into_arrays():
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "add", "path": "/proficiencies/armor/-", "value": "x"}]) is None
+    assert sqlite_json_patch(COLUMNS, OBJECTS, [{"op": "replace", "path": "/proficiencies/armor/0", "value": "x"}]) is None
+    assert sqlite_json_patch(COLUMNS, set(), [{"op": "add", "path": "/proficiencies/languages", "value": []}]) is None
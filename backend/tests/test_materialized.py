@@ -0,0 +1,98 @@
+"""Materialized derived stats and dependency-tracked refresh"""
+
+import random
+from types import SimpleNamespace
+
+from sqlalchemy import select, update
+
+from backend.game_data import ABILITIES, ABILITY_INDEX, SKILL_ABILITY_INDEX, SKILL_NAMES
+from backend.materialized import DERIVED_VERSION, NODES, materialize, refresh
+from backend.models import Character
+from backend.tests.conftest import CHARACTER_DEFAULTS
+
+DEXTERITY = ABILITY_INDEX["dexterity"]
+
+
+def character(**columns):
+    values = {key: CHARACTER_DEFAULTS[key] for key in ("stats", "proficiencies", "level")}
+    values.update(armor_class=None, inventory=None)
+    values.update(columns)
+    return SimpleNamespace(**values)
+
+
+def stored(row):
+    return materialize(row.stats, row.proficiencies, row.level, row.armor_class, row.inventory)
+
+
+def test_dexterity_change_touches_only_dexterity_nodes():
+    before = character()
+    after = character(stats=dict(before.stats, dexterity=18))
+    derived, recomputed = refresh(stored(before), after, ["stats"])
+
+    dex_skills = {("skills", i) for i, ability in enumerate(SKILL_ABILITY_INDEX) if ability == DEXTERITY}
+    assert {SKILL_NAMES[i] for _, i in dex_skills} == {"Acrobatics", "Sleight of Hand", "Stealth"}
+    # Every modifier is rechecked (the column changed), only Dexterity's flows on
+    modifiers = {("modifiers", i) for i in range(len(ABILITIES))}
+    assert set(recomputed) == modifiers | {("armor_class",), ("saves", DEXTERITY), ("attacks", DEXTERITY)} | dex_skills
+    assert derived == stored(after)
+
+
+def test_same_modifier_stops_at_the_modifier():
+    before = character()
+    derived = stored(before)
+    result, recomputed = refresh(derived, character(stats=dict(before.stats, dexterity=15)), ["stats"])
+    assert result is derived
+    assert ("armor_class",) not in recomputed and ("saves", DEXTERITY) not in recomputed
+
+
+def test_untracked_columns_recompute_nothing():
+    derived = stored(character())
+    assert refresh(derived, character(), ["name", "hp_current"]) == (derived, ())
+
+
+def test_stale_versions_are_rematerialized():
+    row = character(level=7)
+    derived, recomputed = refresh(dict(stored(row), v=DERIVED_VERSION - 1), row, ["name"])
+    assert recomputed == NODES and derived == stored(row)
+
+
+def test_refresh_matches_materialize():
+    rng = random.Random(18)
+    row = character()
+    derived = stored(row)
+    for _ in range(300):
+        column = rng.choice(["stats", "level", "proficiencies", "armor_class", "inventory"])
+        if column == "stats":
+            row.stats = dict(row.stats, **{rng.choice(ABILITIES): rng.randint(1, 30)})
+        elif column == "level":
+            row.level = rng.randint(1, 20)
+        elif column == "proficiencies":
+            row.proficiencies = dict(row.proficiencies, skills=rng.sample(SKILL_NAMES, 3), saves=rng.sample(ABILITIES, 2))
+        elif column == "armor_class":
+            row.armor_class = rng.choice([None, 10, 13])
+        else:
+            row.inventory = rng.choice([None, [], [{"item": "chain-mail", "equipped": True}], [{"item": "shield", "equipped": True}]])
+        derived, _ = refresh(derived, row, [column])
+        assert derived == stored(row)
+
+
+def test_reads_are_served_from_the_stored_value(client, make_character, session_factory):
+    character_id = make_character()
+    url = f"/api/characters/{character_id}"
+    with session_factory() as db:
+        derived = db.execute(select(Character.derived).where(Character.id == character_id)).scalar()
+        assert derived == materialize(CHARACTER_DEFAULTS["stats"], CHARACTER_DEFAULTS["proficiencies"], 1, None)
+        # A marker value shows the endpoints read the column instead of recomputing
+        db.execute(update(Character).where(Character.id == character_id).values(derived=dict(derived, proficiency_bonus=9)))
+        db.commit()
+    assert client.get(url).json()["proficiency_bonus"] == 9
+
+
+def test_writes_keep_the_stored_value_current(client, make_character, session_factory):
+    character_id = make_character()
+    url = f"/api/characters/{character_id}"
+    client.put(url, json={"stats": dict(CHARACTER_DEFAULTS["stats"], dexterity=20), "level": 9})
+    with session_factory() as db:
+        row = db.get(Character, character_id)
+        assert row.derived == stored(row)
+    assert client.get(url).json()["armor_class"] == 15
@@ -0,0 +1,95 @@
+"""Schema migrations on a database created before them, and the index audit"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from backend.explain_queries import FULL_SCAN
+from backend.materialized import DERIVED_VERSION, backfill_derived
+from backend.migrations import MIGRATIONS, run_migrations
+from backend.spells import SPELL_IDS_BY_NAME
+from backend.srd_index import BASE_DIR
+
+# characters and users as they were before the first migration
+LEGACY_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, google_id VARCHAR, email VARCHAR, name VARCHAR, created_at DATETIME)",
+    "CREATE TABLE characters (id INTEGER PRIMARY KEY, user_id INTEGER, name VARCHAR, level INTEGER, "
+    "species VARCHAR, class_name VARCHAR, subclass VARCHAR, background VARCHAR, alignment VARCHAR, stats JSON, "
+    "hp_current INTEGER, hp_max INTEGER, temp_hp INTEGER, hit_dice_current INTEGER, hit_dice_max INTEGER, "
+    "xp INTEGER, renown JSON, piety JSON, bastion JSON, inventory JSON, spells JSON, proficiencies JSON, "
+    "armor_class INTEGER, speed INTEGER, created_at DATETIME, updated_at DATETIME)",
+]
+STATS = {"strength": 10, "dexterity": 14, "constitution": 12, "intelligence": 10, "wisdom": 10, "charisma": 10}
+
+
+@pytest.fixture
+def legacy(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO users (id, email) VALUES (1, 'player@example.com')"))
+        connection.execute(text(
+            "INSERT INTO characters (id, user_id, name, level, stats, proficiencies, inventory, spells, armor_class, created_at) "
+            "VALUES (:id, 1, 'Hero', 1, :stats, :proficiencies, '[]', :spells, 10, '2024-01-01 00:00:00')"
+        ), [
+            {"id": 1, "stats": json.dumps(STATS), "proficiencies": "{}",
+             "spells": json.dumps({"known": ["Fireball", "fireball", "Acid  Splash", "Homebrew Bolt"], "prepared": [], "slots": {}})},
+            {"id": 2, "stats": json.dumps({"dexterity": "abc"}), "proficiencies": "{}", "spells": json.dumps({"known": "Fireball"})},
+        ])
+    yield engine
+    engine.dispose()
+
+
+def _row(engine, character_id: int):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT * FROM characters WHERE id = :id"), {"id": character_id}).one()
+
+
+def test_migrations_upgrade_a_legacy_database(legacy):
+    assert run_migrations(legacy) == [name for name, _ in MIGRATIONS]
+    assert run_migrations(legacy) == []
+
+    schema = inspect(legacy)
+    indexes = {index["name"] for index in schema.get_indexes("characters")}
+    assert {"ix_characters_user_id_id", "ix_characters_user_id_updated_at"} <= indexes
+    assert {"ix_inventory_items_character_id", "ix_inventory_items_item_key"} <= {i["name"] for i in schema.get_indexes("inventory_items")}
+
+    row = _row(legacy, 1)
+    assert (row.version, row.updated_at, row.derived) == (2, "2024-01-01 00:00:00", None)
+    # Names become catalogue ids (deduplicated); unknown names are kept
+    assert json.loads(row.spells)["known"] == [SPELL_IDS_BY_NAME["fireball"], SPELL_IDS_BY_NAME["acid splash"], "Homebrew Bolt"]
+    # A spells document the migration can't read is left alone
+    assert (_row(legacy, 2).version, json.loads(_row(legacy, 2).spells)) == (1, {"known": "Fireball"})
+
+
+def test_backfill_fills_stale_derived_stats(legacy):
+    run_migrations(legacy)
+    with legacy.begin() as connection:
+        assert backfill_derived(connection) == 2
+        connection.execute(text("UPDATE characters SET derived = json_set(derived, '$.v', 1) WHERE id = 1"))
+        assert backfill_derived(connection) == 2  # Row 2's stats can't be computed: still NULL, retried
+    derived = json.loads(_row(legacy, 1).derived)
+    assert derived["v"] == DERIVED_VERSION and derived["modifiers"][1] == 2
+    assert json.loads(_row(legacy, 2).derived) is None
+
+
+def test_migrations_do_not_import_application_code(tmp_path):
+    code = "import sys, backend.migrations; print(sorted(m for m in sys.modules if m.startswith('backend.')))"
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True).stdout
+    assert eval(loaded) == ["backend.database", "backend.migrations"]
+
+
+@pytest.mark.parametrize("detail, scan", [
+    ("SCAN characters", True),
+    ("SCAN characters USING INDEX ix_characters_user_id_updated_at", False),
+    ("SCAN characters USING COVERING INDEX ix_characters_user_id_id", False),
+    ("SEARCH characters USING INDEX ix_characters_user_id_id (user_id=? AND id>?)", False),
+])
+def test_full_scan_detection(detail, scan):
+    assert bool(FULL_SCAN.search(detail)) == scan
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from backend.auth import get_current_user
+from backend.dice import DiceError, compile_expression, critical
+from backend.main import app
+from backend.odds import (
+    D20, MAX_KEEP_WORK, attack_odds, check_chance, describe, distribution_for, expression_distribution, keep_work
+)
+
+
+@pytest.mark.parametrize("text", ["1d20", "2d6+3", "4d6kh3", "1d20adv", "1d20dis", "3d8 fire - 1d4", "8d6kl2", "5"])
+def test_pmf_sums_to_one(text):
+    distribution = distribution_for(text)
+    assert distribution.pmf.sum() == pytest.approx(1.0)
+    assert (distribution.pmf >= 0).all()
+    assert distribution.at_least[0] == pytest.approx(1.0)
+
+
+def test_support_and_mean():
+    distribution = distribution_for("2d6+3")
+    summary = describe(distribution, include_pmf=True)
+    assert (summary["min"], summary["max"], summary["mean"]) == (5, 15, 10.0)
+    assert summary["pmf"]["10"] == pytest.approx(6 / 36, abs=1e-6)
+
+
+def test_keep_highest_matches_enumeration():
+    faces = np.arange(1, 7)
+    rolls = np.array(np.meshgrid(faces, faces, faces, faces)).reshape(4, -1).T
+    kept = np.sort(rolls, axis=1)[:, 1:].sum(axis=1)
+    distribution = distribution_for("4d6kh3")
+    for total in range(3, 19):
+        assert distribution.pmf[total - distribution.offset] == pytest.approx(np.mean(kept == total))
+
+
+def test_advantage_and_disadvantage():
+    assert D20["adv"].chance_at_least(20) == pytest.approx(1 - (19 / 20) ** 2)
+    assert D20["dis"].chance_at_least(20) == pytest.approx(1 / 400)
+    assert D20[None].mean == pytest.approx(10.5)
+
+
+def test_check_chance():
+    assert check_chance(5, 15) == pytest.approx(0.55)
+    # Checks have no automatic success or failure
+    assert check_chance(0, 25) == 0.0
+    assert check_chance(10, 5) == 1.0
+
+
+def test_natural_one_misses_and_twenty_hits():
+    assert attack_odds(30, 10).hit_chance == pytest.approx(0.95)
+    assert attack_odds(-10, 30).hit_chance == pytest.approx(0.05)
+    odds = attack_odds(5, 15, crit_on=19)
+    assert (odds.hit_chance, odds.crit_chance) == (pytest.approx(0.55), pytest.approx(0.10))
+
+
+def test_expected_damage_mixes_hit_and_crit():
+    odds = attack_odds(5, 15, damage="1d8", damage_bonus=3)
+    # 0.50 plain hits at 7.5, 0.05 crits at 12 (2d8+3)
+    assert odds.expected_damage == pytest.approx(0.50 * 7.5 + 0.05 * 12)
+    assert odds.damage.pmf.sum() == pytest.approx(1.0)
+    assert odds.damage.pmf[0] == pytest.approx(0.45)
+
+
+def test_crit_damage_of_keep_terms():
+    normal = expression_distribution(compile_expression("4d6kh3+2"))
+    crit = expression_distribution(critical(compile_expression("4d6kh3+2")))
+    assert crit.mean - 2 == pytest.approx(2 * (normal.mean - 2))
+    assert (crit.offset, crit.offset + len(crit.pmf) - 1) == (8, 38)
+
+
+def test_attacks_per_round_add_up():
+    one = attack_odds(7, 16, damage="2d6", damage_bonus=4)
+    three = attack_odds(7, 16, damage="2d6", damage_bonus=4, attacks=3)
+    assert three.expected_damage == pytest.approx(3 * one.expected_damage)
+    assert three.damage.pmf.sum() == pytest.approx(1.0)
+
+
+def test_negative_damage_floors_at_zero():
+    odds = attack_odds(20, 10, damage="1d4", damage_bonus=-3)
+    assert odds.damage.offset == 0
+    assert odds.damage.pmf.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("kwargs", [{"attacks": 0}, {"attacks": 21}, {"crit_on": 1}, {"crit_on": 21}])
+def test_attack_limits(kwargs):
+    with pytest.raises(DiceError):
+        attack_odds(5, 15, **kwargs)
+
+
+def test_support_limit():
+    with pytest.raises(DiceError):
+        distribution_for("1000d1000")
+
+
+def test_keep_work_budget():
+    assert keep_work(4, 6, 3) < MAX_KEEP_WORK
+    distribution_for("20d100kh19")
+    # The budget is per expression, not per term
+    for text in ("20d1000kh19", "5d1000kh4", "+".join(["10d100kh5"] * 16)):
+        with pytest.raises(DiceError):
+            distribution_for(text)
+
+
+def test_crit_keep_terms_count_twice_against_the_budget():
+    with pytest.raises(DiceError):
+        attack_odds(5, 15, damage="20d100kh19+20d100kh19")
+
+
+# ============== API ==============
+
+def test_odds_endpoint(client, user_id):
+    response = client.get("/api/dice/odds", params={"expression": "2d6+3", "target": 10, "distribution": True})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["min"], body["max"], body["mean"]) == (5, 15, 10.0)
+    assert body["chance_at_least"] == pytest.approx(21 / 36, abs=1e-6)
+    assert sum(body["pmf"].values()) == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.parametrize("expression", ["20d1000kh19", "2d", "1000d1000"])
+def test_odds_endpoint_rejects_costly_or_bad_expressions(client, user_id, expression):
+    assert client.get("/api/dice/odds", params={"expression": expression}).status_code == 400
+
+
+def test_odds_endpoint_requires_a_session(client):
+    app.dependency_overrides[get_current_user] = lambda: None
+    assert client.get("/api/dice/odds", params={"expression": "1d20"}).status_code == 401
@@ -0,0 +1,44 @@
+"""GET /api/characters/party: keyset pagination and column projection"""
+
+import pytest
+
+from backend.routers.characters import DEFAULT_LIST_FIELDS
+from backend.tests.conftest import OTHER_USER
+
+
+def test_default_fields_newest_first(client, character_ids, make_character):
+    make_character(owner=OTHER_USER)
+    body = client.get("/api/characters/party").json()
+    assert [c["id"] for c in body["characters"]] == sorted(character_ids, reverse=True)
+    assert all(tuple(c) == DEFAULT_LIST_FIELDS for c in body["characters"])
+    assert body["next_cursor"] is None
+
+
+def test_projection_always_includes_id(client, character_ids):
+    body = client.get("/api/characters/party", params={"fields": "name, level"}).json()
+    assert body["characters"][0] == {"id": character_ids[-1], "name": "Hero 2", "level": 3}
+
+
+def test_pages_cover_every_character_once(client, make_character):
+    ids = [make_character(name=f"Hero {i}") for i in range(7)]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/characters/party", params=params).json()
+        seen += [c["id"] for c in body["characters"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+
+@pytest.mark.parametrize("field", ["user_id", "version", "derived", "spells", "nope"])
+def test_internal_and_unknown_fields_are_rejected(client, character_ids, field):
+    response = client.get("/api/characters/party", params={"fields": f"name,{field}"})
+    assert response.status_code == 400
+    assert field in response.json()["detail"]
+
+
+def test_bad_cursor_and_limit(client, character_ids):
+    assert client.get("/api/characters/party", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/characters/party", params={"limit": 0}).status_code == 422
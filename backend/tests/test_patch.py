@@ -0,0 +1,113 @@
+"""PATCH /api/characters/{id} with JSON Patch and merge patch"""
+
+import pytest
+from sqlalchemy import event
+
+from backend.materialized import materialize
+
+JSON_PATCH = {"Content-Type": "application/json-patch+json"}
+MERGE_PATCH = {"Content-Type": "application/merge-patch+json"}
+
+
+@pytest.fixture
+def url(make_character):
+    return f"/api/characters/{make_character()}"
+
+
+def test_merge_patch_updates_scores_and_derived(client, url):
+    response = client.patch(url, json={"stats": {"dexterity": 18}}, headers=MERGE_PATCH)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stats"]["dexterity"] == 18 and body["stats"]["strength"] == 16
+    assert body["modifiers"]["dexterity"] == 4
+    assert body["armor_class"] == 14
+    assert client.get(url).json() == body
+
+
+@pytest.mark.parametrize("stats", [
+    {"dexterity": "abc"}, {"dexterity": 0}, {"dexterity": 31}, {"dexterity": 12.5},
+    {"dexterity": True}, {"dexterity": {"score": 12}}, "abc",
+])
+def test_merge_patch_rejects_bad_scores_before_writing(client, url, stats):
+    before = client.get(url).json()
+    assert client.patch(url, json={"stats": stats}, headers=MERGE_PATCH).status_code == 422
+    assert client.get(url).json() == before
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "replace", "path": "/stats/dexterity", "value": "abc"},
+    {"op": "add", "path": "/stats/luck", "value": 40},
+    {"op": "replace", "path": "/stats", "value": {"dexterity": None}},
+])
+def test_json_patch_rejects_bad_scores_before_writing(client, url, operation):
+    before = client.get(url).json()
+    assert client.patch(url, json=[operation], headers=JSON_PATCH).status_code == 422
+    assert client.get(url).json() == before
+
+
+def test_json_patch_updates_scores(client, url):
+    response = client.patch(url, json=[{"op": "replace", "path": "/stats/strength", "value": 20}], headers=JSON_PATCH)
+    assert response.status_code == 200
+    assert response.json()["modifiers"]["strength"] == 5
+
+
+def test_put_and_create_validate_scores(client, url):
+    assert client.put(url, json={"stats": {"wisdom": "high"}}).status_code == 422
+    character = {"name": "Bad", "species": "Human", "class_name": "Fighter", "background": "Soldier", "stats": {"strength": 99}}
+    assert client.post("/api/characters/", json=character).status_code == 422
+
+
+def test_merge_patch_on_other_columns_is_pushed_down(client, url):
+    response = client.patch(url, json={"renown": {"Harpers": 2}, "hp_current": 5}, headers=MERGE_PATCH)
+    assert response.status_code == 200
+    assert (response.json()["renown"], response.json()["hp_current"]) == ({"Harpers": 2}, 5)
+
+
+@pytest.fixture
+def updates(engine):
+    """UPDATE statements run against `engine`, collected as they happen"""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+def test_json_patch_on_spell_slots_is_pushed_down(client, url, updates):
+    response = client.patch(url, json=[
+        {"op": "replace", "path": "/hp_current", "value": 6},
+        {"op": "add", "path": "/spells/slots/1", "value": 3},
+    ], headers=JSON_PATCH)
+    assert response.status_code == 200
+    assert response.json()["spells"]["slots"] == {"1": 3}
+    assert len(updates) == 1 and "json_set" in updates[0]
+
+
+def test_json_patch_on_arrays_goes_straight_to_python(client, url, updates):
+    response = client.patch(url, json=[{"op": "add", "path": "/inventory/-", "value": {"item": "rope"}}], headers=JSON_PATCH)
+    assert response.status_code == 200
+    assert response.json()["inventory"][-1]["item"] == "rope"
+    assert not any("json_" in statement for statement in updates)
+
+
+def test_json_patch_on_spell_lists_is_validated(client, url, updates):
+    operation = {"op": "add", "path": "/spells/known/-", "value": "Not A Spell"}
+    assert client.patch(url, json=[operation], headers=JSON_PATCH).status_code == 422
+    assert updates == []
+    operation = {"op": "add", "path": "/spells/slots/1", "value": {"used": 1}}
+    assert client.patch(url, json=[operation], headers=JSON_PATCH).status_code == 200
+    assert not any("json_" in statement for statement in updates)
+
+
+def test_unknown_fields_and_media_types(client, url):
+    assert client.patch(url, json={"derived": {}}, headers=MERGE_PATCH).status_code == 422
+    assert client.patch(url, json={"hp_current": 1}, headers={"Content-Type": "text/plain"}).status_code in (415, 422)
+
+
+def test_materialize_raises_on_bad_scores():
+    with pytest.raises(TypeError):
+        materialize({"dexterity": "abc"}, {}, 1, 10)
@@ -0,0 +1,150 @@
+"""scripts/piety.py async mode: rate limiter, retries and concurrency, against a stub client"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.srd_index import BASE_DIR
+
+sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))
+import piety  # noqa: E402
+
+
+class StubError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"{status_code} (stub)")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={} if retry_after is None else {"retry-after": str(retry_after)})
+
+
+class StubAsyncClient:
+    """messages.create answering after `latency`, raising the queued errors first"""
+
+    def __init__(self, latency=0.0, errors=()):
+        self.messages = self
+        self.latency = latency
+        self.errors = list(errors)
+        self.calls = self.in_flight = self.max_in_flight = 0
+
+    async def create(self, model, max_tokens, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.errors:
+                raise self.errors.pop(0)
+            return SimpleNamespace(
+                content=[SimpleNamespace(text=f"piety for {messages[0]['content']}")],
+                usage=SimpleNamespace(input_tokens=10, output_tokens=20)
+            )
+        finally:
+            self.in_flight -= 1
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_limiter_holds_requests_past_the_rpm():
+    fake = FakeTime()
+    limiter = piety.RateLimiter(2, 10_000, clock=fake.clock, sleep=fake.sleep)
+
+    async def acquire_three():
+        for _ in range(3):
+            await limiter.acquire(1)
+
+    asyncio.run(acquire_three())
+    assert fake.now >= 60 and fake.slept
+
+
+def test_limiter_counts_settled_tokens():
+    fake = FakeTime()
+    limiter = piety.RateLimiter(100, 1000, clock=fake.clock, sleep=fake.sleep)
+
+    async def run():
+        entry = await limiter.acquire(900)
+        limiter.settle(entry, 100)      # Used far less than estimated
+        await limiter.acquire(800)
+        assert fake.now == 0
+        await limiter.acquire(5000)     # Over the whole budget: waits for an empty window
+        assert fake.now >= 60
+
+    asyncio.run(run())
+
+
+def test_limiter_pause():
+    fake = FakeTime()
+    limiter = piety.RateLimiter(100, 10_000, clock=fake.clock, sleep=fake.sleep)
+    limiter.pause(7)
+    asyncio.run(limiter.acquire(1))
+    assert fake.now == 7
+
+
+def test_retry_helpers():
+    assert piety.retry_after(StubError(429, retry_after=3)) == 3.0
+    assert piety.retry_after(StubError(429)) is None and piety.retry_after(ValueError()) is None
+    assert [piety.is_retryable(StubError(status)) for status in (400, 401, 408, 429, 500, 529)] == [
+        False, False, True, True, True, True
+    ]
+    assert piety.is_retryable(TimeoutError())
+    for attempt in range(8):
+        assert 0 <= piety.backoff_delay(attempt) <= min(piety.BACKOFF_MAX, piety.BACKOFF_BASE * 2 ** attempt)
+    assert 3 <= piety.backoff_delay(0, 3.0) <= 3 + piety.BACKOFF_BASE
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(piety, "BACKOFF_BASE", 0.001)
+
+
+def _generate(client, jobs, **limits):
+    done = []
+    results = asyncio.run(piety.generate_all_async(client, jobs, lambda name, text: done.append(name), **limits))
+    return results, done
+
+
+def test_concurrency_is_bounded_and_every_god_is_generated():
+    client = StubAsyncClient(latency=0.01)
+    jobs = [(f"God {i}", f"prompt {i}") for i in range(12)]
+    results, done = _generate(client, jobs, concurrency=4)
+    assert results == {name: f"piety for {prompt}" for name, prompt in jobs}
+    assert sorted(done) == sorted(results) and client.max_in_flight == 4
+
+
+def test_concurrent_runs_are_faster_than_sequential():
+    latency, gods = 0.05, 8
+    start = time.perf_counter()
+    _generate(StubAsyncClient(latency), [(f"God {i}", "p") for i in range(gods)], concurrency=gods)
+    assert time.perf_counter() - start < gods * latency / 2
+
+
+def test_retries_honour_retry_after(fast_backoff):
+    client = StubAsyncClient(errors=[StubError(429, retry_after=0.05), StubError(503)])
+    start = time.perf_counter()
+    results, _ = _generate(client, [("Mystra", "p")])
+    assert results == {"Mystra": "piety for p"} and client.calls == 3
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_failures_become_error_text(fast_backoff):
+    client = StubAsyncClient(errors=[StubError(400)])
+    results, _ = _generate(client, [("Bane", "p")])
+    assert client.calls == 1 and results["Bane"].startswith("[ERROR: Failed to generate piety for Bane after 1 attempts")
+
+    client = StubAsyncClient(errors=[StubError(529)] * piety.MAX_RETRIES)
+    results, _ = _generate(client, [("Bane", "p")])
+    assert client.calls == piety.MAX_RETRIES and results["Bane"].startswith("[ERROR")
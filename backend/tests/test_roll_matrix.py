@@ -0,0 +1,56 @@
+"""POST /api/characters/rolls: one query for a characters x rolls matrix"""
+
+import pytest
+from sqlalchemy import event
+
+from backend.routers.characters import ROLL_MATRIX_MAX_CHARACTERS, ROLL_MATRIX_MAX_ROLLS
+from backend.tests.conftest import OTHER_USER
+
+ROLLS = [
+    {"type": "skill", "name": "Perception"},
+    {"type": "save", "name": "dexterity"},
+    {"type": "attack", "name": "finesse"},
+]
+
+
+def test_matrix_matches_single_rolls(client, character_ids):
+    body = client.post("/api/characters/rolls", json={"character_ids": character_ids, "rolls": ROLLS}).json()
+    assert body["rolls"] == ROLLS
+    for character_id, result in zip(character_ids, body["results"]):
+        url = f"/api/characters/{character_id}/roll"
+        assert result["character_id"] == character_id
+        assert result["rolls"][0] == client.get(f"{url}/skill/Perception").json()
+        assert result["rolls"][1] == client.get(f"{url}/save/dexterity").json()
+        assert result["rolls"][2] == client.get(f"{url}/attack", params={"weapon_type": "finesse", "use_dex": True}).json()
+
+
+def test_other_users_characters_look_missing(client, character_ids, make_character):
+    other = make_character(owner=OTHER_USER)
+    body = client.post("/api/characters/rolls", json={"character_ids": [other, character_ids[0], 9999], "rolls": ROLLS}).json()
+    assert [r.get("error") for r in body["results"]] == ["Character not found", None, "Character not found"]
+
+
+def test_characters_are_loaded_with_one_query(client, engine, character_ids):
+    client.get("/api/characters/party")  # Resolve the user id outside the count
+    selects = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    client.post("/api/characters/rolls", json={"character_ids": character_ids, "rolls": ROLLS})
+    event.remove(engine, "before_cursor_execute", _capture)
+    assert sum("FROM characters" in statement for statement in selects) == 1
+
+
+@pytest.mark.parametrize("body", [
+    {"character_ids": list(range(ROLL_MATRIX_MAX_CHARACTERS + 1)), "rolls": ROLLS},
+    {"character_ids": [1], "rolls": ROLLS * (ROLL_MATRIX_MAX_ROLLS // len(ROLLS) + 1)},
+])
+def test_matrix_size_is_bounded(client, user_id, body):
+    assert client.post("/api/characters/rolls", json=body).status_code == 422
+
+
+@pytest.mark.parametrize("spec", [{"type": "skill", "name": "Juggling"}, {"type": "save", "name": "luck"}, {"type": "spell", "name": "x"}])
+def test_unknown_roll_specs_are_400(client, character_ids, spec):
+    assert client.post("/api/characters/rolls", json={"character_ids": character_ids, "rolls": [spec]}).status_code == 400
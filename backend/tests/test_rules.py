@@ -0,0 +1,81 @@
+"""Compiled rules tables and the shared roll kernel, against the original formulas"""
+
+import random
+
+import pytest
+
+from backend import game_data
+from backend.game_data import (
+    ABILITIES, ABILITY_INDEX, MODIFIER_TABLE, PROFICIENCY_BONUS_TABLE, SAVE_BITS, SKILL_ABILITIES,
+    SKILL_ABILITY_INDEX, SKILL_BITS, SKILL_INDEX, SKILL_NAMES, attack_roll, calc_modifier,
+    compile_character, get_proficiency_bonus, proficiency_mask, save_roll, skill_roll
+)
+from backend.routers import characters
+
+
+def baseline_modifier(score):
+    return (score - 10) // 2
+
+
+def baseline_proficiency_bonus(level):
+    return 2 if level < 1 else ((level - 1) // 4) + 2
+
+
+def baseline_roll(stats, proficient_names, name, ability, level):
+    """One skill or save line the way the endpoints computed it before the tables"""
+    modifier = baseline_modifier(stats.get(ability, 10))
+    proficient = name in proficient_names
+    bonus = baseline_proficiency_bonus(level) if proficient else 0
+    return (modifier, proficient, bonus, modifier + bonus)
+
+
+def test_tables_match_the_formulas():
+    assert MODIFIER_TABLE == tuple(baseline_modifier(score) for score in range(31))
+    assert PROFICIENCY_BONUS_TABLE == tuple(baseline_proficiency_bonus(level) for level in range(21))
+    for score in (-3, 0, 1, 10, 29, 30, 31, 45):
+        assert calc_modifier(score) == baseline_modifier(score)
+    for level in (-1, 0, 1, 4, 5, 20, 21, 40):
+        assert get_proficiency_bonus(level) == baseline_proficiency_bonus(level)
+
+
+def test_index_structures():
+    assert SKILL_NAMES == tuple(SKILL_ABILITIES)
+    assert [ABILITIES[i] for i in SKILL_ABILITY_INDEX] == list(SKILL_ABILITIES.values())
+    assert all(SKILL_NAMES[SKILL_INDEX[name]] == name for name in SKILL_NAMES)
+    assert all(ABILITIES[ABILITY_INDEX[ability]] == ability for ability in ABILITIES)
+    assert proficiency_mask(["Stealth", "Stealth", "Juggling"], SKILL_BITS) == SKILL_BITS["Stealth"]
+    assert proficiency_mask(None, SAVE_BITS) == 0
+    with pytest.raises(TypeError):
+        SKILL_INDEX["Juggling"] = 99
+
+
+def test_kernel_matches_the_original_per_line_math():
+    rng = random.Random(11)
+    for _ in range(200):
+        stats = {ability: rng.randint(1, 30) for ability in ABILITIES if rng.random() < 0.9}
+        skills = rng.sample(SKILL_NAMES, rng.randint(0, 6))
+        saves = rng.sample(ABILITIES, rng.randint(0, 3))
+        level = rng.randint(0, 20)
+        compiled = compile_character(stats, {"skills": skills, "saves": saves}, level)
+
+        for i, name in enumerate(SKILL_NAMES):
+            assert skill_roll(compiled, i) == baseline_roll(stats, skills, name, SKILL_ABILITIES[name], level)
+        for i, ability in enumerate(ABILITIES):
+            assert save_roll(compiled, i) == baseline_roll(stats, saves, ability, ability, level)
+            modifier, bonus = baseline_modifier(stats.get(ability, 10)), baseline_proficiency_bonus(level)
+            assert attack_roll(compiled, i) == (modifier, True, bonus, modifier + bonus)
+
+
+def test_router_uses_the_shared_kernel():
+    assert characters.calc_modifier is game_data.calc_modifier
+
+
+def test_roll_endpoints(client, make_character):
+    url = f"/api/characters/{make_character(level=9)}"
+    assert client.get(f"{url}/roll/skill/Perception").json()["total_modifier"] == 1 + 4
+    assert client.get(f"{url}/roll/save/DEXTERITY").json()["total_modifier"] == 2
+    assert client.get(f"{url}/roll/attack", params={"weapon_type": "ranged"}).json()["to_hit"] == 2 + 4
+    skills = {line["name"]: line for line in client.get(f"{url}/skills").json()["skills"]}
+    assert (skills["Athletics"]["modifier"], skills["Athletics"]["proficient"]) == (7, True)
+    assert client.get(f"{url}/roll/skill/Juggling").status_code == 400
+    assert client.get(f"{url}/roll/save/luck").status_code == 400
@@ -0,0 +1,64 @@
+"""GET /api/characters/{id}/sheet: the whole sheet in one request"""
+
+import pytest
+from sqlalchemy import event
+
+from backend.game_data import ABILITIES, SKILL_NAMES
+from backend.tests.conftest import OTHER_USER
+
+
+@pytest.fixture
+def selects(engine):
+    """Statements loading a full character row (the ETag probe only reads the version)"""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "characters.name" in statement and "FROM characters" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+def test_sheet_matches_the_per_roll_endpoints(client, make_character):
+    url = f"/api/characters/{make_character(level=5)}"
+    sheet = client.get(f"{url}/sheet").json()
+
+    assert [line["skill"] for line in sheet["skills"]] == list(SKILL_NAMES)
+    assert [line["ability"] for line in sheet["saves"]] == ABILITIES
+    for line in sheet["skills"]:
+        assert client.get(f"{url}/roll/skill/{line['skill']}").json() == line
+    for line in sheet["saves"]:
+        assert client.get(f"{url}/roll/save/{line['ability']}").json() == line
+    assert sheet["attacks"] == {
+        "melee": client.get(f"{url}/roll/attack").json(),
+        "ranged": client.get(f"{url}/roll/attack", params={"weapon_type": "ranged"}).json(),
+        "finesse": client.get(f"{url}/roll/attack", params={"weapon_type": "finesse", "use_dex": True}).json(),
+    }
+    detail = client.get(url).json()
+    assert {key: sheet[key] for key in detail} == detail
+
+
+def test_sheet_values(client, make_character):
+    sheet = client.get(f"/api/characters/{make_character(level=5)}/sheet").json()
+    skills = {line["skill"]: line for line in sheet["skills"]}
+    saves = {line["ability"]: line for line in sheet["saves"]}
+    assert (skills["Athletics"]["total_modifier"], skills["Athletics"]["proficient"]) == (6, True)
+    assert (skills["Stealth"]["total_modifier"], skills["Stealth"]["proficient"]) == (2, False)
+    assert (saves["constitution"]["total_modifier"], saves["charisma"]["total_modifier"]) == (5, -1)
+    assert sheet["attacks"]["melee"]["to_hit"] == 6
+
+
+def test_sheet_loads_the_character_once(client, make_character, selects):
+    url = f"/api/characters/{make_character()}/sheet"
+    selects.clear()
+    assert client.get(url).status_code == 200
+    assert len(selects) == 1
+
+
+def test_sheet_revalidates_and_hides_other_users(client, make_character):
+    url = f"/api/characters/{make_character()}/sheet"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/api/characters/{make_character(owner=OTHER_USER)}/sheet").status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+
+from backend.spells import (
+    SPELL_IDS_BY_NAME, SPELLS, SpellError, compact_spells, expand_spells, filter_mask, max_spell_level,
+    preparable_mask, spell_id, spell_ids
+)
+
+FIREBALL = SPELL_IDS_BY_NAME["fireball"]
+MAGIC_MISSILE = SPELL_IDS_BY_NAME["magic missile"]
+
+
+def test_spell_id_by_id_or_name():
+    assert spell_id(FIREBALL) == FIREBALL
+    assert spell_id("  FireBall ") == FIREBALL
+    assert spell_id("magic   missile") == MAGIC_MISSILE
+    for reference in ("Fireballz", max(SPELLS) + 1, True, None, 1.0):
+        with pytest.raises(SpellError):
+            spell_id(reference)
+
+
+def test_compact_spells_dedupes_in_order():
+    spells = {"known": ["Fireball", MAGIC_MISSILE, "fireball"], "prepared": [], "slots": {"1": 2}}
+    assert compact_spells(spells) == {"known": [FIREBALL, MAGIC_MISSILE], "prepared": [], "slots": {"1": 2}}
+    assert spells["known"] == ["Fireball", MAGIC_MISSILE, "fireball"]
+
+
+def test_compact_spells_leaves_missing_lists_out():
+    assert compact_spells({"slots": {}}) == {"slots": {}}
+
+
+def test_compact_spells_strict():
+    with pytest.raises(SpellError):
+        compact_spells({"known": ["Fireball", "Homebrew Bolt"]})
+
+
+def test_compact_spells_lenient_keeps_unknown():
+    assert compact_spells({"known": ["Homebrew Bolt", "fireball", 99999]}, strict=False) == {
+        "known": ["Homebrew Bolt", FIREBALL, 99999]
+    }
+    with pytest.raises(SpellError):
+        compact_spells({"known": [{"name": "Fireball"}]}, strict=False)
+
+
+@pytest.mark.parametrize("spells", [["Fireball"], {"known": "Fireball"}, {"prepared": {"a": 1}}])
+def test_compact_spells_rejects_bad_shapes(spells):
+    with pytest.raises(SpellError):
+        compact_spells(spells)
+
+
+def test_expand_spells_round_trip():
+    expanded = expand_spells(compact_spells({"known": ["Fireball"]}, strict=False) | {"prepared": ["Homebrew Bolt"]})
+    assert expanded["known"][0]["name"] == "Fireball" and "description" not in expanded["known"][0]
+    assert expanded["prepared"] == [{"id": None, "name": "Homebrew Bolt"}]
+    assert "description" in expand_spells({"known": [FIREBALL]}, full=True)["known"][0]
+    assert expand_spells(None) == {"known": [], "prepared": []}
+
+
+def test_filter_mask():
+    ids = spell_ids(filter_mask(class_name="wizard", level=3))
+    assert FIREBALL in ids
+    assert all(SPELLS[i].level == 3 and "Wizard" in SPELLS[i].classes for i in ids)
+    assert filter_mask(class_name="Fighter") == 0
+    assert filter_mask(level=10) == 0
+
+
+def test_spell_slots_by_class():
+    assert max_spell_level("Wizard", 5) == 3
+    assert max_spell_level("Wizard", 20) == 9
+    assert max_spell_level("Paladin", 1) == 1
+    assert max_spell_level("Warlock", 9) == 5
+    assert max_spell_level("Fighter", 20) is None
+    preparable = spell_ids(preparable_mask("Wizard", 5))
+    assert FIREBALL in preparable and SPELL_IDS_BY_NAME["fire bolt"] not in preparable
+    assert SPELL_IDS_BY_NAME["wish"] not in preparable
@@ -0,0 +1,62 @@
+"""Compiled SRD artefact: contents, cache invalidation and load behaviour"""
+
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from backend import srd_data
+from backend.game_data import CLASS_HIT_DICE, SRD
+from backend.srd_index import BASE_DIR
+
+
+def _python(code: str, cwd) -> str:
+    env = {key: value for key, value in os.environ.items() if key != "SRD_DATA_PATH"}
+    env["PYTHONPATH"] = BASE_DIR
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True).stdout
+
+
+def test_compiled_tables():
+    assert len(SRD.classes) == 12
+    assert (CLASS_HIT_DICE["Barbarian"], CLASS_HIT_DICE["Fighter"], CLASS_HIT_DICE["Wizard"]) == ("d12", "d10", "d6")
+    assert SRD.xp_thresholds[:3] == (0, 300, 900) and len(SRD.xp_thresholds) == 20
+    assert SRD.proficiency_bonus[0] == 2 and SRD.proficiency_bonus[-1] == 6
+
+
+def test_artefact_is_reused_until_the_source_changes(tmp_path, monkeypatch):
+    artefact = str(tmp_path / "srd.pickle")
+    built = srd_data.load_srd_data(artefact_path=artefact)
+    assert os.path.exists(artefact)
+
+    def _no_compile(*args, **kwargs):
+        raise AssertionError("recompiled a current artefact")
+
+    monkeypatch.setattr(srd_data, "compile_srd", _no_compile)
+    assert srd_data.load_srd_data(artefact_path=artefact) == built
+
+    with open(artefact, "rb") as f:
+        pickle.load(f)
+        payload = f.read()
+    with open(artefact, "wb") as f:
+        pickle.dump({"version": srd_data.SRD_DATA_VERSION, "srd_sha256": "old"}, f)
+        f.write(payload)
+    with pytest.raises(AssertionError, match="recompiled"):
+        srd_data.load_srd_data(artefact_path=artefact)
+
+
+def test_artefact_path_does_not_depend_on_the_cwd(tmp_path):
+    path = _python("from backend.srd_data import SRD_DATA_PATH; print(SRD_DATA_PATH)", tmp_path).strip()
+    assert path == os.path.join(BASE_DIR, "srd_data.pickle")
+    assert os.listdir(tmp_path) == []
+
+
+def test_models_import_without_loading_the_srd(tmp_path):
+    loaded = _python("import sys, backend.models; print('backend.srd_data' in sys.modules)", tmp_path)
+    assert loaded.strip() == "False"
+
+
+def test_content_hash_tracks_the_data():
+    assert srd_data.content_hash(SRD) == srd_data.content_hash(SRD._replace())
+    assert srd_data.content_hash(SRD) != srd_data.content_hash(SRD._replace(feats=SRD.feats[1:]))
@@ -0,0 +1,92 @@
+"""SRD full-text index: parsing, build/rebuild and search"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from backend import srd_index
+from backend.srd_index import PAGE_BREAK, build_index, ensure_index, join_lines, match_query, parse_sections, srd_lines
+
+SAMPLE = """Contents
+Ability Checks  ....... 6
+Ability Checks
+Roll a d20 and add the ability modifier. The DM sets a Difficulty Class for the check.
+System Reference Document 5.2.16
+Advantage
+Sometimes a special ability or spell tells you that you have advantage on a roll.
+ When that happens, you roll a sec-
+ond d20.Disadvantage
+Roll two d20s and use the lower roll.
+"""
+
+
+@pytest.fixture(scope="module")
+def index_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("srd") / "srd_index.db")
+    build_index(index_path=path)
+    return path
+
+
+@pytest.fixture
+def searchable(index_path, monkeypatch):
+    """Point search at the prebuilt index, with fresh per-thread connections"""
+    monkeypatch.setattr(srd_index, "SRD_INDEX_PATH", index_path)
+    monkeypatch.setattr(srd_index, "_ensured", True)
+    monkeypatch.setattr(srd_index, "_local", threading.local())
+
+
+def test_lines_drop_contents_and_split_footers_and_glued_headings():
+    lines = [text for _, text in srd_lines(SAMPLE.splitlines())]
+    assert "Ability Checks  ....... 6" not in lines
+    assert PAGE_BREAK in lines
+    assert "Disadvantage" in lines and "ond d20." in lines
+
+
+def test_join_lines_undoes_hyphenation_and_wrapping():
+    assert join_lines(["you roll a sec-", "ond d20."]) == "you roll a second d20."
+    assert join_lines(["first line", " second paragraph", "wraps"]) == "first line\nsecond paragraph wraps"
+
+
+def test_parse_sections():
+    sections = parse_sections(SAMPLE)
+    assert [section.title for section in sections] == ["Ability Checks", "Advantage", "Disadvantage"]
+    assert sections[1].body == (
+        "Sometimes a special ability or spell tells you that you have advantage on a roll.\n"
+        "When that happens, you roll a second d20."
+    )
+    assert sections[0].line == 3
+
+
+def test_match_query():
+    assert match_query("the Grappled condition!") == '"grappled" "condition"*'
+    assert match_query("of the") == '"of" "the"'
+    assert match_query('ab" OR x') == '"ab" "x"'
+    assert match_query("...") == ""
+
+
+def test_ensure_index_rebuilds_only_when_the_srd_changes(tmp_path):
+    srd, index = tmp_path / "srd.md", str(tmp_path / "index.db")
+    srd.write_text(SAMPLE)
+    assert ensure_index(str(srd), index) is True
+    assert ensure_index(str(srd), index) is False
+    srd.write_text(SAMPLE.replace("lower roll", "lowest roll"))
+    assert ensure_index(str(srd), index) is True
+    with sqlite3.connect(index) as connection:
+        assert connection.execute("SELECT count(*) FROM srd").fetchone() == (3,)
+
+
+def test_search_ranks_exact_titles_first(searchable):
+    results = srd_index.search("fireball", limit=3)
+    assert results[0]["title"] == "Fireball"
+    assert all("<mark>" in result["snippet"] for result in results[1:])
+    assert srd_index.search("...") == []
+    assert len(srd_index.search("spell", limit=500)) == srd_index.SRD_SEARCH_MAX_RESULTS
+
+
+def test_endpoints(client, searchable):
+    results = client.get("/api/srd/search", params={"q": "grappled"}).json()["results"]
+    section = client.get(f"/api/srd/sections/{results[0]['id']}").json()
+    assert section["title"] == results[0]["title"] and "body" in section
+    assert client.get("/api/srd/sections/999999").status_code == 404
+    assert client.get("/api/srd/search", params={"q": ""}).status_code == 422
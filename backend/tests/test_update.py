@@ -0,0 +1,61 @@
+"""PUT /api/characters/{id}: ownership check, write and reload in one UPDATE ... RETURNING"""
+
+import pytest
+from sqlalchemy import event
+
+from backend.tests.conftest import OTHER_USER
+
+
+@pytest.fixture
+def statements(engine):
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement.lstrip().upper())
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield captured
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+def test_put_is_one_update_returning(client, make_character, statements):
+    url = f"/api/characters/{make_character()}"
+    client.get(url)
+    statements.clear()
+    response = client.put(url, json={"name": "Renamed", "hp_current": 7})
+    assert response.status_code == 200
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    assert "RETURNING" in statements[0]
+    assert (response.json()["name"], response.json()["hp_current"]) == ("Renamed", 7)
+    assert client.get(url).json() == response.json()
+
+
+def test_put_response_matches_get(client, make_character):
+    url = f"/api/characters/{make_character()}"
+    response = client.put(url, json={"stats": {**client.get(url).json()["stats"], "dexterity": 18}})
+    assert response.status_code == 200
+    assert response.json()["modifiers"]["dexterity"] == 4
+    assert response.headers["ETag"] == client.get(url).headers["ETag"]
+    assert client.get(url).json() == response.json()
+
+
+def test_put_on_someone_elses_character_is_404(client, make_character):
+    url = f"/api/characters/{make_character(owner=OTHER_USER)}"
+    assert client.put(url, json={"name": "Stolen"}).status_code == 404
+    assert client.put("/api/characters/999999", json={"name": "Nobody"}).status_code == 404
+
+
+def test_put_with_a_stale_if_match_is_412(client, make_character):
+    url = f"/api/characters/{make_character()}"
+    etag = client.get(url).headers["ETag"]
+    assert client.put(url, json={"name": "First"}, headers={"If-Match": etag}).status_code == 200
+    assert client.put(url, json={"name": "Second"}, headers={"If-Match": etag}).status_code == 412
+    assert client.get(url).json()["name"] == "First"
+
+
+def test_empty_put_returns_the_character(client, make_character):
+    url = f"/api/characters/{make_character()}"
+    before = client.get(url)
+    response = client.put(url, json={})
+    assert response.json() == before.json()
+    assert response.headers["ETag"] == before.headers["ETag"]
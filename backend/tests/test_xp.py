@@ -0,0 +1,48 @@
+"""POST /api/characters/xp: party XP awards and level-ups"""
+
+import pytest
+
+from backend.game_data import level_for_xp
+from backend.routers.characters import XP_AWARD_MAX, XP_AWARD_MAX_CHARACTERS
+from backend.tests.conftest import OTHER_USER
+
+
+def test_level_for_xp_thresholds():
+    assert [level_for_xp(xp) for xp in (0, 299, 300, 899, 900, 355000, 10**6)] == [1, 1, 2, 2, 3, 20, 20]
+
+
+def test_award_levels_up_and_returns_sheets(client, make_character):
+    fighter = make_character()
+    veteran = make_character(level=3, xp=1000, hit_dice_max=3, hit_dice_current=1, hp_max=28, hp_current=10)
+    body = client.post("/api/characters/xp", json={"character_ids": [fighter, veteran], "xp": 900}).json()
+    first, second = body["results"]
+
+    # Fighter d10 averages 6, +2 for CON 14: two levels at once
+    assert (first["previous_level"], first["levels_gained"], first["hp_gained"]) == (1, 2, 16)
+    assert first["sheet"]["level"] == 3 and first["sheet"]["xp"] == 900
+    assert (first["sheet"]["hp_max"], first["sheet"]["hp_current"]) == (28, 28)
+    assert (first["sheet"]["hit_dice_max"], first["sheet"]["hit_dice_current"]) == (3, 3)
+
+    # 1,900 XP is still level 3
+    assert (second["levels_gained"], second["hp_gained"]) == (0, 0)
+    assert second["sheet"]["xp"] == 1900 and second["sheet"]["hp_current"] == 10
+    assert client.get(f"/api/characters/{fighter}").json()["level"] == 3
+
+
+def test_missing_and_other_users_characters(client, make_character):
+    mine, theirs = make_character(), make_character(owner=OTHER_USER)
+    body = client.post("/api/characters/xp", json={"character_ids": [mine, theirs, mine], "xp": 10}).json()
+    assert [r.get("error") for r in body["results"]] == [None, "Character not found"]
+    assert client.get(f"/api/characters/{mine}").json()["xp"] == 10
+
+
+@pytest.mark.parametrize("xp", [-1, XP_AWARD_MAX + 1, 10**30, "lots"])
+def test_xp_out_of_range_is_422(client, user_id, make_character, xp):
+    character_id = make_character()
+    assert client.post("/api/characters/xp", json={"character_ids": [character_id], "xp": xp}).status_code == 422
+    assert client.get(f"/api/characters/{character_id}").json()["xp"] == 0
+
+
+def test_too_many_characters_is_413(client, user_id):
+    ids = list(range(1, XP_AWARD_MAX_CHARACTERS + 2))
+    assert client.post("/api/characters/xp", json={"character_ids": ids, "xp": 1}).status_code == 413
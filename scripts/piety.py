@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 """
 Generate Piety sections for all Gods of Faerun using the Anthropic API.
-Processes gods in batches, with retry logic and progress tracking.
-Appends Champions, Favor, Ideals, Earning/Losing Piety, and Piety Tier
-sections to each god's existing entry.
+Processes gods one at a time, or concurrently with --async, with retry
+logic and progress tracking. Appends Champions, Favor, Ideals,
+Earning/Losing Piety, and Piety Tier sections to each god's existing entry.
+
+    python piety.py                      # one god after another
+    python piety.py --async --concurrency 8 --rpm 50 --tpm 80000
+
+The async mode keeps at most --concurrency requests in flight, paces them
+to the requests- and tokens-per-minute limits, and retries failed requests
+with jittered exponential backoff that honours retry-after.
 """
 
-import anthropic
+import argparse
+import asyncio
+import collections
 import json
+import random
 import re
 import time
 import os
@@ -23,6 +33,14 @@ PROGRESS_FILE = "/home/claude/piety_progress.json"
 RETRY_DELAY = 5
 MAX_RETRIES = 3
 
+# --- Async mode ---
+CONCURRENCY = 4                 # Requests in flight at once
+REQUESTS_PER_MINUTE = 50
+TOKENS_PER_MINUTE = 80000       # Input + output tokens
+BACKOFF_BASE = 2.0              # Seconds; the cap doubles with each attempt
+BACKOFF_MAX = 60.0
+CHARS_PER_TOKEN = 4             # For estimating a prompt's size before sending it
+
 # --- God metadata for accurate generation ---
 # Each god: (name, domain_summary, alignment_tendency, suggested_classes, cleric_domains, backgrounds, ability_scores_for_50)
 GOD_DATA = {
@@ -690,11 +708,9 @@ def save_progress(progress):
         json.dump(progress, f, indent=2)
 
 
-def generate_piety_for_god(client, god_name, god_entry, piety_examples, god_meta):
-    """
-    Call the Anthropic API to generate a piety section for a single god.
-    """
-    prompt = f"""You are creating D&D 5e piety content for the Faerûnian god {god_name}. 
+def build_prompt(god_name, god_entry, piety_examples, god_meta):
+    """Build the generation prompt for a single god."""
+    return f"""You are creating D&D 5e piety content for the Faerûnian god {god_name}. 
 You must follow the EXACT format from the Theros piety examples below, but adapted for the Forgotten Realms setting.
 
 Here is the existing lore entry for {god_name}:
@@ -754,6 +770,13 @@ CRITICAL FORMATTING RULES:
 - Output ONLY the new sections. Do not repeat the existing entry.
 """
 
+
+def generate_piety_for_god(client, god_name, god_entry, piety_examples, god_meta):
+    """
+    Call the Anthropic API to generate a piety section for a single god.
+    """
+    prompt = build_prompt(god_name, god_entry, piety_examples, god_meta)
+
     for attempt in range(MAX_RETRIES):
         try:
             response = client.messages.create(
@@ -770,7 +793,158 @@ CRITICAL FORMATTING RULES:
                 return f"[ERROR: Failed to generate piety for {god_name} after {MAX_RETRIES} attempts: {e}]"
 
 
-def main():
+# --- Async generation ---
+
+def estimate_tokens(prompt):
+    """Tokens a request may use against the TPM budget: the prompt, roughly, plus the output allowance."""
+    return len(prompt) // CHARS_PER_TOKEN + MAX_TOKENS
+
+
+class RateLimiter:
+    """
+    Sliding one-minute window over requests and tokens.
+
+    acquire() waits until one more request of `tokens` fits under both
+    limits and records it; settle() replaces that estimate with the tokens
+    the request actually used. pause() holds every request back, e.g. for
+    a retry-after from the API.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, clock=time.monotonic, sleep=asyncio.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.window = collections.deque()  # [start time, tokens] per request in the last minute
+        self.resume_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def _wait_time(self, tokens):
+        now = self.clock()
+        while self.window and now - self.window[0][0] >= 60:
+            self.window.popleft()
+        if now < self.resume_at:
+            return self.resume_at - now
+        used = sum(entry[1] for entry in self.window)
+        # A request bigger than the whole budget still runs, on an empty window
+        if len(self.window) < self.requests_per_minute and (used + tokens <= self.tokens_per_minute or not self.window):
+            return 0.0
+        # Re-check at least every second: settle() may free tokens before the oldest request expires
+        return min(60 - (now - self.window[0][0]), 1.0)
+
+    async def acquire(self, tokens):
+        async with self.lock:  # Waiters are served in arrival order
+            while True:
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    entry = [self.clock(), tokens]
+                    self.window.append(entry)
+                    return entry
+                await self.sleep(wait)
+
+    def settle(self, entry, tokens):
+        entry[1] = tokens
+
+    def pause(self, seconds):
+        self.resume_at = max(self.resume_at, self.clock() + seconds)
+
+
+def retry_after(error):
+    """Seconds from the retry-after header of an API error, or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """Rate limits, overload, timeouts and server errors are worth retrying; other 4xx are not."""
+    status = getattr(error, "status_code", None)
+    return status is None or status in (408, 409, 429) or status >= 500
+
+
+def backoff_delay(attempt, retry_after_seconds=None):
+    """
+    Full-jitter exponential backoff for the given (0-based) attempt. With a
+    retry-after, wait that long plus a little jitter so the retries don't
+    all land at once.
+    """
+    if retry_after_seconds is not None:
+        return retry_after_seconds + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+async def generate_piety_for_god_async(client, limiter, semaphore, god_name, prompt):
+    """
+    Async version of generate_piety_for_god() for an AsyncAnthropic client
+    (or anything with the same messages.create), paced by `limiter` and
+    bounded by `semaphore`.
+    """
+    tokens = estimate_tokens(prompt)
+    async with semaphore:
+        for attempt in range(MAX_RETRIES):
+            entry = await limiter.acquire(tokens)
+            try:
+                response = await client.messages.create(
+                    model=MODEL,
+                    max_tokens=MAX_TOKENS,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            except Exception as e:
+                if not is_retryable(e) or attempt == MAX_RETRIES - 1:
+                    print(f"  Attempt {attempt + 1} failed for {god_name}: {e}")
+                    return f"[ERROR: Failed to generate piety for {god_name} after {attempt + 1} attempts: {e}]"
+                wait = retry_after(e)
+                delay = backoff_delay(attempt, wait)
+                if wait is not None:
+                    # The limit is shared, so nobody else should send until it lifts
+                    limiter.pause(wait)
+                print(f"  Attempt {attempt + 1} failed for {god_name}: {e} (retrying in {delay:.1f}s)")
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                limiter.settle(entry, usage.input_tokens + usage.output_tokens)
+            return response.content[0].text
+
+
+async def generate_all_async(client, jobs, on_done=None, concurrency=CONCURRENCY,
+                             requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE):
+    """
+    Generate every (god_name, prompt) job concurrently. on_done(god_name, text)
+    is called as each one finishes. Returns {god_name: text}.
+    """
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def run(god_name, prompt):
+        results[god_name] = await generate_piety_for_god_async(client, limiter, semaphore, god_name, prompt)
+        if on_done is not None:
+            on_done(god_name, results[god_name])
+
+    await asyncio.gather(*(run(god_name, prompt) for god_name, prompt in jobs))
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Piety sections for the Gods of Faerun.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="generate concurrently with the async client")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help=f"requests in flight at once with --async (default {CONCURRENCY})")
+    parser.add_argument("--rpm", type=int, default=REQUESTS_PER_MINUTE,
+                        help=f"requests per minute with --async (default {REQUESTS_PER_MINUTE})")
+    parser.add_argument("--tpm", type=int, default=TOKENS_PER_MINUTE,
+                        help=f"tokens per minute with --async (default {TOKENS_PER_MINUTE})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     print("=" * 60)
     print("GODS OF FAERUN - PIETY GENERATOR")
     print("=" * 60)
@@ -790,39 +964,60 @@ def main():
     completed = progress.get("completed", {})
     print(f"Previously completed: {len(completed)} gods")
 
-    # Initialize API client
-    client = anthropic.Anthropic()
+    # Only needed for real runs, so the async path can be exercised with a stub client
+    import anthropic
 
     # Extract the relevant piety examples (Athreos + Erebos for two complete references)
     # We'll send both as examples
     piety_examples = piety_text
 
-    # Process each god
+    # Work out which gods still need generating
     total = len(god_entries)
+    pending = []
     for idx, (god_name, god_entry) in enumerate(god_entries):
         if god_name in completed:
             print(f"[{idx+1}/{total}] {god_name} - ALREADY DONE (skipping)")
-            continue
-
-        if god_name not in GOD_DATA:
+        elif god_name not in GOD_DATA:
             print(f"[{idx+1}/{total}] {god_name} - NO METADATA (skipping)")
-            continue
-
-        print(f"[{idx+1}/{total}] Generating piety for {god_name}...")
-        god_meta = GOD_DATA[god_name]
-
-        piety_section = generate_piety_for_god(
-            client, god_name, god_entry, piety_examples, god_meta
-        )
+        else:
+            pending.append((idx, god_name, god_entry))
 
+    def record(god_name, piety_section):
         completed[god_name] = piety_section
         progress["completed"] = completed
         save_progress(progress)
         print(f"  ✓ {god_name} complete ({len(piety_section)} chars)")
 
-        # Small delay between API calls to be polite
-        if idx < total - 1:
-            time.sleep(1)
+    if args.use_async:
+        print(f"Generating {len(pending)} gods, {args.concurrency} at a time "
+              f"(limits: {args.rpm} requests, {args.tpm} tokens per minute)...")
+        # Retries are ours (backoff with jitter, retry-after), not the SDK's
+        client = anthropic.AsyncAnthropic(max_retries=0)
+        jobs = [
+            (god_name, build_prompt(god_name, god_entry, piety_examples, GOD_DATA[god_name]))
+            for _, god_name, god_entry in pending
+        ]
+        asyncio.run(generate_all_async(
+            client, jobs, on_done=record, concurrency=args.concurrency,
+            requests_per_minute=args.rpm, tokens_per_minute=args.tpm
+        ))
+    else:
+        # Initialize API client
+        client = anthropic.Anthropic()
+
+        # Process each god
+        for idx, god_name, god_entry in pending:
+            print(f"[{idx+1}/{total}] Generating piety for {god_name}...")
+            god_meta = GOD_DATA[god_name]
+
+            piety_section = generate_piety_for_god(
+                client, god_name, god_entry, piety_examples, god_meta
+            )
+            record(god_name, piety_section)
+
+            # Small delay between API calls to be polite
+            if idx < total - 1:
+                time.sleep(1)
 
     # Now assemble the final document
     print("\n" + "=" * 60)
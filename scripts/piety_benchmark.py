@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark piety generation against a local stub client (no API calls).
+
+"sequential" runs generate_piety_for_god() one god after another, as
+piety.py does without --async (minus its 1 s polite delay per god);
+"async N" runs generate_all_async() with N requests in flight. The stub
+answers after --latency seconds and, with --error-rate, fails that share
+of requests with a 429 carrying retry-after, so retries and the limiter
+are exercised too.
+
+    python scripts/piety_benchmark.py --gods 40 --latency 0.5 --concurrency 1 4 8 16
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+import piety
+
+
+class StubRateLimitError(Exception):
+    """Shaped like anthropic.RateLimitError: a status code and response headers."""
+
+    def __init__(self, retry_after):
+        super().__init__("429 rate_limit_error (stub)")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+def _response(messages, output_tokens):
+    prompt = messages[0]["content"]
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=f"Piety sections ({len(prompt)} chars of prompt)")],
+        usage=SimpleNamespace(input_tokens=len(prompt) // piety.CHARS_PER_TOKEN, output_tokens=output_tokens),
+    )
+
+
+class StubClient:
+    """Blocking stand-in for anthropic.Anthropic."""
+
+    def __init__(self, latency, output_tokens=1500):
+        self.messages = self
+        self.latency = latency
+        self.output_tokens = output_tokens
+        self.calls = 0
+
+    def create(self, model, max_tokens, messages):
+        self.calls += 1
+        time.sleep(self.latency)
+        return _response(messages, self.output_tokens)
+
+
+class StubAsyncClient:
+    """Stand-in for anthropic.AsyncAnthropic, optionally failing some requests with a 429."""
+
+    def __init__(self, latency, error_rate=0.0, retry_after=0.5, output_tokens=1500, seed=0):
+        self.messages = self
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.output_tokens = output_tokens
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, max_tokens, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.random.random() < self.error_rate:
+                raise StubRateLimitError(self.retry_after)
+            return _response(messages, self.output_tokens)
+        finally:
+            self.in_flight -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gods", type=int, default=len(piety.GOD_DATA))
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stub response")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rpm", type=int, default=10_000)
+    parser.add_argument("--tpm", type=int, default=100_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of async requests failing with a 429")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--backoff-base", type=float, default=0.1)
+    parser.add_argument("--prompt-chars", type=int, default=24_000)
+    args = parser.parse_args()
+    piety.BACKOFF_BASE = args.backoff_base
+
+    names = [f"God {i}" for i in range(args.gods)]
+    prompt = "x" * args.prompt_chars
+
+    client = StubClient(args.latency)
+    start = time.perf_counter()
+    for name in names:
+        piety.generate_piety_for_god(client, name, "", "", piety.GOD_DATA["Amaunator"])
+    sequential = time.perf_counter() - start
+    print(f"{args.gods} gods, {args.latency:.2f}s stub latency, limits {args.rpm} rpm / {args.tpm} tpm")
+    print(f"{'mode':12} {'wall s':>8} {'speed-up':>9} {'calls':>6} {'in flight':>10} {'errors':>7}")
+    print(f"{'sequential':12} {sequential:>8.2f} {1:>8.1f}x {client.calls:>6} {1:>10} {0:>7}")
+
+    for concurrency in args.concurrency:
+        client = StubAsyncClient(args.latency, args.error_rate, args.retry_after)
+        jobs = [(name, prompt) for name in names]
+        start = time.perf_counter()
+        results = asyncio.run(piety.generate_all_async(
+            client, jobs, concurrency=concurrency,
+            requests_per_minute=args.rpm, tokens_per_minute=args.tpm
+        ))
+        elapsed = time.perf_counter() - start
+        errors = sum(text.startswith("[ERROR") for text in results.values())
+        print(f"{'async ' + str(concurrency):12} {elapsed:>8.2f} {sequential / elapsed:>8.1f}x "
+              f"{client.calls:>6} {client.max_in_flight:>10} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()